@@ -11,7 +11,8 @@ from alembic import context
 sys.path.insert(0, os.path.realpath(os.path.join(os.path.dirname(__file__), '..')))
 from app.core.db import Base
 from app.models.user import User # Import all your models here
-from app.models.device import Device, Telemetry
+from app.models.device import Device, Telemetry, TelemetryHourly, TelemetryDaily
+from app.models.cache import StatsCacheEntry, StatsCacheGeneration, LLMParseCacheEntry
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
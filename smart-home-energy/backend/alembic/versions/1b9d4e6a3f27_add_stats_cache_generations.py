@@ -0,0 +1,34 @@
+"""Add stats cache generations
+
+Revision ID: 1b9d4e6a3f27
+Revises: e8a3f5d1c620
+Create Date: 2026-10-18 22:17:03.418265
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '1b9d4e6a3f27'
+down_revision: Union[str, Sequence[str], None] = 'e8a3f5d1c620'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # UNLOGGED like stats_cache: losing both in a crash only empties the cache.
+    op.create_table('stats_cache_generations',
+    sa.Column('device_id', sa.UUID(), nullable=False),
+    sa.Column('generation', sa.BigInteger(), nullable=False),
+    sa.PrimaryKeyConstraint('device_id'),
+    prefixes=['UNLOGGED']
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('stats_cache_generations')
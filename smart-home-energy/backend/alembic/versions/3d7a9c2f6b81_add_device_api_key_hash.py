@@ -0,0 +1,28 @@
+"""Add device api key hash
+
+Revision ID: 3d7a9c2f6b81
+Revises: 8e2b5d0c7a14
+Create Date: 2026-10-18 14:22:09.318406
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3d7a9c2f6b81'
+down_revision: Union[str, Sequence[str], None] = '8e2b5d0c7a14'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('devices', sa.Column('api_key_hash', sa.String(length=64), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('devices', 'api_key_hash')
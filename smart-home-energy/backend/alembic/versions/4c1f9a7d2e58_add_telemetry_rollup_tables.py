@@ -0,0 +1,59 @@
+"""Add telemetry rollup tables
+
+Revision ID: 4c1f9a7d2e58
+Revises: b63a0f1de54d
+Create Date: 2026-10-18 09:12:41.203518
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4c1f9a7d2e58'
+down_revision: Union[str, Sequence[str], None] = 'b63a0f1de54d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _create_rollup_table(name: str) -> None:
+    op.create_table(name,
+    sa.Column('device_id', sa.UUID(), nullable=False),
+    sa.Column('bucket', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('total_energy', sa.DECIMAL(precision=16, scale=4), nullable=False),
+    sa.Column('sample_count', sa.Integer(), nullable=False),
+    sa.Column('min_energy', sa.DECIMAL(precision=10, scale=4), nullable=False),
+    sa.Column('max_energy', sa.DECIMAL(precision=10, scale=4), nullable=False),
+    sa.ForeignKeyConstraint(['device_id'], ['devices.id'], ),
+    sa.PrimaryKeyConstraint('device_id', 'bucket')
+    )
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    _create_rollup_table('telemetry_hourly')
+    _create_rollup_table('telemetry_daily')
+
+    # Backfill from the existing raw readings; afterwards the application keeps
+    # both tables up to date as points are ingested. Buckets are UTC-aligned
+    # like the application's, whatever the migrating session's TimeZone.
+    op.execute("""
+        INSERT INTO telemetry_hourly (device_id, bucket, total_energy, sample_count, min_energy, max_energy)
+        SELECT device_id, date_trunc('hour', timestamp, 'UTC'), SUM(energy_usage), COUNT(*), MIN(energy_usage), MAX(energy_usage)
+        FROM telemetry
+        GROUP BY device_id, date_trunc('hour', timestamp, 'UTC')
+    """)
+    op.execute("""
+        INSERT INTO telemetry_daily (device_id, bucket, total_energy, sample_count, min_energy, max_energy)
+        SELECT device_id, date_trunc('day', bucket, 'UTC'), SUM(total_energy), SUM(sample_count), MIN(min_energy), MAX(max_energy)
+        FROM telemetry_hourly
+        GROUP BY device_id, date_trunc('day', bucket, 'UTC')
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('telemetry_daily')
+    op.drop_table('telemetry_hourly')
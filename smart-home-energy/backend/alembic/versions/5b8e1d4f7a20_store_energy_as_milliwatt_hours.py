@@ -0,0 +1,69 @@
+"""Store energy as milliwatt-hours
+
+Revision ID: 5b8e1d4f7a20
+Revises: 7f4c2e9a1d36
+Create Date: 2026-10-18 17:12:09.331845
+
+Only converts the columns when TELEMETRY_ENERGY_STORAGE is
+"milliwatt_hours"; otherwise it is a no-op, so deployments can opt in later
+by setting it and running `alembic downgrade 7f4c2e9a1d36 && alembic upgrade head`.
+Readings are rounded to the nearest milliwatt-hour.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.core.config import settings
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5b8e1d4f7a20'
+down_revision: Union[str, Sequence[str], None] = '7f4c2e9a1d36'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# table -> {column: (milliwatt-hour type, numeric type)}
+COLUMNS = {
+    "telemetry": {"energy_usage": ("INTEGER", "NUMERIC(10, 4)")},
+    "telemetry_hourly": {
+        "total_energy": ("BIGINT", "NUMERIC(16, 4)"),
+        "min_energy": ("INTEGER", "NUMERIC(10, 4)"),
+        "max_energy": ("INTEGER", "NUMERIC(10, 4)"),
+    },
+    "telemetry_daily": {
+        "total_energy": ("BIGINT", "NUMERIC(16, 4)"),
+        "min_energy": ("INTEGER", "NUMERIC(10, 4)"),
+        "max_energy": ("INTEGER", "NUMERIC(10, 4)"),
+    },
+}
+
+
+def _column_type(table: str, column: str) -> str:
+    return op.get_bind().execute(sa.text(
+        "SELECT data_type FROM information_schema.columns WHERE table_name = :table AND column_name = :column"
+    ), {"table": table, "column": column}).scalar()
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if settings.TELEMETRY_ENERGY_STORAGE != "milliwatt_hours":
+        return
+    # One ALTER per table rewrites it once; on the partitioned telemetry
+    # table Postgres rewrites each partition in turn.
+    for table, columns in COLUMNS.items():
+        op.execute(f"ALTER TABLE {table} " + ", ".join(
+            f"ALTER COLUMN {column} TYPE {mwh} USING round({column} * 1000)::{mwh}"
+            for column, (mwh, _) in columns.items()
+        ))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table, columns in COLUMNS.items():
+        if _column_type(table, next(iter(columns))) not in ("integer", "bigint"):
+            continue
+        op.execute(f"ALTER TABLE {table} " + ", ".join(
+            f"ALTER COLUMN {column} TYPE {numeric} USING {column}::numeric / 1000"
+            for column, (_, numeric) in columns.items()
+        ))
@@ -0,0 +1,158 @@
+"""Partition telemetry by time
+
+Revision ID: 7f4c2e9a1d36
+Revises: 3d7a9c2f6b81
+Create Date: 2026-10-18 15:41:52.804117
+
+Runs online: the partitioned table is built beside the live one, a trigger
+mirrors writes made while existing rows are backfilled in day-sized batches,
+and the two are swapped in one short transaction. Ingestion keeps running
+throughout; only the swap takes ACCESS EXCLUSIVE on telemetry, briefly.
+
+The downgrade is not online: it copies every row back in one transaction
+holding ACCESS EXCLUSIVE on telemetry, so stop ingestion before running it.
+"""
+from datetime import datetime, timedelta, timezone
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.core.config import settings
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7f4c2e9a1d36'
+down_revision: Union[str, Sequence[str], None] = '3d7a9c2f6b81'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _partition_start(ts: datetime, interval: str) -> datetime:
+    day = ts.astimezone(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+    if interval == "week":
+        return day - timedelta(days=day.weekday())
+    return day.replace(day=1)
+
+
+def _next_start(start: datetime, interval: str) -> datetime:
+    if interval == "week":
+        return start + timedelta(weeks=1)
+    return start.replace(year=start.year + start.month // 12, month=start.month % 12 + 1)
+
+
+# Width of one backfill batch; each batch is its own short transaction.
+_BACKFILL_BATCH = timedelta(days=1)
+
+# Applies a write on the live table to the partitioned copy being built.
+_MIRROR_FUNCTION = """
+    CREATE OR REPLACE FUNCTION telemetry_mirror() RETURNS trigger LANGUAGE plpgsql AS $$
+    BEGIN
+        IF TG_OP IN ('UPDATE', 'DELETE') THEN
+            DELETE FROM telemetry_partitioned
+            WHERE device_id = OLD.device_id AND "timestamp" = OLD."timestamp";
+        END IF;
+        IF TG_OP IN ('INSERT', 'UPDATE') THEN
+            INSERT INTO telemetry_partitioned (device_id, "timestamp", energy_usage)
+            VALUES (NEW.device_id, NEW."timestamp", NEW.energy_usage)
+            ON CONFLICT (device_id, "timestamp") DO UPDATE SET energy_usage = EXCLUDED.energy_usage;
+        END IF;
+        RETURN NULL;
+    END
+    $$
+"""
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    interval = settings.TELEMETRY_PARTITION_INTERVAL
+    bind = op.get_bind()
+
+    # 1. Build the partitioned table next to the live one. Every statement is
+    # idempotent, so a run that stopped part way can simply be repeated.
+    op.execute("""
+        CREATE TABLE IF NOT EXISTS telemetry_partitioned (
+            device_id UUID NOT NULL,
+            "timestamp" TIMESTAMP WITH TIME ZONE NOT NULL,
+            energy_usage NUMERIC(10, 4) NOT NULL,
+            CONSTRAINT telemetry_partitioned_pkey PRIMARY KEY (device_id, "timestamp"),
+            CONSTRAINT telemetry_partitioned_device_id_fkey FOREIGN KEY (device_id) REFERENCES devices (id)
+        ) PARTITION BY RANGE ("timestamp")
+    """)
+
+    # One partition per interval from the oldest reading through
+    # TELEMETRY_PARTITIONS_AHEAD intervals past the current one.
+    oldest, newest = bind.execute(sa.text(
+        'SELECT min("timestamp"), max("timestamp") FROM telemetry'
+    )).one()
+    now = datetime.now(timezone.utc)
+    first = _partition_start(min(oldest or now, now), interval)
+    end = _next_start(_partition_start(max(newest or now, now), interval), interval)
+    for _ in range(settings.TELEMETRY_PARTITIONS_AHEAD):
+        end = _next_start(end, interval)
+
+    start = first
+    while start < end:
+        upper = _next_start(start, interval)
+        op.execute(
+            f"CREATE TABLE IF NOT EXISTS telemetry_p{start:%Y%m%d} PARTITION OF telemetry_partitioned "
+            f"FOR VALUES FROM ('{start.isoformat()}') TO ('{upper.isoformat()}')"
+        )
+        start = upper
+    # Catches readings outside every partition (e.g. clocks far in the future)
+    # until the partition manager creates their partition.
+    op.execute("CREATE TABLE IF NOT EXISTS telemetry_default PARTITION OF telemetry_partitioned DEFAULT")
+
+    # Mirror every write made to the live table from now on. CREATE TRIGGER
+    # waits for in-flight writers, so anything committed before it is left
+    # for the backfill and anything after it is mirrored.
+    op.execute(_MIRROR_FUNCTION)
+    op.execute("DROP TRIGGER IF EXISTS telemetry_mirror ON telemetry")
+    op.execute(
+        "CREATE TRIGGER telemetry_mirror AFTER INSERT OR UPDATE OR DELETE ON telemetry "
+        "FOR EACH ROW EXECUTE FUNCTION telemetry_mirror()"
+    )
+
+    # 2. Backfill in short batches, each committed on its own so ingestion
+    # keeps running. FOR SHARE makes a batch wait for writers touching its
+    # rows and copy their latest committed version (skipping rows deleted
+    # meanwhile); rows the trigger already mirrored are left alone.
+    with op.get_context().autocommit_block():
+        start = first
+        while start < end:
+            upper = min(start + _BACKFILL_BATCH, end)
+            bind.execute(sa.text(
+                'INSERT INTO telemetry_partitioned (device_id, "timestamp", energy_usage) '
+                'SELECT device_id, "timestamp", energy_usage FROM telemetry '
+                'WHERE "timestamp" >= :start AND "timestamp" < :end FOR SHARE '
+                'ON CONFLICT (device_id, "timestamp") DO NOTHING'
+            ), {"start": start, "end": upper})
+            start = upper
+
+    # 3. Swap the tables. Only this short transaction holds ACCESS EXCLUSIVE
+    # on telemetry; give up rather than queue every writer behind a long one.
+    op.execute("SET LOCAL lock_timeout = '30s'")
+    op.execute("LOCK TABLE telemetry IN ACCESS EXCLUSIVE MODE")
+    op.execute("DROP TRIGGER telemetry_mirror ON telemetry")
+    op.execute("DROP FUNCTION telemetry_mirror()")
+    op.execute("DROP TABLE telemetry")
+    op.execute("ALTER TABLE telemetry_partitioned RENAME TO telemetry")
+    op.execute("ALTER TABLE telemetry RENAME CONSTRAINT telemetry_partitioned_pkey TO telemetry_pkey")
+    op.execute("ALTER TABLE telemetry RENAME CONSTRAINT telemetry_partitioned_device_id_fkey TO telemetry_device_id_fkey")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("""
+        CREATE TABLE telemetry_unpartitioned (
+            device_id UUID NOT NULL REFERENCES devices (id),
+            "timestamp" TIMESTAMP WITH TIME ZONE NOT NULL,
+            energy_usage NUMERIC(10, 4) NOT NULL,
+            CONSTRAINT telemetry_unpartitioned_pkey PRIMARY KEY (device_id, "timestamp")
+        )
+    """)
+    op.execute("INSERT INTO telemetry_unpartitioned SELECT device_id, \"timestamp\", energy_usage FROM telemetry")
+    # Dropping the parent drops every partition with it.
+    op.execute("DROP TABLE telemetry")
+    op.execute("ALTER TABLE telemetry_unpartitioned RENAME TO telemetry")
+    op.execute("ALTER TABLE telemetry RENAME CONSTRAINT telemetry_unpartitioned_pkey TO telemetry_pkey")
@@ -0,0 +1,43 @@
+"""Add stats cache table
+
+Revision ID: 8e2b5d0c7a14
+Revises: 4c1f9a7d2e58
+Create Date: 2026-10-18 11:04:27.551902
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8e2b5d0c7a14'
+down_revision: Union[str, Sequence[str], None] = '4c1f9a7d2e58'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # UNLOGGED: cache rows are disposable, so skip WAL for cheaper writes.
+    op.create_table('stats_cache',
+    sa.Column('key', sa.String(), nullable=False),
+    sa.Column('device_id', sa.UUID(), nullable=False),
+    sa.Column('window_start', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('window_end', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('payload', sa.Text(), nullable=False),
+    sa.Column('expires_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('accessed_at', sa.DateTime(timezone=True), nullable=False),
+    sa.PrimaryKeyConstraint('key'),
+    prefixes=['UNLOGGED']
+    )
+    op.create_index('ix_stats_cache_device_id', 'stats_cache', ['device_id'], unique=False)
+    op.create_index('ix_stats_cache_accessed_at', 'stats_cache', ['accessed_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_stats_cache_accessed_at', table_name='stats_cache')
+    op.drop_index('ix_stats_cache_device_id', table_name='stats_cache')
+    op.drop_table('stats_cache')
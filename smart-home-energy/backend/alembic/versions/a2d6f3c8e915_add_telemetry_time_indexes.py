@@ -0,0 +1,47 @@
+"""Add telemetry time indexes
+
+Revision ID: a2d6f3c8e915
+Revises: 5b8e1d4f7a20
+Create Date: 2026-10-18 18:03:27.540912
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a2d6f3c8e915'
+down_revision: Union[str, Sequence[str], None] = '5b8e1d4f7a20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Both statements run on the partitioned parent, so Postgres builds the
+    # index on every partition and gives future partitions their own copy.
+
+    # Readings arrive in time order, so each block range covers a narrow slice
+    # of time and a BRIN index of a few pages serves time-only filters across
+    # devices. autosummarize keeps the newest ranges indexed as they fill.
+    op.execute(
+        'CREATE INDEX ix_telemetry_timestamp_brin ON telemetry '
+        'USING brin ("timestamp") WITH (autosummarize = on)'
+    )
+    # Carrying energy_usage in the primary key instead of in a second B-tree
+    # on the same columns makes per-device range aggregates index-only scans
+    # without another index to maintain on every insert.
+    op.execute(
+        'ALTER TABLE telemetry DROP CONSTRAINT telemetry_pkey, '
+        'ADD CONSTRAINT telemetry_pkey PRIMARY KEY (device_id, "timestamp") INCLUDE (energy_usage)'
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute(
+        'ALTER TABLE telemetry DROP CONSTRAINT telemetry_pkey, '
+        'ADD CONSTRAINT telemetry_pkey PRIMARY KEY (device_id, "timestamp")'
+    )
+    op.execute('DROP INDEX ix_telemetry_timestamp_brin')
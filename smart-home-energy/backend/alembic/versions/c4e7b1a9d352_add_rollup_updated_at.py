@@ -0,0 +1,34 @@
+"""Add updated_at to telemetry rollups
+
+Revision ID: c4e7b1a9d352
+Revises: a2d6f3c8e915
+Create Date: 2026-10-18 19:26:44.118230
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4e7b1a9d352'
+down_revision: Union[str, Sequence[str], None] = 'a2d6f3c8e915'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # A constant default (no table rewrite); existing buckets count as changed
+    # at migration time.
+    for table in ('telemetry_hourly', 'telemetry_daily'):
+        op.add_column(table, sa.Column(
+            'updated_at', sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()
+        ))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table in ('telemetry_hourly', 'telemetry_daily'):
+        op.drop_column(table, 'updated_at')
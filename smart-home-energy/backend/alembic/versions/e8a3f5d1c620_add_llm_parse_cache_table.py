@@ -0,0 +1,41 @@
+"""Add LLM parse cache table
+
+Revision ID: e8a3f5d1c620
+Revises: c4e7b1a9d352
+Create Date: 2026-10-18 20:41:09.372614
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e8a3f5d1c620'
+down_revision: Union[str, Sequence[str], None] = 'c4e7b1a9d352'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Logged, unlike stats_cache: every row stands for a paid LLM call, so it
+    # is worth surviving a crash.
+    op.create_table('llm_parse_cache',
+    sa.Column('key', sa.String(), nullable=False),
+    sa.Column('question', sa.Text(), nullable=False),
+    sa.Column('device_set', sa.String(), nullable=False),
+    sa.Column('sql_query', sa.Text(), nullable=False),
+    sa.Column('summary_template', sa.Text(), nullable=False),
+    sa.Column('expires_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('accessed_at', sa.DateTime(timezone=True), nullable=False),
+    sa.PrimaryKeyConstraint('key')
+    )
+    op.create_index('ix_llm_parse_cache_accessed_at', 'llm_parse_cache', ['accessed_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_llm_parse_cache_accessed_at', table_name='llm_parse_cache')
+    op.drop_table('llm_parse_cache')
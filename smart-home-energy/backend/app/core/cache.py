@@ -0,0 +1,93 @@
+# backend/app/core/cache.py
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+
+_MISSING = object()
+
+
+class TTLCache:
+    """
+    Thread-safe, size-bounded LRU cache whose entries also expire after a TTL.
+
+    Lookups move an entry to the most-recently-used end; inserting into a full
+    cache evicts from the least-recently-used end. Expired entries are dropped
+    lazily when they are looked up or reach the LRU end. `on_evict` is called
+    with (key, value) whenever an entry is evicted or expires, so owners can
+    keep secondary indexes in sync.
+    """
+    def __init__(
+        self,
+        max_entries: int,
+        ttl_seconds: float,
+        on_evict: Optional[Callable[[Hashable, Any], None]] = None,
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.on_evict = on_evict
+        self._entries: "OrderedDict[Hashable, tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._entries.get(key, _MISSING)
+            if entry is _MISSING:
+                self.misses += 1
+                return default
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                self._notify(key, value)
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl_seconds: Optional[float] = None) -> None:
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                old_key, (expires_at, old_value) = self._entries.popitem(last=False)
+                if expires_at <= time.monotonic():
+                    self.expirations += 1
+                else:
+                    self.evictions += 1
+                self._notify(old_key, old_value)
+
+    def delete(self, key: Hashable) -> bool:
+        """Removes `key`; returns whether it was present."""
+        with self._lock:
+            return self._entries.pop(key, _MISSING) is not _MISSING
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def metrics(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+    def _notify(self, key: Hashable, value: Any) -> None:
+        if self.on_evict is not None:
+            self.on_evict(key, value)
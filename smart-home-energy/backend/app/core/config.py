@@ -1,5 +1,6 @@
 # backend/app/core/config.py
 
+from typing import Dict, Literal, Optional
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 class Settings(BaseSettings):
@@ -12,17 +13,196 @@ class Settings(BaseSettings):
     
     # --- Database Settings ---
     DATABASE_URL: str
+    # Serve requests from an asyncpg engine and AsyncSession instead of
+    # psycopg2 sessions in the threadpool. DATABASE_URL is rewritten for asyncpg.
+    DB_ASYNC_ENABLED: bool = False
+    # Optional streaming replica for read-only routes (device lists, stats,
+    # exports, queries). Replica lag means a freshly written reading or device
+    # can take a moment to show up there.
+    DATABASE_REPLICA_URL: str | None = None
+    # Direct connection for the LISTEN that relays live telemetry and device
+    # key changes between workers; defaults to DATABASE_URL. Transaction-mode
+    # poolers (e.g. Neon "-pooler" hosts) accept LISTEN but never deliver
+    # notifications, so point this at the non-pooler host.
+    DATABASE_LISTEN_URL: str | None = None
+    # Connection pool, applied to every engine. Each worker process holds up
+    # to DB_POOL_SIZE + DB_MAX_OVERFLOW connections per engine.
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    # Seconds to wait for a free connection before failing the request.
+    DB_POOL_TIMEOUT_SECONDS: float = 10.0
+    # Reconnect connections older than this, ahead of server/proxy idle timeouts.
+    DB_POOL_RECYCLE_SECONDS: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    # Server-side limit for a single statement, applied with SET on each new
+    # connection; 0 (the default) leaves the server's setting alone. Behind a
+    # transaction-mode pooler (e.g. Neon "-pooler" hosts) set it on the
+    # database role instead.
+    DB_STATEMENT_TIMEOUT_MS: int = 0
     
     # --- JWT/Security Settings ---
     SECRET_KEY: str
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    # Resolved users are cached per process, keyed by the token's user id.
+    # Deactivation and password changes invalidate the entry in the worker that
+    # made them; other workers notice within the TTL.
+    AUTH_USER_CACHE_MAX_ENTRIES: int = 10_000
+    AUTH_USER_CACHE_TTL_SECONDS: float = 30.0
+    # HMAC key for device API key hashes; defaults to SECRET_KEY. Changing it
+    # invalidates every issued device key.
+    DEVICE_API_KEY_SECRET: str | None = None
+    # Key changes reach every worker's cache through Postgres NOTIFY; the TTL
+    # only matters while a worker's listener is reconnecting.
+    DEVICE_API_KEY_CACHE_MAX_ENTRIES: int = 100_000
+    DEVICE_API_KEY_CACHE_TTL_SECONDS: float = 60.0
+    # bcrypt runs on its own process pool. Requests beyond AUTH_HASH_MAX_PENDING
+    # queued hashes get 503 instead of piling up.
+    AUTH_HASH_WORKERS: int = 2
+    AUTH_HASH_MAX_PENDING: int = 64
+    # Token buckets for /auth/login (per account and per client IP) and
+    # /auth/register (per client IP).
+    AUTH_LOGIN_ACCOUNT_RATE_PER_MINUTE: float = 10.0
+    AUTH_LOGIN_ACCOUNT_BURST: int = 5
+    AUTH_LOGIN_IP_RATE_PER_MINUTE: float = 60.0
+    AUTH_LOGIN_IP_BURST: int = 20
+    
+    # --- Telemetry Ingestion Settings ---
+    # Number of rows buffered by the streaming upload endpoint before each flush.
+    TELEMETRY_UPLOAD_BATCH_SIZE: int = 5000
+    # "sync" commits every point inside its request; "queued" acknowledges with
+    # 202 and leaves the write to a background flusher.
+    TELEMETRY_INGEST_MODE: Literal["sync", "queued"] = "sync"
+    TELEMETRY_QUEUE_MAX_SIZE: int = 100_000
+    # What to do when the queue is full: "reject" answers 429 immediately,
+    # "block" waits up to TELEMETRY_QUEUE_BLOCK_TIMEOUT_SECONDS for room first.
+    TELEMETRY_QUEUE_FULL_POLICY: Literal["reject", "block"] = "reject"
+    TELEMETRY_QUEUE_BLOCK_TIMEOUT_SECONDS: float = 1.0
+    # The flusher writes whenever this many points are queued or the interval elapses.
+    TELEMETRY_FLUSH_BATCH_SIZE: int = 5000
+    TELEMETRY_FLUSH_INTERVAL_SECONDS: float = 1.0
+    # A failed flush is retried with exponential backoff before its points are
+    # dropped (and counted as "dropped" in the queue metrics).
+    TELEMETRY_FLUSH_MAX_RETRIES: int = 5
+    TELEMETRY_FLUSH_RETRY_BACKOFF_SECONDS: float = 0.5
+    TELEMETRY_FLUSH_RETRY_BACKOFF_MAX_SECONDS: float = 10.0
+    # How a reading for an existing (device_id, timestamp) is handled: "ignore"
+    # keeps the stored value, "overwrite" replaces it and "sum" adds to it.
+    TELEMETRY_CONFLICT_POLICY: Literal["ignore", "overwrite", "sum"] = "ignore"
+    # Maintain the hourly/daily rollup tables on ingest and read stats from them.
+    # After turning this back on, backfill with rollups.rebuild_rollups.
+    TELEMETRY_ROLLUPS_ENABLED: bool = True
+    # New readings are added to their buckets as deltas; this often (in one
+    # worker at a time) the buckets written recently are recomputed exactly.
+    TELEMETRY_ROLLUP_COMPACT_INTERVAL_SECONDS: float = 3600.0
+    # Rows fetched per server-side cursor round trip by the raw export endpoint.
+    TELEMETRY_EXPORT_BATCH_SIZE: int = 5000
+
+    # --- Telemetry Partitioning Settings ---
+    # Width of each range partition of `telemetry` once the table is
+    # partitioned (see the partitioning migration). Changing it only affects
+    # partitions created from then on.
+    TELEMETRY_PARTITION_INTERVAL: Literal["month", "week"] = "month"
+    # How many partitions beyond the current one are kept created in advance.
+    TELEMETRY_PARTITIONS_AHEAD: int = 3
+    TELEMETRY_PARTITION_CHECK_INTERVAL_SECONDS: float = 3600.0
+
+    # --- Telemetry Storage Settings ---
+    # How energy amounts are stored. "decimal" is NUMERIC(10, 4) as created by
+    # the original schema. "milliwatt_hours" stores whole milliwatt-hours as
+    # INTEGER (BIGINT for rollup totals): smaller rows and integer SUMs, with
+    # readings rounded to 0.001. The compact-energy migration converts the
+    # columns only when this is "milliwatt_hours" while it runs; the setting
+    # must match the schema afterwards.
+    TELEMETRY_ENERGY_STORAGE: Literal["decimal", "milliwatt_hours"] = "decimal"
+
+    # --- Telemetry Retention Settings ---
+    # Days to keep raw readings and the hourly and daily rollups, per
+    # Device.type; "default" covers every other type and null keeps forever.
+    # Raw data is folded into the rollups before it is deleted. Example (JSON
+    # in the environment):
+    #   {"default": {"raw": 30, "hourly": 730, "daily": null}, "HVAC": {"raw": 90}}
+    TELEMETRY_RETENTION_POLICIES: Dict[str, Dict[str, Optional[int]]] = {"default": {}}
+    TELEMETRY_RETENTION_INTERVAL_SECONDS: float = 3600.0
+    # Upper bound on raw rows deleted per transaction (rounded to whole hours).
+    TELEMETRY_RETENTION_BATCH_SIZE: int = 10_000
+    # Dropping a whole partition waits at most this long for its lock, so it
+    # never queues ingestion behind it; it is retried on the next run.
+    TELEMETRY_RETENTION_LOCK_TIMEOUT_MS: int = 2000
+
+    # --- Live Telemetry Settings ---
+    # Push freshly ingested points and the current hourly/daily buckets to
+    # subscribers of /devices/live. On Postgres every committing ingest
+    # transaction sends a NOTIFY that all workers LISTEN for; elsewhere only
+    # the ingesting process's own subscribers are served.
+    TELEMETRY_LIVE_ENABLED: bool = True
+    # Events buffered per subscriber; one that falls this far behind is dropped
+    # and has to reconnect.
+    TELEMETRY_LIVE_BUFFER_SIZE: int = 256
+    # Newest points per device carried in one event (keeps a NOTIFY under 8000 bytes).
+    TELEMETRY_LIVE_MAX_POINTS: int = 50
+    # Idle streams get a comment line this often so proxies keep them open.
+    TELEMETRY_LIVE_HEARTBEAT_SECONDS: float = 15.0
+    
+    # --- Device Stats Settings ---
+    # Hard cap on buckets per ranged stats response; finer resolutions that
+    # would exceed it are coarsened automatically.
+    STATS_MAX_POINTS: int = 1000
+    # Where device stats responses are cached: "memory" is private to each
+    # process, "postgres" is shared by every worker and "none" disables caching.
+    STATS_CACHE_BACKEND: Literal["memory", "postgres", "none"] = "memory"
+    STATS_CACHE_MAX_ENTRIES: int = 10_000
+    # Upper bound on staleness; ingestion invalidates affected entries sooner.
+    STATS_CACHE_TTL_SECONDS: float = 60.0
+    # Stats requests with `since=<watermark>` return every bucket recomputed
+    # after the watermark less this margin, which covers ingest transactions
+    # still open when the watermark was issued and clock skew between workers.
+    STATS_WATERMARK_GRACE_SECONDS: float = 30.0
+
+    # --- Device Ownership Index Settings ---
+    # Authorization checks consult an in-process device -> owner map. Devices
+    # deleted or re-owned through another worker are noticed within the TTL.
+    DEVICE_OWNERSHIP_MAX_ENTRIES: int = 100_000
+    DEVICE_OWNERSHIP_TTL_SECONDS: float = 300.0
+    # Load the index at startup instead of filling it on first use.
+    DEVICE_OWNERSHIP_WARM_ON_STARTUP: bool = True
     
     # --- LLM Integration Settings (for future use) ---
     # We can define them now so the application is aware of them.
     # The `| None = None` makes them optional.
     ANTHROPIC_API_KEY: str | None = None
-    
+    # Overrides the API endpoint, e.g. to point at a local stub server.
+    ANTHROPIC_BASE_URL: str | None = None
+    # One async client per process: at most LLM_MAX_CONCURRENCY calls are in
+    # flight, over a pool of up to LLM_MAX_CONNECTIONS HTTP connections.
+    LLM_MAX_CONCURRENCY: int = 8
+    LLM_MAX_CONNECTIONS: int = 20
+    # Each call must finish within this, queueing and retries included.
+    LLM_REQUEST_DEADLINE_SECONDS: float = 30.0
+    # Connection errors, 429s and 5xx are retried with jittered exponential
+    # backoff starting at LLM_RETRY_BACKOFF_SECONDS.
+    LLM_MAX_RETRIES: int = 3
+    LLM_RETRY_BACKOFF_SECONDS: float = 0.5
+    LLM_RETRY_BACKOFF_MAX_SECONDS: float = 8.0
+    # SQL plans from the LLM parser are cached in the `llm_parse_cache` table,
+    # keyed by the normalized question and the asker's device list. Relative
+    # periods ("yesterday", "last 7 days") become query parameters, so a plan
+    # is reused whatever date it is asked on.
+    LLM_PARSE_CACHE_ENABLED: bool = True
+    LLM_PARSE_CACHE_MAX_ENTRIES: int = 10_000
+    LLM_PARSE_CACHE_TTL_SECONDS: float = 7 * 24 * 3600.0
+    # Answers are summarized from a template, without a second LLM call, for
+    # aggregates and results of at most this many rows.
+    LLM_SUMMARY_TEMPLATE_MAX_ROWS: int = 5
+    # Larger results are sampled down to roughly this many tokens of JSON
+    # before they are sent to the LLM for summarization.
+    LLM_SUMMARY_TOKEN_BUDGET: int = 2000
+
+    # --- Operational Metrics Settings ---
+    # Bearer token for GET /api/v1/metrics/, which exposes internals (queue
+    # depths, background job results). Unset disables the endpoint.
+    METRICS_TOKEN: str | None = None
+
     # --- Pydantic Settings Configuration ---
     # This tells pydantic-settings to load variables from a .env file
     # if it exists, which is great for local development outside of Docker.
@@ -1,18 +1,70 @@
 # backend/app/core/db.py
 
-from sqlalchemy import create_engine
+from typing import Any, Callable, TypeVar
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 # from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.orm import Session, sessionmaker, declarative_base
+from sqlalchemy.util.concurrency import await_only, in_greenlet
+from . import metrics
 from .config import settings
+from .pool import InstrumentedAsyncQueuePool, InstrumentedQueuePool, pool_metrics
+
+T = TypeVar("T")
+
+
+def engine_options(is_async: bool = False) -> dict:
+    """Pool sizing shared by every engine."""
+    return {
+        "poolclass": InstrumentedAsyncQueuePool if is_async else InstrumentedQueuePool,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT_SECONDS,
+        "pool_recycle": settings.DB_POOL_RECYCLE_SECONDS,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+
+
+def apply_statement_timeout(engine, timeout_ms: int) -> None:
+    """
+    Runs `SET statement_timeout` on every new connection of `engine` (sync or
+    async). A plain SET, unlike the libpq `options` startup parameter, is
+    accepted by transaction-mode poolers such as Neon's `-pooler` endpoints,
+    but there it only reaches the server connection it ran on; behind such a
+    pooler set the timeout on the role instead and leave this off.
+    """
+    if not timeout_ms:
+        return
+
+    @event.listens_for(getattr(engine, "sync_engine", engine), "connect")
+    def _set_statement_timeout(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute(f"SET statement_timeout = {int(timeout_ms)}")
+        cursor.close()
+        # Commit the SET so the pool's rollback on checkin cannot undo it
+        dbapi_connection.commit()
+
 
 # Create the SQLAlchemy engine
 engine = create_engine(
     settings.DATABASE_URL,
+    **engine_options(),
     # connect_args={"check_same_thread": False} # This is only needed for SQLite
 )
+apply_statement_timeout(engine, settings.DB_STATEMENT_TIMEOUT_MS)
+
+# Read-only routes use the replica when one is configured, the primary otherwise
+read_engine = engine
+if settings.DATABASE_REPLICA_URL:
+    read_engine = create_engine(settings.DATABASE_REPLICA_URL, **engine_options())
+    apply_statement_timeout(read_engine, settings.DB_STATEMENT_TIMEOUT_MS)
 
 # Create a sessionmaker
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
 
 # Create a base class for our models to inherit from
 Base = declarative_base()
@@ -27,4 +79,105 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+
+def get_read_db():
+    """
+    FastAPI dependency that provides a session for read-only work, bound to
+    the read replica when DATABASE_REPLICA_URL is set.
+    """
+    db = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+def async_database_url(url: str) -> str:
+    """
+    Rewrites a psycopg2-style DATABASE_URL for asyncpg, which spells the
+    libpq `sslmode` option as `ssl`.
+    """
+    parsed = make_url(url).set(drivername="postgresql+asyncpg")
+    query = dict(parsed.query)
+    if "sslmode" in query:
+        query["ssl"] = query.pop("sslmode")
+    return parsed.set(query=query).render_as_string(hide_password=False)
+
+
+# The async engines only exist when DB_ASYNC_ENABLED is set; the sync engines
+# above stay available either way (background workers and the LLM query path
+# use them).
+async_engine = async_read_engine = None
+AsyncSessionLocal = AsyncReadSessionLocal = None
+if settings.DB_ASYNC_ENABLED:
+    async_engine = create_async_engine(async_database_url(settings.DATABASE_URL), **engine_options(is_async=True))
+    apply_statement_timeout(async_engine, settings.DB_STATEMENT_TIMEOUT_MS)
+    async_read_engine = async_engine
+    if settings.DATABASE_REPLICA_URL:
+        async_read_engine = create_async_engine(async_database_url(settings.DATABASE_REPLICA_URL), **engine_options(is_async=True))
+        apply_statement_timeout(async_read_engine, settings.DB_STATEMENT_TIMEOUT_MS)
+    AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+    AsyncReadSessionLocal = async_sessionmaker(async_read_engine, autoflush=False, expire_on_commit=False)
+
+
+async def get_async_db():
+    """
+    FastAPI dependency that provides an AsyncSession on the asyncpg engine.
+    """
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+async def get_async_read_db():
+    """
+    FastAPI dependency that provides a read-only AsyncSession (replica if configured).
+    """
+    async with AsyncReadSessionLocal() as db:
+        yield db
+
+
+# The session dependencies used by the routers: async when DB_ASYNC_ENABLED,
+# otherwise the regular sync sessions (which is what the tests override).
+get_session = get_async_db if settings.DB_ASYNC_ENABLED else get_db
+get_read_session = get_async_read_db if settings.DB_ASYNC_ENABLED else get_read_db
+
+
+async def run_db(db: Session | AsyncSession, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """
+    Runs sync ORM code `fn(session, *args, **kwargs)` without blocking the
+    event loop. With an AsyncSession the function runs via `run_sync`, whose
+    I/O is awaited on asyncpg without occupying a thread; with a sync Session
+    it runs in the threadpool. Either way `fn` only ever sees a regular
+    Session, so the service layer is shared by both paths.
+    """
+    if isinstance(db, AsyncSession):
+        return await db.run_sync(fn, *args, **kwargs)
+    return await run_in_threadpool(fn, db, *args, **kwargs)
+
+
+def run_blocking(fn: Callable[[], T]) -> T:
+    """
+    Runs blocking sync I/O that uses its own connection (e.g. the table-backed
+    caches) from code that may be executing under `run_db` on an
+    AsyncSession. There it would run on the event loop thread, so it is handed
+    to the threadpool and awaited through SQLAlchemy's greenlet bridge;
+    anywhere else `fn` is simply called.
+    """
+    if in_greenlet():
+        return await_only(run_in_threadpool(fn))
+    return fn()
+
+
+def _pool_metrics() -> dict:
+    engines = {"primary": engine, "replica": read_engine, "async_primary": async_engine, "async_replica": async_read_engine}
+    seen, result = set(), {}
+    for name, candidate in engines.items():
+        if candidate is not None and id(candidate) not in seen:
+            seen.add(id(candidate))
+            result[name] = pool_metrics(getattr(candidate, "sync_engine", candidate))
+    return result
+
+
+metrics.register("db_pool", _pool_metrics)
@@ -0,0 +1,60 @@
+# backend/app/core/locks.py
+
+import hashlib
+from contextlib import contextmanager
+from typing import Iterable, Iterator
+
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+
+def lock_key(*parts: object) -> int:
+    """A stable signed 64-bit advisory lock key for the given name parts."""
+    digest = hashlib.blake2b(":".join(str(part) for part in parts).encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "big", signed=True)
+
+
+def lock_for_transaction(db: Session, keys: Iterable[int]) -> None:
+    """
+    Takes `pg_advisory_xact_lock` on every key, waiting for other holders;
+    the locks are released when the session's transaction ends. Keys are
+    taken in ascending order so concurrent callers cannot deadlock on them.
+    A no-op on databases without advisory locks.
+    """
+    keys = sorted(set(keys))
+    if not keys or db.get_bind().dialect.name != "postgresql":
+        return
+    db.execute(
+        text(
+            "SELECT pg_advisory_xact_lock(k) "
+            "FROM (SELECT unnest(CAST(:keys AS bigint[])) AS k ORDER BY k) AS ordered"
+        ),
+        {"keys": keys},
+    )
+
+
+@contextmanager
+def exclusive_run(engine: Engine, name: str) -> Iterator[bool]:
+    """
+    Yields whether this process won the cluster-wide `pg_try_advisory_lock`
+    for `name`, so a job started in every worker only runs in one at a time.
+    The lock is held on a dedicated connection for the duration of the block.
+    Elsewhere (e.g. SQLite in tests) there is nothing to coordinate and it
+    always yields True.
+    """
+    if engine.dialect.name != "postgresql":
+        yield True
+        return
+    key = lock_key("job", name)
+    with engine.connect() as connection:
+        acquired = connection.execute(text("SELECT pg_try_advisory_lock(:key)"), {"key": key}).scalar()
+        # Session-level lock: end the implicit transaction so the connection
+        # does not sit idle in one while the job runs.
+        connection.commit()
+        try:
+            yield bool(acquired)
+        finally:
+            if acquired:
+                connection.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": key})
+                connection.commit()
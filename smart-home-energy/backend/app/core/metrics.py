@@ -0,0 +1,17 @@
+# backend/app/core/metrics.py
+
+from typing import Any, Callable, Dict
+
+# Components register a zero-argument callable returning a dict of their
+# current counters and gauges; the metrics endpoint snapshots all of them.
+_providers: Dict[str, Callable[[], Dict[str, Any]]] = {}
+
+
+def register(name: str, provider: Callable[[], Dict[str, Any]]) -> None:
+    """Registers (or replaces) the metrics provider for a component."""
+    _providers[name] = provider
+
+
+def snapshot() -> Dict[str, Dict[str, Any]]:
+    """Returns the current metrics of every registered component."""
+    return {name: provider() for name, provider in _providers.items()}
@@ -0,0 +1,137 @@
+# backend/app/core/notify.py
+
+import select as select_module
+import threading
+from typing import Any, Callable, Dict, List, Optional
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import NullPool
+
+from . import metrics
+from .config import settings
+
+
+def notify(db: Session, channel: str, payload: str) -> None:
+    """
+    Queues a Postgres NOTIFY in the session's transaction; every worker's
+    listener receives it when the transaction commits, and nobody if it
+    rolls back. Does nothing on other databases.
+    """
+    if db.get_bind().dialect.name == "postgresql":
+        db.execute(text("SELECT pg_notify(:channel, :payload)"), {"channel": channel, "payload": payload})
+
+
+def is_pooler_url(url: str) -> bool:
+    """Whether `url` points at a Neon-style `-pooler` host, i.e. transaction-mode pgbouncer."""
+    return (make_url(url).host or "").split(".", 1)[0].endswith("-pooler")
+
+
+class NotifyListener:
+    """
+    Thread holding one dedicated connection that LISTENs on every registered
+    channel and passes each notification's payload to that channel's
+    handler. Reconnects after connection errors; since notifications sent
+    while it was disconnected are lost, each channel's `on_connect` hook runs
+    whenever the connection is (re)established.
+    """
+    def __init__(self, url: str, poll_interval: float = 1.0, retry_interval: float = 5.0):
+        self.url = url
+        self.poll_interval = poll_interval
+        self.retry_interval = retry_interval
+        self._handlers: Dict[str, Callable[[str], None]] = {}
+        self._on_connect: List[Callable[[], None]] = []
+        self._stopping = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._engine: Engine | None = None
+        self._lock = threading.Lock()
+        self.received = 0
+        self.errors = 0
+
+    def listen(self, channel: str, handler: Callable[[str], None], on_connect: Optional[Callable[[], None]] = None) -> None:
+        """Registers a channel; call before `start`."""
+        self._handlers[channel] = handler
+        if on_connect is not None:
+            self._on_connect.append(on_connect)
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        if self.running or make_url(self.url).get_backend_name() != "postgresql":
+            return
+        if is_pooler_url(self.url):
+            print(
+                "Warning: the database notification listener connects through a "
+                "transaction-mode pooler, which never delivers notifications; set "
+                "DATABASE_LISTEN_URL to a direct connection."
+            )
+        if self._engine is None:
+            # No pool: its one long-lived connection must not take a slot
+            # from the request pool.
+            self._engine = create_engine(self.url, poolclass=NullPool)
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name="db-notify-listener", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stopping.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"running": self.running, "channels": sorted(self._handlers), "received": self.received, "errors": self.errors}
+
+    def _run(self) -> None:
+        while not self._stopping.is_set():
+            try:
+                self._listen()
+            except Exception as e:
+                print(f"Database notification listener failed: {e}")
+                with self._lock:
+                    self.errors += 1
+                self._stopping.wait(self.retry_interval)
+
+    def _listen(self) -> None:
+        # A raw driver connection outside the request pool: it stays in
+        # LISTEN for the life of the process.
+        connection = self._engine.raw_connection()
+        try:
+            driver_connection = connection.driver_connection
+            driver_connection.autocommit = True
+            with driver_connection.cursor() as cursor:
+                for channel in self._handlers:
+                    cursor.execute(f"LISTEN {channel}")
+            for hook in self._on_connect:
+                hook()
+            while not self._stopping.is_set():
+                if not select_module.select([driver_connection], [], [], self.poll_interval)[0]:
+                    continue
+                driver_connection.poll()
+                while driver_connection.notifies:
+                    notification = driver_connection.notifies.pop(0)
+                    with self._lock:
+                        self.received += 1
+                    self.dispatch(notification.channel, notification.payload)
+        finally:
+            connection.invalidate()
+
+    def dispatch(self, channel: str, payload: str) -> None:
+        handler = self._handlers.get(channel)
+        if handler is None:
+            return
+        try:
+            handler(payload)
+        except Exception as e:
+            print(f"Handling a notification on {channel} failed: {e}")
+            with self._lock:
+                self.errors += 1
+
+
+# One listener per process, shared by every module that follows a channel.
+notify_listener = NotifyListener(settings.DATABASE_LISTEN_URL or settings.DATABASE_URL)
+metrics.register("db_notify_listener", notify_listener.metrics)
@@ -0,0 +1,82 @@
+# backend/app/core/pool.py
+
+import threading
+import time
+from typing import Any, Dict
+
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+
+class PoolWaitStats:
+    """Counters for how long callers waited to check out a connection."""
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def record(self, seconds: float, timed_out: bool) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self.timeouts += timed_out
+            self.total_wait += seconds
+            self.max_wait = max(self.max_wait, seconds)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "avg_wait_ms": round(self.total_wait / self.checkouts * 1000, 3) if self.checkouts else 0.0,
+                "max_wait_ms": round(self.max_wait * 1000, 3),
+            }
+
+
+class _WaitTrackingMixin:
+    """
+    Times every checkout from the pool, including the ones that give up after
+    pool_timeout. A wait that is consistently above zero means the pool is too
+    small for the load.
+    """
+    @property
+    def wait_stats(self) -> PoolWaitStats:
+        # Pools are recreated on dispose(), so the counters are attached lazily.
+        return self.__dict__.setdefault("_wait_stats", PoolWaitStats())
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            self.wait_stats.record(time.perf_counter() - started, timed_out=True)
+            raise
+        self.wait_stats.record(time.perf_counter() - started, timed_out=False)
+        return connection
+
+
+class InstrumentedQueuePool(_WaitTrackingMixin, QueuePool):
+    pass
+
+
+class InstrumentedAsyncQueuePool(_WaitTrackingMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+def pool_metrics(engine: Engine) -> Dict[str, Any]:
+    """Occupancy and checkout wait times of an engine's connection pool."""
+    pool = engine.pool
+    if not isinstance(pool, QueuePool):
+        return {"pool": type(pool).__name__}
+    return {
+        "size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "idle": pool.checkedin(),
+        # QueuePool counts overflow from -size; only connections beyond the
+        # regular pool are reported here.
+        "overflow": max(pool.overflow(), 0),
+        "max_overflow": pool._max_overflow,
+        **(pool.wait_stats.snapshot() if isinstance(pool, _WaitTrackingMixin) else {}),
+    }
@@ -0,0 +1,52 @@
+# backend/app/core/ratelimit.py
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable
+
+
+class TokenBucketLimiter:
+    """
+    Thread-safe, per-key token buckets held in memory.
+
+    Each key may spend up to `burst` tokens at once, refilled at `rate` tokens
+    per second. At most `max_keys` buckets are kept; the least recently used
+    is dropped first, which only ever resets a key to a full bucket.
+    """
+    def __init__(self, rate: float, burst: float, max_keys: int = 100_000):
+        self.rate = rate
+        self.burst = burst
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[Hashable, tuple[float, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.allowed = 0
+        self.limited = 0
+
+    def acquire(self, key: Hashable, cost: float = 1.0) -> float:
+        """
+        Takes `cost` tokens from `key`'s bucket. Returns 0 when they were
+        available, otherwise the seconds until they will be (nothing is taken).
+        """
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.pop(key, (self.burst, now))
+            tokens = min(self.burst, tokens + (now - updated) * self.rate)
+            if tokens >= cost:
+                tokens -= cost
+                wait = 0.0
+                self.allowed += 1
+            else:
+                wait = (cost - tokens) / self.rate
+                self.limited += 1
+            self._buckets[key] = (tokens, now)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+            return wait
+
+    def clear(self) -> None:
+        with self._lock:
+            self._buckets.clear()
+
+    def metrics(self) -> Dict[str, Any]:
+        return {"keys": len(self._buckets), "allowed": self.allowed, "limited": self.limited}
@@ -0,0 +1,58 @@
+# backend/app/core/sql.py
+
+from sqlalchemy import DateTime, literal_column
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.functions import FunctionElement
+
+# strftime patterns that reproduce date_trunc on SQLite (used by the test
+# suite). The output matches the format SQLAlchemy stores DateTime values in,
+# so truncated values compare correctly against stored ones.
+_SQLITE_TRUNC_FORMATS = {
+    "minute": "%Y-%m-%d %H:%M:00.000000",
+    "hour": "%Y-%m-%d %H:00:00.000000",
+    "day": "%Y-%m-%d 00:00:00.000000",
+    "month": "%Y-%m-01 00:00:00.000000",
+}
+
+
+class date_trunc(FunctionElement):
+    """
+    Portable `date_trunc(unit, expr)` in UTC, whatever the session's TimeZone.
+    Compiles to the native function on Postgres and to strftime on SQLite.
+    """
+    type = DateTime(timezone=True)
+    inherit_cache = True
+    name = "date_trunc"
+
+    def __init__(self, unit: str, expr):
+        if unit not in _SQLITE_TRUNC_FORMATS:
+            raise ValueError(f"Unsupported date_trunc unit: {unit}")
+        super().__init__(literal_column(f"'{unit}'"), expr)
+
+
+@compiles(date_trunc)
+def _compile_date_trunc(element, compiler, **kw):
+    # Without the zone argument Postgres truncates timestamptz values at the
+    # session TimeZone's midnights (and, in zones with non-whole-hour offsets,
+    # hours), while rollup buckets are UTC-aligned.
+    return "date_trunc(%s, 'UTC')" % compiler.process(element.clauses, **kw)
+
+
+@compiles(date_trunc, "sqlite")
+def _compile_date_trunc_sqlite(element, compiler, **kw):
+    unit, expr = element.clauses.clauses
+    fmt = _SQLITE_TRUNC_FORMATS[unit.name.strip("'")]
+    return "strftime('%s', %s)" % (fmt, compiler.process(expr, **kw))
+
+
+def dialect_insert(db: Session):
+    """
+    Returns the dialect-specific `insert` construct for the session's database,
+    which is the one that supports `on_conflict_do_*`.
+    """
+    if db.get_bind().dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert
@@ -0,0 +1,140 @@
+# backend/app/core/table_cache.py
+
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, Optional
+
+from sqlalchemy import Row, Table, delete, func, select, update
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from .db import SessionLocal, run_blocking
+from .sql import dialect_insert
+
+# Expired and least-recently-used rows are trimmed every this many writes.
+_TRIM_EVERY = 100
+
+
+class TableCache:
+    """
+    TTL/LRU cache kept in a database table with `key`, `expires_at` and
+    `accessed_at` columns, so every worker shares it and it survives
+    restarts. Each operation runs in its own short session on the primary,
+    independent of the caller's transaction. Database errors are logged,
+    counted and treated as misses: a cache must never fail a request.
+    """
+    def __init__(
+        self,
+        table: Table,
+        name: str,
+        max_entries: int,
+        ttl_seconds: float,
+        session_factory: Callable[[], Session] = SessionLocal,
+    ):
+        self.table = table
+        self.name = name
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.session_factory = session_factory
+        self._lock = threading.Lock()
+        self._writes = 0
+        self._counters: Dict[str, int] = dict.fromkeys(
+            ("hits", "misses", "stores", "evictions", "expirations", "errors"), 0
+        )
+
+    def get(self, key: str, *columns: str) -> Optional[Row]:
+        """The given columns of a fresh entry, or None on a miss."""
+        now = datetime.now(timezone.utc)
+        # One statement both checks freshness and bumps the LRU clock.
+        stmt = update(self.table).where(
+            self.table.c.key == key, self.table.c.expires_at > now
+        ).values(accessed_at=now).returning(*(self.table.c[column] for column in columns))
+        row = self.run(lambda db: db.execute(stmt).first())
+        self.count("hits" if row is not None else "misses")
+        return row
+
+    def set(self, key: str, values: Dict[str, Any], check: Optional[Callable[[Session], bool]] = None) -> bool:
+        """
+        Inserts or replaces the entry with a fresh TTL. `check` runs first in
+        the same transaction and can veto the write by returning False.
+        Returns whether the entry was stored.
+        """
+        now = datetime.now(timezone.utc)
+        values = {
+            **values,
+            "key": key,
+            "expires_at": now + timedelta(seconds=self.ttl_seconds),
+            "accessed_at": now,
+        }
+
+        def write(db: Session) -> bool:
+            if check is not None and not check(db):
+                return False
+            stmt = dialect_insert(db)(self.table).values(**values)
+            db.execute(stmt.on_conflict_do_update(
+                index_elements=["key"],
+                set_={column: stmt.excluded[column] for column in values if column != "key"},
+            ))
+            return True
+
+        if not self.run(write):
+            return False
+        self.count("stores")
+        with self._lock:
+            self._writes += 1
+            trim = self._writes % _TRIM_EVERY == 0
+        if trim:
+            self.trim()
+        return True
+
+    def trim(self) -> None:
+        """Deletes expired rows, then the least recently used rows beyond `max_entries`."""
+        table = self.table
+        now = datetime.now(timezone.utc)
+
+        def prune(db: Session):
+            expired = db.execute(delete(table).where(table.c.expires_at <= now)).rowcount
+            overflow = select(table.c.key).order_by(table.c.accessed_at.desc()).offset(self.max_entries)
+            evicted = db.execute(delete(table).where(table.c.key.in_(overflow))).rowcount
+            return expired, evicted
+
+        expired, evicted = self.run(prune) or (0, 0)
+        self.count("expirations", expired)
+        self.count("evictions", evicted)
+
+    def size(self) -> Optional[int]:
+        return self.run(lambda db: db.execute(select(func.count()).select_from(self.table)).scalar())
+
+    def metrics(self) -> Dict[str, Any]:
+        # Counters only: a metrics scrape should not cost a database round trip
+        with self._lock:
+            counters = dict(self._counters)
+        lookups = counters["hits"] + counters["misses"]
+        return {
+            "max_entries": self.max_entries,
+            "hit_rate": round(counters["hits"] / lookups, 4) if lookups else 0.0,
+            **counters,
+        }
+
+    def run(self, operation: Callable[[Session], Any]) -> Any:
+        """Runs `operation` in its own committed session; None if the database failed."""
+        # Off the event loop even when called from async request handling
+        return run_blocking(lambda: self._run_in_session(operation))
+
+    def count(self, counter: str, amount: int = 1) -> None:
+        with self._lock:
+            self._counters[counter] = self._counters.get(counter, 0) + amount
+
+    def _run_in_session(self, operation: Callable[[Session], Any]) -> Any:
+        db = self.session_factory()
+        try:
+            result = operation(db)
+            db.commit()
+            return result
+        except SQLAlchemyError as e:
+            db.rollback()
+            print(f"{self.name} operation failed: {e}")
+            self.count("errors")
+            return None
+        finally:
+            db.close()
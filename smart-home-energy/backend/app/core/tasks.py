@@ -0,0 +1,73 @@
+# backend/app/core/tasks.py
+
+import threading
+import time
+from typing import Any, Callable, Dict
+
+
+class PeriodicTask:
+    """
+    Runs `fn` on a daemon thread every `interval` seconds, starting right
+    away. A failing run is logged and counted; the schedule carries on.
+    `stop` waits for a run in progress to finish.
+    """
+    def __init__(self, name: str, interval: float, fn: Callable[[], Any]):
+        self.name = name
+        self.interval = interval
+        self.fn = fn
+        self._stopping = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+        self.runs = 0
+        self.failures = 0
+        self.last_run_ms = 0.0
+        self.last_result: Any = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        if self.running:
+            return
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 30.0) -> None:
+        self._stopping.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def run_once(self) -> Any:
+        started = time.perf_counter()
+        try:
+            result = self.fn()
+            failed = False
+        except Exception as e:
+            print(f"Periodic task {self.name} failed: {e}")
+            result, failed = None, True
+        with self._lock:
+            self.runs += 1
+            self.failures += failed
+            self.last_run_ms = (time.perf_counter() - started) * 1000
+            if not failed:
+                self.last_result = result
+        return result
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "running": self.running,
+                "interval_seconds": self.interval,
+                "runs": self.runs,
+                "failures": self.failures,
+                "last_run_ms": round(self.last_run_ms, 3),
+                "last_result": self.last_result,
+            }
+
+    def _run(self) -> None:
+        while not self._stopping.is_set():
+            self.run_once()
+            self._stopping.wait(self.interval)
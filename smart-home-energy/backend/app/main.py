@@ -2,11 +2,59 @@
 
 import os
 import uvicorn
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
+from fastapi.concurrency import run_in_threadpool
 from .api.router import api_router
-from .core.db import engine, Base
+from .core.config import settings
+from .core.db import SessionLocal, async_engine, engine, Base
+from .core.notify import notify_listener
+from .modules.auth.hashing import password_hasher
+from .modules.conversational_ai.llm_client import llm_client
+from .modules.telemetry.ingest_queue import ingest_queue
+from .modules.telemetry.ownership import ownership_index
+from .modules.telemetry.partitions import partition_manager
+from .modules.telemetry.rollups import rollup_compactor
+from .modules.telemetry.retention import retention_configured, retention_job
 from fastapi.middleware.cors import CORSMiddleware
 
+def _warm_ownership_index() -> None:
+    db = SessionLocal()
+    try:
+        print(f"Loaded {ownership_index.warm(db)} devices into the ownership index.")
+    finally:
+        db.close()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Starts background workers on startup and drains them on shutdown."""
+    if settings.DEVICE_OWNERSHIP_WARM_ON_STARTUP:
+        await run_in_threadpool(_warm_ownership_index)
+    if settings.TELEMETRY_INGEST_MODE == "queued":
+        ingest_queue.start()
+    # Keeps future telemetry partitions created, one worker at a time; does
+    # nothing on an unpartitioned table.
+    partition_manager.start()
+    # Recomputes recently written rollup buckets exactly, one worker at a time.
+    if settings.TELEMETRY_ROLLUPS_ENABLED:
+        rollup_compactor.start()
+    if retention_configured():
+        retention_job.start()
+    # Relays other workers' ingests to this worker's live subscribers and
+    # device key changes to its key cache (Postgres only).
+    notify_listener.start()
+    yield
+    notify_listener.stop()
+    retention_job.stop()
+    rollup_compactor.stop()
+    partition_manager.stop()
+    # Write out every point that was acknowledged but not yet flushed.
+    await run_in_threadpool(ingest_queue.stop)
+    await run_in_threadpool(password_hasher.shutdown)
+    await llm_client.aclose()
+    if async_engine is not None:
+        await async_engine.dispose()
+
 # This line creates all the tables defined by our models in the database.
 # In a real production app, you would use a migration tool like Alembic.
 # For our prototype, this is sufficient.
@@ -14,7 +62,8 @@ from fastapi.middleware.cors import CORSMiddleware
 app = FastAPI(
     title="Smart Home Energy API",
     description="API for monitoring energy consumption of smart home devices.",
-    version="0.1.0"
+    version="0.1.0",
+    lifespan=lifespan,
 )
 
 origins = [
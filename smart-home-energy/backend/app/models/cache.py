@@ -0,0 +1,60 @@
+from sqlalchemy import BigInteger, Column, String, Text, DateTime, Index
+from sqlalchemy.dialects.postgresql import UUID
+from ..core.db import Base
+
+class StatsCacheEntry(Base):
+    """
+    StatsCacheEntry Model
+    A cached device stats response, shared by every API worker when
+    STATS_CACHE_BACKEND is "postgres". The window bounds let ingestion
+    invalidate only the entries its readings fall into.
+    """
+    __tablename__ = "stats_cache"
+
+    key = Column(String, primary_key=True)
+    device_id = Column(UUID(as_uuid=True), nullable=False)
+    window_start = Column(DateTime(timezone=True), nullable=False)
+    window_end = Column(DateTime(timezone=True), nullable=True) # NULL = open-ended ("up to now")
+    payload = Column(Text, nullable=False)
+    expires_at = Column(DateTime(timezone=True), nullable=False)
+    accessed_at = Column(DateTime(timezone=True), nullable=False)
+
+    __table_args__ = (
+        Index('ix_stats_cache_device_id', 'device_id'),
+        Index('ix_stats_cache_accessed_at', 'accessed_at'),
+    )
+
+
+class StatsCacheGeneration(Base):
+    """
+    StatsCacheGeneration Model
+    A per-device counter bumped by every stats cache invalidation. Readers
+    note it before computing a response and only cache the result if it is
+    unchanged, so data invalidated mid-computation is never cached.
+    """
+    __tablename__ = "stats_cache_generations"
+
+    device_id = Column(UUID(as_uuid=True), primary_key=True)
+    generation = Column(BigInteger, nullable=False, default=0)
+
+
+class LLMParseCacheEntry(Base):
+    """
+    LLMParseCacheEntry Model
+    A SQL plan produced by the LLM query parser, keyed by the normalized
+    question and a hash of the asker's device list. Relative time periods in
+    the question are bound as parameters, so one plan serves every date.
+    """
+    __tablename__ = "llm_parse_cache"
+
+    key = Column(String, primary_key=True)
+    question = Column(Text, nullable=False) # normalized, with {period_N} placeholders
+    device_set = Column(String, nullable=False)
+    sql_query = Column(Text, nullable=False)
+    summary_template = Column(Text, nullable=False)
+    expires_at = Column(DateTime(timezone=True), nullable=False)
+    accessed_at = Column(DateTime(timezone=True), nullable=False)
+
+    __table_args__ = (
+        Index('ix_llm_parse_cache_accessed_at', 'accessed_at'),
+    )
@@ -5,12 +5,14 @@ from sqlalchemy import (
     ForeignKey,
     DateTime,
     func,
-    DECIMAL,
+    Integer,
     PrimaryKeyConstraint,
+    Index,
 )
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, declared_attr
 from sqlalchemy.dialects.postgresql import UUID
 from ..core.db import Base
+from .types import energy_type
 
 class Device(Base):
     """
@@ -24,6 +26,8 @@ class Device(Base):
     type = Column(String, default="APPLIANCE")
     
     owner_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
+    # HMAC-SHA256 (hex) of the device's ingest API key; NULL when it has none
+    api_key_hash = Column(String(64), nullable=True)
     
     # Establishes a bidirectional relationship between Device and User
     owner = relationship("User", back_populates="devices")
@@ -39,10 +43,58 @@ class Telemetry(Base):
 
     device_id = Column(UUID(as_uuid=True), ForeignKey("devices.id"), nullable=False)
     timestamp = Column(DateTime(timezone=True), nullable=False, default=func.now())
-    energy_usage = Column(DECIMAL(10, 4), nullable=False) # e.g., 123456.7890
+    energy_usage = Column(energy_type(), nullable=False) # e.g., 123456.7890
 
     # This creates a composite primary key, which also automatically creates
     # the essential index on (device_id, timestamp) for fast time-series queries.
+    # On Postgres the key also carries energy_usage, so per-device aggregates
+    # are index-only scans, and a BRIN index on timestamp serves time-only
+    # filters across devices at a tiny fraction of a B-tree's size.
+    # The table is range-partitioned by timestamp; partitions are created by
+    # the migration and the partition manager and inherit both indexes.
     __table_args__ = (
-        PrimaryKeyConstraint('device_id', 'timestamp'),
-    )
\ No newline at end of file
+        PrimaryKeyConstraint('device_id', 'timestamp', postgresql_include=['energy_usage']),
+        Index(
+            'ix_telemetry_timestamp_brin', 'timestamp',
+            postgresql_using='brin', postgresql_with={'autosummarize': 'on'},
+        ),
+        {"postgresql_partition_by": "RANGE (timestamp)"},
+    )
+
+
+class TelemetryRollupMixin:
+    """
+    Columns shared by the pre-aggregated telemetry rollup tables.
+    Each row summarises one device over one time bucket (UTC-aligned).
+    """
+    @declared_attr
+    def device_id(cls):
+        return Column(UUID(as_uuid=True), ForeignKey("devices.id"), nullable=False)
+
+    bucket = Column(DateTime(timezone=True), nullable=False)
+    total_energy = Column(energy_type(total=True), nullable=False)
+    sample_count = Column(Integer, nullable=False)
+    min_energy = Column(energy_type(), nullable=False)
+    max_energy = Column(energy_type(), nullable=False)
+    # When the bucket was last recomputed; stats deltas and ETags are derived from it
+    updated_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+
+    @declared_attr
+    def __table_args__(cls):
+        return (PrimaryKeyConstraint('device_id', 'bucket'),)
+
+
+class TelemetryHourly(TelemetryRollupMixin, Base):
+    """
+    TelemetryHourly Model
+    Hourly rollup of telemetry, refreshed from raw rows as points are ingested.
+    """
+    __tablename__ = "telemetry_hourly"
+
+
+class TelemetryDaily(TelemetryRollupMixin, Base):
+    """
+    TelemetryDaily Model
+    Daily rollup of telemetry, refreshed from the hourly rollup.
+    """
+    __tablename__ = "telemetry_daily"
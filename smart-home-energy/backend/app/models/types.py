@@ -0,0 +1,56 @@
+# backend/app/models/types.py
+
+from sqlalchemy import DECIMAL, BigInteger, Integer
+from sqlalchemy.types import TypeDecorator
+
+from ..core.config import settings
+
+# Stored units per unit of energy_usage: readings are kept as whole
+# milliwatt-hours, i.e. rounded to three decimals.
+MILLI = 1000
+
+
+def to_milliwatt_hours(value: float) -> int:
+    return round(value * MILLI)
+
+
+class MilliwattHours(TypeDecorator):
+    """
+    An energy amount stored as an integer count of milliwatt-hours and
+    exposed to Python as a float.
+
+    Sums are exact: the database adds integers (SUM over INTEGER/BIGINT
+    yields BIGINT/NUMERIC, never a float), and the total is rounded to a float
+    only once, when it is read. No Decimal ever reaches application code.
+    """
+    impl = Integer
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        return None if value is None else to_milliwatt_hours(value)
+
+    def process_result_value(self, value, dialect):
+        return None if value is None else float(value) / MILLI
+
+
+class MilliwattHoursTotal(MilliwattHours):
+    """MilliwattHours wide enough for totals over many readings."""
+    impl = BigInteger
+
+
+def energy_storage_value(value: float):
+    """The value as the database stores it, for writers that bypass the column type (e.g. COPY)."""
+    if settings.TELEMETRY_ENERGY_STORAGE == "milliwatt_hours":
+        return to_milliwatt_hours(value)
+    return value
+
+
+def energy_type(total: bool = False):
+    """
+    Column type for energy amounts, chosen by TELEMETRY_ENERGY_STORAGE; it
+    must match what the migrations created. The decimal type also returns
+    floats so aggregates never go through Decimal.
+    """
+    if settings.TELEMETRY_ENERGY_STORAGE == "milliwatt_hours":
+        return MilliwattHoursTotal() if total else MilliwattHours()
+    return DECIMAL(16, 4, asdecimal=False) if total else DECIMAL(10, 4, asdecimal=False)
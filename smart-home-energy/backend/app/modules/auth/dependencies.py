@@ -4,21 +4,26 @@ from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.orm import Session
 from jose import JWTError, jwt
+from pydantic import ValidationError
 
 from app.core.config import settings
-from app.core.db import get_db
+from app.core.db import get_session, run_db
 from app.models.user import User
 from . import schemas, service
+from .user_cache import cache_user, get_cached_user
 
 # This tells FastAPI where to look for the token ("tokenUrl" is the login endpoint)
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login")
 
-def get_current_user(
-    token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)
+async def get_current_user(
+    token: str = Depends(oauth2_scheme), db: Session = Depends(get_session)
 ) -> User:
     """
     Decodes the JWT token to get the current user.
     This is a dependency that can be injected into any protected endpoint.
+    Resolved users are cached briefly, so most requests cost one decode and a
+    dict lookup; a miss is a primary-key lookup for tokens carrying a `uid`.
+    The returned user may be detached from `db`.
     """
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
@@ -32,11 +37,20 @@ def get_current_user(
         email: str | None = payload.get("sub")
         if email is None:
             raise credentials_exception
-        token_data = schemas.TokenData(email=email)
-    except JWTError:
+        token_data = schemas.TokenData(email=email, user_id=payload.get("uid"))
+    except (JWTError, ValidationError):
         raise credentials_exception
-    
-    user = service.get_user_by_email(db, email=token_data.email)
-    if user is None:
+
+    cache_key = token_data.user_id or token_data.email
+    user = get_cached_user(cache_key)
+    if user is not None:
+        return user
+
+    if token_data.user_id is not None:
+        user = await run_db(db, service.get_user_by_id, token_data.user_id)
+    else:
+        user = await run_db(db, service.get_user_by_email, email=token_data.email)
+    if user is None or not user.is_active:
         raise credentials_exception
-    return user
\ No newline at end of file
+    cache_user(cache_key, user)
+    return user
@@ -1,42 +1,73 @@
 # backend/app/modules/auth/endpoints.py
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
 from datetime import timedelta
 
-from app.core.db import get_db
+from app.core.db import get_session, run_db
 from app.core.config import settings
-from . import schemas, service
+from . import limits, schemas, service
+from .hashing import HasherBusy, password_hasher
 
 router = APIRouter(
     prefix="/auth",
     tags=["Authentication"]
 )
 
-@router.post("/register", response_model=schemas.UserPublic, status_code=status.HTTP_201_CREATED)
-def register_user(user: schemas.UserCreate, db: Session = Depends(get_db)):
+def _client_ip(request: Request) -> str:
+    return request.client.host if request.client else "unknown"
+
+async def _run_hasher(operation):
+    """Awaits a password hasher call, turning a saturated pool into 503."""
+    try:
+        return await operation
+    except HasherBusy:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Authentication is busy, please retry shortly.",
+            headers={"Retry-After": "1"},
+        )
+
+@router.post(
+    "/register",
+    response_model=schemas.UserPublic,
+    status_code=status.HTTP_201_CREATED,
+    responses={429: {"description": "Too many attempts"}, 503: {"description": "Password hashing is saturated"}},
+)
+async def register_user(request: Request, user: schemas.UserCreate, db: Session = Depends(get_session)):
     """
     Register a new user.
     """
-    db_user = service.get_user_by_email(db, email=user.email)
+    limits.enforce(limits.ip_limiter, _client_ip(request))
+    db_user = await run_db(db, service.get_user_by_email, email=user.email)
     if db_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Email already registered",
         )
-    new_user = service.create_user(db=db, user=user)
+    # bcrypt is CPU-bound, so it runs on the hasher's process pool, never on the
+    # event loop or the request threadpool
+    password_hash = await _run_hasher(password_hasher.hash(user.password))
+    new_user = await run_db(db, service.create_user, user=user, password_hash=password_hash)
     return new_user
 
-@router.post("/login", response_model=schemas.Token)
-def login_for_access_token(
-    form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)
+@router.post(
+    "/login",
+    response_model=schemas.Token,
+    responses={429: {"description": "Too many attempts"}, 503: {"description": "Password hashing is saturated"}},
+)
+async def login_for_access_token(
+    request: Request, form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_session)
 ):
     """
     Authenticate user and return a JWT access token.
+    Attempts are rate limited per client IP and per account.
     """
-    user = service.get_user_by_email(db, email=form_data.username)
-    if not user or not service.verify_password(form_data.password, str(user.password_hash)):
+    limits.enforce(limits.ip_limiter, _client_ip(request))
+    limits.enforce(limits.account_limiter, form_data.username.lower())
+    user = await run_db(db, service.get_user_by_email, email=form_data.username)
+    if not user or not await _run_hasher(password_hasher.verify(form_data.password, str(user.password_hash))):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
@@ -45,7 +76,7 @@ def login_for_access_token(
     
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = service.create_access_token(
-        subject=user.email, expires_delta=access_token_expires
+        subject=user.email, expires_delta=access_token_expires, user_id=user.id
     )
     
     return {"access_token": access_token, "token_type": "bearer"}
\ No newline at end of file
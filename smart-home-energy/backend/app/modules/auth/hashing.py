@@ -0,0 +1,73 @@
+# backend/app/modules/auth/hashing.py
+
+import asyncio
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict
+
+from app.core import metrics
+from app.core.config import settings
+from . import service
+
+
+class HasherBusy(Exception):
+    """Raised when too many password hashes are already queued."""
+
+
+class PasswordHasher:
+    """
+    Runs bcrypt on a dedicated process pool so login and register storms use
+    their own CPU budget instead of the event loop or the request threadpool.
+    At most `max_pending` operations may be queued or running; beyond that
+    callers get HasherBusy immediately rather than waiting in line.
+    The pool is started on first use.
+    """
+    def __init__(self, workers: int, max_pending: int):
+        self.workers = workers
+        self.max_pending = max_pending
+        self._executor: ProcessPoolExecutor | None = None
+        self._lock = threading.Lock()
+        self._pending = 0
+        self.completed = 0
+        self.rejected = 0
+
+    async def hash(self, password: str) -> str:
+        return await self._submit(service.get_password_hash, password)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return await self._submit(service.verify_password, plain_password, hashed_password)
+
+    async def _submit(self, fn: Callable[..., Any], *args: Any) -> Any:
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self.rejected += 1
+                raise HasherBusy()
+            self._pending += 1
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            executor = self._executor
+        try:
+            return await asyncio.get_running_loop().run_in_executor(executor, fn, *args)
+        finally:
+            with self._lock:
+                self._pending -= 1
+                self.completed += 1
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "workers": self.workers,
+            "pending": self._pending,
+            "max_pending": self.max_pending,
+            "completed": self.completed,
+            "rejected": self.rejected,
+        }
+
+
+password_hasher = PasswordHasher(settings.AUTH_HASH_WORKERS, settings.AUTH_HASH_MAX_PENDING)
+metrics.register("password_hasher", password_hasher.metrics)
@@ -0,0 +1,27 @@
+# backend/app/modules/auth/limits.py
+
+import math
+from typing import Hashable
+
+from fastapi import HTTPException, status
+
+from app.core import metrics
+from app.core.config import settings
+from app.core.ratelimit import TokenBucketLimiter
+
+# Login attempts per target account and per client IP; registrations share the
+# per-IP budget. Rates are configured per minute.
+account_limiter = TokenBucketLimiter(settings.AUTH_LOGIN_ACCOUNT_RATE_PER_MINUTE / 60, settings.AUTH_LOGIN_ACCOUNT_BURST)
+ip_limiter = TokenBucketLimiter(settings.AUTH_LOGIN_IP_RATE_PER_MINUTE / 60, settings.AUTH_LOGIN_IP_BURST)
+metrics.register("auth_rate_limits", lambda: {"account": account_limiter.metrics(), "ip": ip_limiter.metrics()})
+
+
+def enforce(limiter: TokenBucketLimiter, key: Hashable) -> None:
+    """Raises 429 with a Retry-After header when `key` is out of tokens."""
+    wait = limiter.acquire(key)
+    if wait:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many authentication attempts, please retry later.",
+            headers={"Retry-After": str(math.ceil(wait))},
+        )
@@ -17,9 +17,11 @@ class Token(BaseModel):
 class TokenData(BaseModel):
     """
     Schema for the data encoded within the JWT.
-    Contains the identifier for the user.
+    Contains the identifiers for the user; `user_id` is missing from tokens
+    issued before it was added.
     """
     email: EmailStr | None = None
+    user_id: uuid.UUID | None = None
 
 
 # --- User Schemas ---
@@ -1,6 +1,7 @@
 # backend/app/modules/auth/service.py
 
 from datetime import datetime, timedelta, timezone
+import uuid
 from typing import Any
 from jose import jwt
 from passlib.context import CryptContext
@@ -9,6 +10,7 @@ from sqlalchemy.orm import Session
 from app.core.config import settings
 from app.models.user import User
 from . import schemas
+from .user_cache import invalidate_user
 
 # Password hashing context using bcrypt
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
@@ -25,19 +27,45 @@ def get_user_by_email(db: Session, email: str) -> User | None:
     """Fetches a user from the database by their email."""
     return db.query(User).filter(User.email == email).first()
 
-def create_user(db: Session, user: schemas.UserCreate) -> User:
-    """Creates a new user in the database."""
-    hashed_password = get_password_hash(user.password)
+def get_user_by_id(db: Session, user_id: uuid.UUID) -> User | None:
+    """Fetches a user from the database by primary key."""
+    return db.get(User, user_id)
+
+def create_user(db: Session, user: schemas.UserCreate, password_hash: str | None = None) -> User:
+    """
+    Creates a new user in the database.
+    Pass `password_hash` when the password was already hashed elsewhere (e.g.
+    off the event loop); otherwise it is hashed here.
+    """
+    hashed_password = password_hash or get_password_hash(user.password)
     db_user = User(email=user.email, password_hash=hashed_password)
     db.add(db_user)
     db.commit()
     db.refresh(db_user)
     return db_user
 
-def create_access_token(subject: Any, expires_delta: timedelta | None = None) -> str:
+def change_password(db: Session, user: User, password_hash: str) -> User:
+    """Stores a new (already hashed) password and drops the user's cached identity."""
+    user.password_hash = password_hash
+    db.commit()
+    invalidate_user(user)
+    return user
+
+def set_user_active(db: Session, user: User, is_active: bool) -> User:
+    """Activates or deactivates a user; a deactivated user's tokens stop working."""
+    user.is_active = is_active
+    db.commit()
+    invalidate_user(user)
+    return user
+
+def create_access_token(
+    subject: Any, expires_delta: timedelta | None = None, user_id: uuid.UUID | None = None
+) -> str:
     """
     Creates a new JWT access token.
     'subject' is the data to encode in the token (e.g., user's email or ID).
+    'user_id', when given, is added as the `uid` claim so the user can be
+    resolved by primary key.
     """
     if expires_delta:
         expire = datetime.now(timezone.utc) + expires_delta
@@ -45,5 +73,7 @@ def create_access_token(subject: Any, expires_delta: timedelta | None = None) ->
         expire = datetime.now(timezone.utc) + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     
     to_encode = {"exp": expire, "sub": str(subject)}
+    if user_id is not None:
+        to_encode["uid"] = str(user_id)
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
     return encoded_jwt
\ No newline at end of file
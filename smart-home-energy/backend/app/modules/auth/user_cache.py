@@ -0,0 +1,42 @@
+# backend/app/modules/auth/user_cache.py
+
+from typing import Any, Dict, Hashable, Optional
+
+from sqlalchemy.orm import make_transient_to_detached
+
+from app.core import metrics
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.models.user import User
+
+# Resolved users by token key: the user id for tokens carrying a `uid` claim,
+# the email subject for older tokens. Entries hold plain column values rather
+# than ORM instances, so no object is ever shared between requests.
+user_cache = TTLCache(settings.AUTH_USER_CACHE_MAX_ENTRIES, settings.AUTH_USER_CACHE_TTL_SECONDS)
+metrics.register("auth_user_cache", user_cache.metrics)
+
+_COLUMNS = [column.key for column in User.__table__.columns]
+
+
+def get_cached_user(key: Hashable) -> Optional[User]:
+    """
+    Returns a detached User built from the cached snapshot, or None on a miss.
+    The instance carries its identity, so `db.merge(user, load=False)` attaches
+    it to a session without a query.
+    """
+    snapshot: Optional[Dict[str, Any]] = user_cache.get(key)
+    if snapshot is None:
+        return None
+    user = User(**snapshot)
+    make_transient_to_detached(user)
+    return user
+
+
+def cache_user(key: Hashable, user: User) -> None:
+    user_cache.set(key, {column: getattr(user, column) for column in _COLUMNS})
+
+
+def invalidate_user(user: User) -> None:
+    """Drops every cached entry for `user`, whichever kind of token produced it."""
+    user_cache.delete(user.id)
+    user_cache.delete(user.email)
@@ -1,9 +1,10 @@
 # backend/app/modules/conversational_ai/endpoints.py
 
 from fastapi import APIRouter, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.core.db import get_db
+from app.core.db import get_read_session
 from app.models.user import User
 from ..auth.dependencies import get_current_user
 from . import schemas
@@ -16,14 +17,15 @@ router = APIRouter(
 )
 
 @router.post("/", response_model=schemas.QueryResponse)
-def get_query_answer(
+async def get_query_answer(
     request: schemas.QueryRequest,
-    db: Session = Depends(get_db),
+    db: Session | AsyncSession = Depends(get_read_session),
     current_user: User = Depends(get_current_user),
 ):
     """
     Accepts a natural language question and returns a structured answer.
+    LLM calls are awaited on the shared async client, and database work goes
+    through run_db, so a slow model no longer holds a worker thread.
     """
     service = ConversationalService(db=db, user=current_user)
-    answer = service.answer_question(question=request.question)
-    return answer
\ No newline at end of file
+    return await service.answer_question(question=request.question)
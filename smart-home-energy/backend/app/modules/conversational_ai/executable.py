@@ -1,14 +1,16 @@
 # backend/app/modules/conversational_ai/executables.py
 
 from abc import ABC, abstractmethod
-from sqlalchemy import func, text
+from sqlalchemy import text
 from sqlalchemy.orm import Session
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 import uuid
-from datetime import datetime
+from datetime import datetime, timedelta
 
 from app.models.user import User
 from app.models.device import Telemetry
+from app.modules.telemetry.rollups import aggregate_buckets
+from app.modules.telemetry.service import get_owned_device_ids
 
 class ExecutableQuery(ABC):
     """An abstract class representing a query that can be executed."""
@@ -27,9 +29,8 @@ class StructuredExecutable(ExecutableQuery):
         self.kwargs = kwargs
 
     def execute(self, db: Session, user: User) -> Dict[str, Any]:
-        user_owned_device_ids = {str(d.id) for d in user.devices}
-        query_device_ids = {str(d_id) for d_id in self.device_ids}
-        if not query_device_ids.issubset(user_owned_device_ids):
+        user_owned_device_ids = get_owned_device_ids(db, user.id, self.device_ids)
+        if not set(self.device_ids).issubset(user_owned_device_ids):
             raise PermissionError("Attempted to query unauthorized devices.")
 
         base_query = db.query(Telemetry).filter(
@@ -39,28 +40,39 @@ class StructuredExecutable(ExecutableQuery):
         )
 
         if self.metric in ["SUM", "AVG", "MIN", "MAX"]:
-            metric_map = {"SUM": func.sum(Telemetry.energy_usage), "AVG": func.avg(Telemetry.energy_usage), "MIN": func.min(Telemetry.energy_usage), "MAX": func.max(Telemetry.energy_usage)}
-            aggregate_function = metric_map[self.metric]
-            result_value = base_query.with_entities(aggregate_function).scalar()
-            return {"metric": self.metric, "value": float(result_value) if result_value else None, "kwargs": self.kwargs}
+            # Aggregates are combined from per-day buckets, which the rollup planner serves
+            # from pre-aggregated tables. Its ranges are half-open, time_end is inclusive.
+            buckets = aggregate_buckets(db, self.device_ids, self.time_start, self.time_end + timedelta(microseconds=1), "day")
+            total = sum(b.total_energy for b in buckets)
+            count = sum(b.sample_count for b in buckets)
+            metric_map = {
+                "SUM": total if buckets else None,
+                "AVG": total / count if count else None,
+                "MIN": min((b.min_energy for b in buckets), default=None),
+                "MAX": max((b.max_energy for b in buckets), default=None),
+            }
+            result_value = metric_map[self.metric]
+            return {"metric": self.metric, "value": result_value or None, "kwargs": self.kwargs}
         
         if self.metric == "LIST":
             results = base_query.order_by(Telemetry.timestamp.desc()).limit(100).all()
-            return {"metric": "LIST", "data": [{"timestamp": r.timestamp, "energy_usage": float(r.energy_usage)} for r in results], "kwargs": self.kwargs}
+            return {"metric": "LIST", "data": [{"timestamp": r.timestamp, "energy_usage": r.energy_usage} for r in results], "kwargs": self.kwargs}
 
         raise ValueError(f"Unsupported metric: {self.metric}")
 
 class RawSQLExecutable(ExecutableQuery):
     """An executable query built from a raw SQL string, with security gates."""
-    def __init__(self, sql_query: str, summary_template: str):
+    def __init__(self, sql_query: str, summary_template: str, params: Optional[Dict[str, Any]] = None):
         self.sql_query = sql_query.strip()
         self.summary_template = summary_template
+        # Extra bind parameters, e.g. the bounds of a cached plan's time periods
+        self.params = params or {}
 
     def execute(self, db: Session, user: User) -> Dict[str, Any]:
         if not self.sql_query.upper().startswith("SELECT"):
             raise PermissionError("Execution denied: Only SELECT queries are allowed.")
-        
-        params = {"user_id": str(user.id)}
+
+        params = {**self.params, "user_id": str(user.id)}
         print(f"params: {params}")
         result_proxy = db.execute(text(self.sql_query), params)
         results = [row._asdict() for row in result_proxy]
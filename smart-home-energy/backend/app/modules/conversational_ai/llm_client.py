@@ -0,0 +1,230 @@
+# backend/app/modules/conversational_ai/llm_client.py
+
+import asyncio
+import random
+import threading
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, TypeVar
+
+import anthropic
+import httpx
+
+from app.core import metrics
+from app.core.config import settings
+
+T = TypeVar("T")
+
+# Worth another attempt: the request never got an answer, or the API asked us
+# to slow down (429), is overloaded (529) or failed on its side (5xx).
+_RETRYABLE_STATUS = {408, 409, 429}
+
+
+class LLMTimeout(Exception):
+    """Raised when a call does not complete, retries included, before its deadline."""
+
+
+def _retryable(error: Exception) -> bool:
+    if isinstance(error, anthropic.APIConnectionError):  # includes APITimeoutError
+        return True
+    if isinstance(error, anthropic.APIStatusError):
+        return error.status_code in _RETRYABLE_STATUS or error.status_code >= 500
+    return False
+
+
+def _retry_after(error: Exception) -> float:
+    response = getattr(error, "response", None)
+    try:
+        return float(response.headers.get("retry-after", 0)) if response is not None else 0.0
+    except ValueError:
+        return 0.0
+
+
+class LLMClient:
+    """
+    The process-wide Anthropic client. One AsyncAnthropic, with its pooled
+    HTTP connections, is shared by every request instead of a client per
+    request. Each call gets a deadline that covers queueing, every attempt
+    and the backoff between them; at most `max_concurrency` calls are on the
+    wire at once, and retryable failures are retried with full-jitter
+    exponential backoff (honouring Retry-After). The SDK's own retries are
+    disabled so the deadline accounts for all of them.
+    """
+    def __init__(
+        self,
+        api_key: Optional[str],
+        base_url: Optional[str] = None,
+        max_concurrency: int = 8,
+        max_connections: int = 20,
+        deadline_seconds: float = 30.0,
+        max_retries: int = 3,
+        backoff_seconds: float = 0.5,
+        backoff_max_seconds: float = 8.0,
+    ):
+        self.api_key = api_key
+        self.base_url = base_url
+        self.max_concurrency = max_concurrency
+        self.max_connections = max_connections
+        self.deadline_seconds = deadline_seconds
+        self.max_retries = max_retries
+        self.backoff_seconds = backoff_seconds
+        self.backoff_max_seconds = backoff_max_seconds
+        self._lock = threading.Lock()
+        self._client: Optional[anthropic.AsyncAnthropic] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self.in_flight = 0
+        self.waiting = 0
+        self.calls = 0
+        self.retries = 0
+        self.timeouts = 0
+        self.failures = 0
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.api_key)
+
+    async def create_message(self, deadline_seconds: Optional[float] = None, **request: Any) -> Any:
+        """`messages.create(**request)` within the deadline, retrying what is worth retrying."""
+        client, semaphore = self._bind()
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + (deadline_seconds or self.deadline_seconds)
+        self._count("calls")
+        attempt = 0
+        while True:
+            remaining = deadline - loop.time()
+            try:
+                if remaining <= 0:
+                    raise asyncio.TimeoutError()
+                return await asyncio.wait_for(self._attempt(client, semaphore, request, remaining), remaining)
+            except asyncio.TimeoutError:
+                self._count("timeouts")
+                raise LLMTimeout(f"LLM call did not complete within {deadline_seconds or self.deadline_seconds}s")
+            except Exception as e:
+                attempt += 1
+                delay = random.uniform(0, min(self.backoff_max_seconds, self.backoff_seconds * 2 ** (attempt - 1)))
+                delay = max(delay, _retry_after(e))
+                if not _retryable(e) or attempt > self.max_retries or loop.time() + delay >= deadline:
+                    self._count("failures")
+                    raise
+                self._count("retries")
+                await asyncio.sleep(delay)
+
+    async def _attempt(self, client: anthropic.AsyncAnthropic, semaphore: asyncio.Semaphore, request: Dict[str, Any], timeout: float) -> Any:
+        self._count("waiting")
+        try:
+            await semaphore.acquire()
+        finally:
+            self._count("waiting", -1)
+        self._count("in_flight")
+        try:
+            return await client.messages.create(**request, timeout=timeout)
+        finally:
+            self._count("in_flight", -1)
+            semaphore.release()
+
+    def _bind(self) -> tuple[anthropic.AsyncAnthropic, asyncio.Semaphore]:
+        """
+        The client's connections and the semaphore belong to one event loop,
+        so they are (re)created on first use from a loop. In the server that
+        happens once; a script or test running several loops gets fresh ones.
+        """
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if self._loop is not loop:
+                limits = httpx.Limits(max_connections=self.max_connections, max_keepalive_connections=self.max_connections)
+                self._client = anthropic.AsyncAnthropic(
+                    api_key=self.api_key,
+                    base_url=self.base_url,
+                    max_retries=0,
+                    http_client=anthropic.DefaultAsyncHttpxClient(limits=limits),
+                )
+                self._semaphore = asyncio.Semaphore(self.max_concurrency)
+                self._loop = loop
+            return self._client, self._semaphore
+
+    async def aclose(self) -> None:
+        with self._lock:
+            client, self._client, self._loop = self._client, None, None
+        if client is not None:
+            await client.close()
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "max_concurrency": self.max_concurrency,
+            "in_flight": self.in_flight,
+            "waiting": self.waiting,
+            "calls": self.calls,
+            "retries": self.retries,
+            "timeouts": self.timeouts,
+            "failures": self.failures,
+        }
+
+    def _count(self, counter: str, amount: int = 1) -> None:
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + amount)
+
+
+class _LeaderCancelled(Exception):
+    pass
+
+
+class Coalescer:
+    """
+    Runs at most one call per key at a time: callers arriving while a call
+    with their key is in flight wait for it and share its result (or its
+    exception) instead of starting their own. If the caller doing the work
+    is cancelled, one of the waiters takes over.
+    """
+    def __init__(self):
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+        self.started = 0
+        self.coalesced = 0
+
+    async def run(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        while (future := self._inflight.get(key)) is not None:
+            self.coalesced += 1
+            try:
+                # Shielded: a waiter that is cancelled must not cancel the shared future
+                return await asyncio.shield(future)
+            except _LeaderCancelled:
+                continue
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        self.started += 1
+        try:
+            result = await fn()
+        except asyncio.CancelledError:
+            self._settle(future, exception=_LeaderCancelled())
+            raise
+        except Exception as e:
+            self._settle(future, exception=e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            del self._inflight[key]
+
+    @staticmethod
+    def _settle(future: asyncio.Future, exception: BaseException) -> None:
+        future.set_exception(exception)
+        # Mark it retrieved, so a future nobody waited on is not logged as unhandled
+        future.exception()
+
+    def metrics(self) -> Dict[str, Any]:
+        return {"in_flight": len(self._inflight), "started": self.started, "coalesced": self.coalesced}
+
+
+llm_client = LLMClient(
+    api_key=settings.ANTHROPIC_API_KEY,
+    base_url=settings.ANTHROPIC_BASE_URL,
+    max_concurrency=settings.LLM_MAX_CONCURRENCY,
+    max_connections=settings.LLM_MAX_CONNECTIONS,
+    deadline_seconds=settings.LLM_REQUEST_DEADLINE_SECONDS,
+    max_retries=settings.LLM_MAX_RETRIES,
+    backoff_seconds=settings.LLM_RETRY_BACKOFF_SECONDS,
+    backoff_max_seconds=settings.LLM_RETRY_BACKOFF_MAX_SECONDS,
+)
+question_coalescer = Coalescer()
+metrics.register("llm_client", lambda: {**llm_client.metrics(), "questions": question_coalescer.metrics()})
@@ -0,0 +1,172 @@
+# backend/app/modules/conversational_ai/parse_cache.py
+
+import hashlib
+import re
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from sqlalchemy.orm import Session
+
+from app.core import metrics
+from app.core.config import settings
+from app.core.db import SessionLocal
+from app.core.table_cache import TableCache
+from app.models.cache import LLMParseCacheEntry
+from app.models.device import Device
+
+# Bump whenever the parser prompt changes what a plan means; older entries
+# then simply stop matching and age out.
+_PLAN_VERSION = "p2"
+
+_NUMBER_WORDS = {
+    "a": 1, "an": 1, "one": 1, "two": 2, "three": 3, "four": 4, "five": 5, "six": 6,
+    "seven": 7, "eight": 8, "nine": 9, "ten": 10, "twelve": 12, "fourteen": 14, "thirty": 30,
+}
+_ROLLING_UNITS = {"hour": timedelta(hours=1), "day": timedelta(days=1), "week": timedelta(weeks=1)}
+
+# Relative periods recognised in a normalized question. Calendar periods come
+# first so "last week" is the previous Monday-to-Monday rather than 7 days.
+_PERIOD_PATTERN = re.compile(
+    r"\b(?:(today|yesterday|this week|last week|this month|last month)"
+    r"|(?:last|past|previous) (\d+|" + "|".join(_NUMBER_WORDS) + r") (hour|day|week)s?"
+    r"|past (hour|day|week))\b"
+)
+
+
+@dataclass
+class Period:
+    """One relative period of a question, resolved against the time it was asked."""
+    phrase: str
+    start: datetime
+    end: datetime
+
+
+@dataclass
+class NormalizedQuestion:
+    """
+    A question reduced to the form plans are cached under: lower case, no
+    punctuation, and every relative period replaced by a {period_N}
+    placeholder whose bounds are bound as :period_N_start / :period_N_end.
+    """
+    text: str
+    periods: List[Period] = field(default_factory=list)
+
+    def params(self) -> Dict[str, datetime]:
+        params = {}
+        for number, period in enumerate(self.periods, start=1):
+            params[f"period_{number}_start"] = period.start
+            params[f"period_{number}_end"] = period.end
+        return params
+
+    def render(self, template: str) -> str:
+        """Puts the asked-for period phrases back into a cached summary template."""
+        for number, period in enumerate(self.periods, start=1):
+            template = template.replace(f"{{period_{number}}}", period.phrase)
+        return template
+
+
+@dataclass
+class ParsedPlan:
+    sql_query: str
+    summary_template: str
+
+
+def _month_start(ts: datetime, months_back: int = 0) -> datetime:
+    month_index = ts.year * 12 + ts.month - 1 - months_back
+    return ts.replace(year=month_index // 12, month=month_index % 12 + 1, day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def _resolve(match: re.Match, now: datetime) -> Period:
+    """Half-open [start, end) bounds in UTC for one matched period phrase."""
+    calendar, amount, unit, single_unit = match.groups()
+    midnight = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    monday = midnight - timedelta(days=now.weekday())
+    if calendar == "today":
+        start, end = midnight, midnight + timedelta(days=1)
+    elif calendar == "yesterday":
+        start, end = midnight - timedelta(days=1), midnight
+    elif calendar == "this week":
+        start, end = monday, monday + timedelta(weeks=1)
+    elif calendar == "last week":
+        start, end = monday - timedelta(weeks=1), monday
+    elif calendar == "this month":
+        start, end = _month_start(now), _month_start(now, -1)
+    elif calendar == "last month":
+        start, end = _month_start(now, 1), _month_start(now)
+    else:
+        count = 1 if single_unit else int(_NUMBER_WORDS.get(amount, amount))
+        start, end = now - count * _ROLLING_UNITS[unit or single_unit], now
+    return Period(phrase=match.group(0), start=start, end=end)
+
+
+def normalize_question(question: str, now: Optional[datetime] = None) -> NormalizedQuestion:
+    """
+    Normalizes a question so paraphrases that differ only in case,
+    punctuation, spacing or which relative period they ask about share one
+    cached plan. "How much did my fridge use yesterday?" and "how much did my
+    fridge use last week" both become "how much did my fridge use {period_1}".
+    """
+    now = now or datetime.now(timezone.utc)
+    text = question.lower().replace("’", "'")
+    text = re.sub(r"[^\w\s'-]", " ", text)
+    text = " ".join(text.split())
+
+    periods: List[Period] = []
+
+    def substitute(match: re.Match) -> str:
+        periods.append(_resolve(match, now))
+        return f"{{period_{len(periods)}}}"
+
+    return NormalizedQuestion(text=_PERIOD_PATTERN.sub(substitute, text), periods=periods)
+
+
+def device_set_hash(devices: Sequence[Device]) -> str:
+    """Hash of the device ids and names the parser prompt is built from."""
+    listing = "\n".join(sorted(f"{d.id}={d.name}" for d in devices))
+    return hashlib.sha256(listing.encode()).hexdigest()
+
+
+def make_key(normalized: NormalizedQuestion, device_set: str, model: str) -> str:
+    # Stored energy units change the SQL the model writes, so they are part of the key
+    parts = [_PLAN_VERSION, model, settings.TELEMETRY_ENERGY_STORAGE, device_set, normalized.text]
+    return hashlib.sha256("\n".join(parts).encode()).hexdigest()
+
+
+class ParseCache:
+    """
+    Parsed plans stored in the `llm_parse_cache` table, shared by every
+    worker and kept across restarts. Lookups run on the primary, independent
+    of the (possibly read-only) session answering the question.
+    """
+    def __init__(
+        self,
+        max_entries: int,
+        ttl_seconds: float,
+        session_factory: Callable[[], Session] = SessionLocal,
+    ):
+        self.store = TableCache(
+            LLMParseCacheEntry.__table__, "LLM parse cache", max_entries, ttl_seconds, session_factory
+        )
+
+    def get(self, key: str) -> Optional[ParsedPlan]:
+        row = self.store.get(key, "sql_query", "summary_template")
+        return ParsedPlan(*row) if row is not None else None
+
+    def set(self, key: str, normalized: NormalizedQuestion, device_set: str, plan: ParsedPlan) -> None:
+        self.store.set(key, {
+            "question": normalized.text,
+            "device_set": device_set,
+            "sql_query": plan.sql_query,
+            "summary_template": plan.summary_template,
+        })
+
+    def trim(self) -> None:
+        self.store.trim()
+
+    def metrics(self) -> Dict[str, Any]:
+        return {"enabled": settings.LLM_PARSE_CACHE_ENABLED, **self.store.metrics()}
+
+
+parse_cache = ParseCache(settings.LLM_PARSE_CACHE_MAX_ENTRIES, settings.LLM_PARSE_CACHE_TTL_SECONDS)
+metrics.register("llm_parse_cache", parse_cache.metrics)
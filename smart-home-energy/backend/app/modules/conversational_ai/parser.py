@@ -2,22 +2,35 @@
 
 from typing import Optional, List
 from datetime import datetime, timedelta, timezone
+import asyncio
 import json
-import anthropic
 from abc import ABC, abstractmethod
+from fastapi.concurrency import run_in_threadpool
 
 from .executable import ExecutableQuery, StructuredExecutable, RawSQLExecutable
+from .llm_client import LLMClient, llm_client
+from .parse_cache import NormalizedQuestion, ParseCache, ParsedPlan, device_set_hash, make_key, normalize_question, parse_cache
 from app.models.device import Device
 from app.core.config import settings
-import anthropic
 
 
 
+# Raw SQL sees the stored representation of energy_usage, so the model has to
+# be told how to convert it when the compact storage is in use.
+_ENERGY_UNITS_NOTE = (
+    "telemetry.energy_usage is stored as integer milliwatt-hours: divide it by 1000.0 to get the reported value."
+    if settings.TELEMETRY_ENERGY_STORAGE == "milliwatt_hours" else ""
+)
+
 class QueryParser(ABC):
     @abstractmethod
     def parse(self, question: str, user_devices: List[Device]) -> Optional[ExecutableQuery]:
         pass
 
+    async def aparse(self, question: str, user_devices: List[Device]) -> Optional[ExecutableQuery]:
+        """Async entry point used by the service; parsers that do I/O override it."""
+        return self.parse(question, user_devices)
+
 class DeterministicParser(QueryParser):
     def parse(self, question: str, user_devices: List[Device]) -> Optional[ExecutableQuery]:
         q_lower = question.lower()
@@ -58,21 +71,49 @@ class DeterministicParser(QueryParser):
         return now - timedelta(days=1), now
 
 class LLMParser(QueryParser):
-    def __init__(self):
-        if settings.ANTHROPIC_API_KEY:
-            self.client = anthropic.Anthropic(api_key=settings.ANTHROPIC_API_KEY)
-        else:
-            self.client = None
+    MODEL = "claude-3-5-sonnet-20240620"
+
+    def __init__(self, client: Optional[LLMClient] = None, cache: Optional[ParseCache] = None):
+        if client is None and llm_client.enabled:
+            client = llm_client
+        self.client = client
+        if cache is None and settings.LLM_PARSE_CACHE_ENABLED:
+            cache = parse_cache
+        self.cache = cache
 
     def parse(self, question: str, user_devices: List[Device]) -> Optional[ExecutableQuery]:
+        """Blocking entry point for scripts and other sync code; request handlers await aparse."""
+        return asyncio.run(self.aparse(question, user_devices))
+
+    async def aparse(self, question: str, user_devices: List[Device]) -> Optional[ExecutableQuery]:
         if not self.client: return None
-        system_prompt = self._build_prompt(user_devices)
+        # Plans are cached per normalized question and device list; relative
+        # periods in the question are bound as parameters at execution.
+        normalized = normalize_question(question)
+        device_set = device_set_hash(user_devices)
+        key = make_key(normalized, device_set, self.MODEL)
+        plan = await run_in_threadpool(self.cache.get, key) if self.cache else None
+        if plan is None:
+            plan = await self._ask_llm(normalized, user_devices)
+            if plan is None: return None
+            if self.cache:
+                await run_in_threadpool(self.cache.set, key, normalized, device_set, plan)
+        else:
+            print(f"LLM parse cache hit: {normalized.text}")
+
+        return RawSQLExecutable(
+            sql_query=plan.sql_query,
+            summary_template=normalized.render(plan.summary_template),
+            params=normalized.params(),
+        )
+
+    async def _ask_llm(self, normalized: NormalizedQuestion, user_devices: List[Device]) -> Optional[ParsedPlan]:
+        system_prompt = self._build_prompt(user_devices, len(normalized.periods))
         try:
-            # --- Real API call to Claude would be here ---
-            message = self.client.messages.create(
-                model="claude-3-5-sonnet-20240620",
+            message = await self.client.create_message(
+                model=self.MODEL,
                 system=system_prompt,
-                messages=[{"role": "user", "content": question}],
+                messages=[{"role": "user", "content": normalized.text}],
                 max_tokens=1000
             )
             raw_json = message.content[0].text
@@ -83,18 +124,31 @@ class LLMParser(QueryParser):
 
             print(f"sql_query: {sql_query}")
             print(f"summary: {summary}")
-            return RawSQLExecutable(sql_query=sql_query, summary_template=summary)
+            return ParsedPlan(sql_query=sql_query, summary_template=summary)
         except Exception as e:
             print(f"Claude LLM Parser failed: {e}")
             return None
 
-    def _build_prompt(self, devices: List[Device]) -> str:
+    def _build_prompt(self, devices: List[Device], period_count: int = 0) -> str:
         device_list_str = ", ".join([f'name: "{d.name}", id: "{d.id}"' for d in devices])
+        periods_note = ""
+        if period_count:
+            placeholders = ", ".join(f"{{period_{n}}}" for n in range(1, period_count + 1))
+            periods_note = (
+                f"The question refers to time periods as {placeholders}. Period N is the half-open range "
+                "available as the named parameters ':period_N_start' and ':period_N_end': filter it with "
+                "'timestamp >= :period_N_start AND timestamp < :period_N_end' and write {period_N} wherever "
+                "the summary mentions it."
+            )
         return f"""You are a PostgreSQL expert data analyst. 
         Your job is to parse a user's question and return a single, valid JSON object containing a SQL query and a human-readable summary.
         The user's ID will be available as a named parameter ':user_id'. 
         The SQL query will be executed by sql alchemy in parameterised way.
         You MUST scope all queries to this user's devices by adding 'WHERE owner_id = :user_id' or joining on the devices table. 
         The available tables are 'devices' (columns: id, name, owner_id) and 'telemetry' (columns: device_id, timestamp, energy_usage). 
+        {_ENERGY_UNITS_NOTE}
+        {periods_note}
+        The summary is a template rendered with the query's result: write {{column_name}} where a value of its single result row belongs.
+        The query is reused whenever the question is asked again, so never write literal dates for relative times; use the parameters above or NOW().
         The user's devices are: [{device_list_str}]. The JSON must have two keys: "sql" and "summary". 
-        Do not include any other text or markdown."""
\ No newline at end of file
+        Do not include any other text or markdown."""
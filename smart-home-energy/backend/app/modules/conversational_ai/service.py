@@ -2,6 +2,7 @@
 
 from abc import ABC, abstractmethod
 from sqlalchemy import func, text
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from typing import Dict, Any, List, Optional
 import uuid
@@ -9,31 +10,42 @@ from datetime import datetime
 
 from app.models.user import User
 from app.models.device import Device, Telemetry
+from app.core.db import run_db
+from .executable import ExecutableQuery
+from .llm_client import llm_client, question_coalescer
 from .parser import DeterministicParser, LLMParser
+from .summarizer import summarizer
 from app.core.config import settings
-import anthropic
+
+def _load_devices(db: Session, owner_id: uuid.UUID) -> List[Device]:
+    return db.query(Device).filter(Device.owner_id == owner_id).all()
+
 
 class ConversationalService:
-    def __init__(self, db: Session, user: User):
+    def __init__(self, db: Session | AsyncSession, user: User):
         self.db = db
         self.user = user
         self.parsers = [
             # DeterministicParser(),
             LLMParser(),
         ]
-        # Initialize LLM client for haiku generation
-        if settings.ANTHROPIC_API_KEY:
-            self.llm_client = anthropic.Anthropic(api_key=settings.ANTHROPIC_API_KEY)
-        else:
-            self.llm_client = None
+        # The shared process-wide client, used for haiku generation
+        self.llm_client = llm_client if llm_client.enabled else None
+
+    async def answer_question(self, question: str) -> Dict[str, Any]:
+        # The same question asked again by the same user while the first one
+        # is still being answered waits for that answer instead of repeating it.
+        key = (self.user.id, " ".join(question.lower().split()))
+        return await question_coalescer.run(key, lambda: self._answer(question))
 
-    def answer_question(self, question: str) -> Dict[str, Any]:
+    async def _answer(self, question: str) -> Dict[str, Any]:
         executable_query: Optional[ExecutableQuery] = None
-        
+        devices = await run_db(self.db, _load_devices, self.user.id)
+
         for parser in self.parsers:
             print(f"question: {question}")
-            print(f"user devices: {self.user.devices}")
-            executable_query = parser.parse(question, self.user.devices)
+            print(f"user devices: {devices}")
+            executable_query = await parser.aparse(question, devices)
             if executable_query:
                 print(f"Successfully parsed with {parser.__class__.__name__}")
                 break
@@ -41,8 +53,8 @@ class ConversationalService:
         print(f"executable_query: {executable_query.__class__.__name__}")
         if executable_query:
             try:
-                result_data = executable_query.execute(self.db, self.user)
-                summary = self._format_summary(result_data, question)
+                result_data = await run_db(self.db, executable_query.execute, self.user)
+                summary = await self._format_summary(result_data, question)
                 return {"summary": summary, "data": result_data.get("data"), "sql_query_for_debug": result_data.get("sql_query")}
             except PermissionError as e:
                 return {"summary": f"Execution denied: {e}"}
@@ -52,43 +64,6 @@ class ConversationalService:
     
         return {"summary": "I'm sorry, I couldn't understand that question."}
 
-    def _format_summary(self, result: Dict, question: str) -> str:
-        try:
-            # Convert data to JSON-serializable format
-            data = result.get("data", [])
-            serializable_data = self._make_json_serializable(data)
-            
-            prompt = f"""
-            You are a helpful assistant that summarizes data from a SQL query.
-            The user's question is: {question}
-            The data is in the following format: {serializable_data}
-            Please summarize the data in a concise and informative way. No need to provide any extra information.
-            """
-            response = self.llm_client.messages.create(
-                model="claude-3-5-haiku-20241022",
-                system=prompt,
-                messages=[{"role": "user", "content": str(serializable_data)}],
-                max_tokens=1000
-            )
-            return response.content[0].text
-        except Exception as e:
-            print(f"Error summarizing data: {e}")
-            return "I'm sorry, I couldn't summarize the data."
-
-    def _make_json_serializable(self, data):
-        """Convert data to JSON-serializable format by handling Decimal and other non-serializable types."""
-        if isinstance(data, list):
-            return [self._make_json_serializable(item) for item in data]
-        elif isinstance(data, dict):
-            return {key: self._make_json_serializable(value) for key, value in data.items()}
-        elif hasattr(data, '__dict__'):
-            # Handle SQLAlchemy Row objects
-            return {key: self._make_json_serializable(value) for key, value in data.__dict__.items() if not key.startswith('_')}
-        elif hasattr(data, 'isoformat'):
-            # Handle datetime objects
-            return data.isoformat()
-        elif hasattr(data, 'quantize'):
-            # Handle Decimal objects
-            return float(data)
-        else:
-            return data
\ No newline at end of file
+    async def _format_summary(self, result: Dict, question: str) -> str:
+        # Simple results are rendered from templates; only complex ones cost an LLM call
+        return await summarizer.summarize(result, question, self.llm_client)
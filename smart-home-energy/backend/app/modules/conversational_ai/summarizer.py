@@ -0,0 +1,198 @@
+# backend/app/modules/conversational_ai/summarizer.py
+
+import json
+import string
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.core import metrics
+from app.core.config import settings
+
+SUMMARY_MODEL = "claude-3-5-haiku-20241022"
+
+FAILED_SUMMARY = "I'm sorry, I couldn't summarize the data."
+
+# Rough size of a token in characters of JSON, used to keep the data sent for
+# summarization within LLM_SUMMARY_TOKEN_BUDGET without a tokenizer.
+_CHARS_PER_TOKEN = 4
+
+_SCALAR_TEMPLATES = {
+    "SUM": "The total energy usage for {subject} was {value} Watts.",
+    "AVG": "The average energy usage for {subject} was {value} Watts.",
+    "MAX": "The highest energy reading for {subject} was {value} Watts.",
+    "MIN": "The lowest energy reading for {subject} was {value} Watts.",
+}
+
+
+def make_json_serializable(data):
+    """Convert data to JSON-serializable format by handling Decimal and other non-serializable types."""
+    if isinstance(data, list):
+        return [make_json_serializable(item) for item in data]
+    elif isinstance(data, dict):
+        return {key: make_json_serializable(value) for key, value in data.items()}
+    elif hasattr(data, '__dict__'):
+        # Handle SQLAlchemy Row objects
+        return {key: make_json_serializable(value) for key, value in data.__dict__.items() if not key.startswith('_')}
+    elif hasattr(data, 'isoformat'):
+        # Handle datetime objects
+        return data.isoformat()
+    elif hasattr(data, 'quantize'):
+        # Handle Decimal objects
+        return float(data)
+    else:
+        return data
+
+
+def format_value(value: Any) -> str:
+    """Human-readable rendering of one result value: numbers to at most two decimals."""
+    if isinstance(value, bool) or value is None:
+        return str(value)
+    if isinstance(value, (int, float)) or hasattr(value, 'quantize'):
+        return f"{float(value):.2f}".rstrip("0").rstrip(".")
+    if hasattr(value, 'isoformat'):
+        return value.isoformat(sep=" ", timespec="minutes") if hasattr(value, 'hour') else value.isoformat()
+    return str(value)
+
+
+def render_template(result: Dict[str, Any], max_rows: int) -> Optional[str]:
+    """
+    Renders a summary without the LLM when the result is simple enough:
+    structured aggregates, empty results, a single row that fills the
+    parser's summary template, or at most `max_rows` rows. Returns None for
+    anything that needs the LLM.
+    """
+    metric = result.get("metric")
+    if metric in _SCALAR_TEMPLATES:
+        subject = result.get("kwargs", {}).get("device_name") or "your devices"
+        if result.get("value") is None:
+            return f"There is no energy data for {subject} in that period."
+        return _SCALAR_TEMPLATES[metric].format(subject=subject, value=format_value(result["value"]))
+
+    rows = result.get("data")
+    if rows is None:
+        return None
+    if not rows:
+        return "No matching data was found."
+
+    template = result.get("summary_template")
+    if template and len(rows) == 1:
+        rendered = _fill_template(template, rows[0])
+        if rendered is not None:
+            return rendered
+
+    if len(rows) <= max_rows:
+        lines = [", ".join(f"{column}: {format_value(value)}" for column, value in row.items()) for row in rows]
+        if len(lines) == 1:
+            return lines[0] + "."
+        return f"Found {len(rows)} results:\n" + "\n".join(f"- {line}" for line in lines)
+    return None
+
+
+def _fill_template(template: str, row: Dict[str, Any]) -> Optional[str]:
+    """Formats a summary template whose {placeholders} all name columns of the row."""
+    try:
+        fields = [name for _, name, _, _ in string.Formatter().parse(template) if name is not None]
+    except ValueError:
+        return None
+    if not fields or any(name not in row for name in fields):
+        return None
+    try:
+        return template.format(**{name: format_value(row[name]) for name in fields})
+    except (ValueError, IndexError):
+        # e.g. a numeric format spec applied to the rendered string
+        return None
+
+
+def fit_to_budget(rows: List[Any], token_budget: int) -> Tuple[List[Any], int]:
+    """
+    Returns rows whose JSON fits in `token_budget` tokens, sampling evenly
+    spaced rows (always keeping the first and last) when all of them do not,
+    together with the original row count.
+    """
+    total = len(rows)
+    budget_chars = token_budget * _CHARS_PER_TOKEN
+    size = len(json.dumps(rows, default=str))
+    if size <= budget_chars or total <= 2:
+        return rows, total
+    keep = max(2, int(total * budget_chars / size))
+    while keep > 2:
+        sample = [rows[round(i * (total - 1) / (keep - 1))] for i in range(keep)]
+        if len(json.dumps(sample, default=str)) <= budget_chars:
+            return sample, total
+        keep = int(keep * 0.9)
+    return [rows[0], rows[-1]], total
+
+
+class Summarizer:
+    """
+    Picks how an answer is summarized: a deterministic template whenever the
+    result allows it, the LLM otherwise. Counts both, so the metrics report
+    how many LLM calls templates saved and roughly how long they would have
+    taken (at the observed average LLM latency).
+    """
+    def __init__(self, template_max_rows: int, token_budget: int):
+        self.template_max_rows = template_max_rows
+        self.token_budget = token_budget
+        self._lock = threading.Lock()
+        self.templated = 0
+        self.llm_calls = 0
+        self.llm_failures = 0
+        self.llm_ms = 0.0
+        self.sampled = 0
+
+    async def summarize(self, result: Dict[str, Any], question: str, client) -> str:
+        summary = render_template(result, self.template_max_rows)
+        if summary is not None:
+            self._count("templated")
+            return summary
+        if client is None:
+            return FAILED_SUMMARY
+
+        rows, total = fit_to_budget(make_json_serializable(result.get("data") or []), self.token_budget)
+        if len(rows) < total:
+            self._count("sampled")
+        shown = f"The data has {total} rows; {len(rows)} evenly spaced rows are shown." if len(rows) < total else ""
+        prompt = f"""
+        You are a helpful assistant that summarizes data from a SQL query.
+        The user's question is: {question}
+        The user message holds the query's result rows as JSON. {shown}
+        Please summarize the data in a concise and informative way. No need to provide any extra information.
+        """
+        started = time.perf_counter()
+        try:
+            response = await client.create_message(
+                model=SUMMARY_MODEL,
+                system=prompt,
+                messages=[{"role": "user", "content": json.dumps(rows, default=str)}],
+                max_tokens=1000
+            )
+            return response.content[0].text
+        except Exception as e:
+            print(f"Error summarizing data: {e}")
+            self._count("llm_failures")
+            return FAILED_SUMMARY
+        finally:
+            self._count("llm_calls")
+            self._count("llm_ms", (time.perf_counter() - started) * 1000)
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            average_ms = self.llm_ms / self.llm_calls if self.llm_calls else 0.0
+            return {
+                "templated": self.templated,
+                "llm_calls": self.llm_calls,
+                "llm_failures": self.llm_failures,
+                "llm_average_ms": round(average_ms, 1),
+                "llm_calls_saved": self.templated,
+                "llm_ms_saved": round(self.templated * average_ms, 1),
+                "sampled": self.sampled,
+            }
+
+    def _count(self, counter: str, amount: float = 1) -> None:
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + amount)
+
+
+summarizer = Summarizer(settings.LLM_SUMMARY_TEMPLATE_MAX_ROWS, settings.LLM_SUMMARY_TOKEN_BUDGET)
+metrics.register("conversational_summaries", summarizer.metrics)
@@ -0,0 +1,41 @@
+# backend/app/modules/metrics/endpoints.py
+
+import hmac
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+
+from app.core import metrics
+from app.core.config import settings
+
+router = APIRouter(
+    prefix="/metrics",
+    tags=["Metrics"]
+)
+
+metrics_token_scheme = HTTPBearer(auto_error=False)
+
+
+def require_metrics_token(credentials: HTTPAuthorizationCredentials | None = Depends(metrics_token_scheme)) -> None:
+    """
+    Admits only callers presenting METRICS_TOKEN as a bearer token. Without a
+    configured token the endpoint does not exist (404).
+    """
+    if not settings.METRICS_TOKEN:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    if credentials is None or not hmac.compare_digest(credentials.credentials, settings.METRICS_TOKEN):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Not authenticated",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+
+@router.get("/", dependencies=[Depends(require_metrics_token)])
+def read_metrics():
+    """
+    Returns operational counters and gauges (queue depth, cache hit rates, etc.)
+    for every component that registered a metrics provider. Internal only:
+    requires the METRICS_TOKEN bearer token.
+    """
+    return metrics.snapshot()
@@ -0,0 +1,105 @@
+# backend/app/modules/telemetry/deltas.py
+
+import base64
+import hashlib
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Iterable, List, Optional, Sequence
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.device import TelemetryHourly
+from .rollups import as_utc, floor_time
+
+# Stats deltas are derived from telemetry_hourly.updated_at: every write to
+# raw telemetry recomputes (and re-stamps) the hourly buckets it touches.
+# A watermark is the time a response was computed. Buckets stamped after it,
+# less STATS_WATERMARK_GRACE_SECONDS for transactions that were still in
+# flight (or workers whose clocks disagree), have changed since.
+
+_WATERMARK_VERSION = "w1"
+
+
+def supported() -> bool:
+    """Deltas and ETags need the hourly rollup to be maintained."""
+    return settings.TELEMETRY_ROLLUPS_ENABLED
+
+
+def encode_watermark(ts: datetime) -> str:
+    micros = int(as_utc(ts).timestamp() * 1_000_000)
+    return base64.urlsafe_b64encode(f"{_WATERMARK_VERSION}:{micros}".encode()).decode().rstrip("=")
+
+
+def decode_watermark(token: str) -> datetime:
+    """Raises ValueError for anything encode_watermark did not produce."""
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)).decode()
+        version, micros = raw.split(":")
+        if version != _WATERMARK_VERSION:
+            raise ValueError
+        return datetime.fromtimestamp(int(micros) / 1_000_000, tz=timezone.utc)
+    except (ValueError, UnicodeDecodeError):
+        raise ValueError(f"Invalid watermark: {token!r}")
+
+
+def changed_hours(
+    db: Session, device_id: uuid.UUID, start: datetime, end: datetime, since: datetime
+) -> List[datetime]:
+    """Hour buckets of the device in [start, end) recomputed after `since` (less the grace period)."""
+    hourly = TelemetryHourly.__table__
+    cutoff = since - timedelta(seconds=settings.STATS_WATERMARK_GRACE_SECONDS)
+    rows = db.execute(select(hourly.c.bucket).where(
+        hourly.c.device_id == device_id,
+        hourly.c.bucket >= floor_time(start, "hour"),
+        hourly.c.bucket < end,
+        hourly.c.updated_at > cutoff,
+    ).order_by(hourly.c.bucket)).scalars()
+    return [as_utc(bucket) for bucket in rows]
+
+
+def changed_ranges(hours: Iterable[datetime], floor, advance, start: datetime, end: datetime) -> List[tuple[datetime, datetime]]:
+    """
+    Collapses changed hours into [lo, hi) runs of whole response buckets,
+    where `floor(ts)` gives a bucket's start and `advance(bucket)` the next
+    one, clipped to [start, end). Buckets finer than an hour cover the whole
+    changed hour.
+    """
+    ranges: List[tuple[datetime, datetime]] = []
+    for hour in sorted(hours):
+        lo = max(floor(hour), start)
+        hi = min(advance(floor(hour + timedelta(hours=1) - timedelta(microseconds=1))), end)
+        if lo >= hi:
+            continue
+        if ranges and ranges[-1][1] >= lo:
+            ranges[-1] = (ranges[-1][0], max(ranges[-1][1], hi))
+        else:
+            ranges.append((lo, hi))
+    return ranges
+
+
+def state_tag(db: Session, device_id: uuid.UUID, start: datetime, end: datetime, request_key: Sequence) -> str:
+    """
+    Weak ETag for a stats response: the request's shape plus the number and
+    latest update of the hourly buckets it covers. Any write, and any bucket
+    removed by retention, changes it.
+    """
+    hourly = TelemetryHourly.__table__
+    count, latest = db.execute(select(func.count(), func.max(hourly.c.updated_at)).where(
+        hourly.c.device_id == device_id,
+        hourly.c.bucket >= floor_time(start, "hour"),
+        hourly.c.bucket < end,
+    )).one()
+    latest = as_utc(latest).isoformat() if latest is not None else ""
+    digest = hashlib.sha256("|".join(map(str, [device_id, *request_key, count, latest])).encode()).hexdigest()
+    return f'W/"{digest[:32]}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = {value.strip() for value in if_none_match.split(",")}
+    # Weak comparison: W/"x" matches "x" and W/"x"
+    bare = etag.removeprefix("W/")
+    return "*" in candidates or etag in candidates or bare in candidates
@@ -0,0 +1,58 @@
+# backend/app/modules/telemetry/dependencies.py
+
+import uuid
+from dataclasses import dataclass
+
+from fastapi import Depends, Header, HTTPException, status
+from fastapi.security import OAuth2PasswordBearer
+from sqlalchemy.orm import Session
+
+from app.core.db import get_session, run_db
+from ..auth.dependencies import get_current_user
+from . import device_keys
+
+# Same scheme as the user dependency, but a missing token is not an error here
+# because a device key may be sent instead.
+optional_oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login", auto_error=False)
+
+
+@dataclass(frozen=True)
+class IngestPrincipal:
+    """
+    Who is writing telemetry. A user may write to any device they own; a
+    device API key only to its own device (`device_id` is then set).
+    """
+    owner_id: uuid.UUID
+    device_id: uuid.UUID | None = None
+
+
+async def get_ingest_principal(
+    x_device_key: str | None = Header(None),
+    token: str | None = Depends(optional_oauth2_scheme),
+    db: Session = Depends(get_session),
+) -> IngestPrincipal:
+    """
+    Authenticates a telemetry write with either an `X-Device-Key` header or a
+    user bearer token. Verifying a device key is one HMAC and a cache lookup;
+    the database is only read the first time a device is seen.
+    """
+    if x_device_key is not None:
+        invalid_key = HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid device key")
+        device_id = device_keys.parse_device_id(x_device_key)
+        if device_id is None:
+            raise invalid_key
+        credential = device_keys.verifier.cached(device_id)
+        if credential is None:
+            credential = await run_db(db, device_keys.verifier.load, device_id)
+        if not device_keys.matches(credential, x_device_key):
+            raise invalid_key
+        return IngestPrincipal(owner_id=credential.owner_id, device_id=device_id)
+
+    if token is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Not authenticated",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    user = await get_current_user(token, db)
+    return IngestPrincipal(owner_id=user.id)
@@ -0,0 +1,127 @@
+# backend/app/modules/telemetry/device_keys.py
+
+import hashlib
+import hmac
+import secrets
+import uuid
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+from sqlalchemy.orm import Session
+
+from app.core import metrics
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.notify import notify, notify_listener
+from app.models.device import Device
+
+# Keys look like "dk_<device id hex>_<secret>", so the device is known from the
+# key itself and verification is a primary-key lookup plus one HMAC.
+KEY_PREFIX = "dk"
+
+# Postgres channel on which key changes are announced to every worker.
+CHANNEL = "device_api_keys"
+
+
+@dataclass(frozen=True)
+class DeviceCredential:
+    """
+    What verification needs to know about a device. `api_key_hash` is None
+    when the device has no key; `owner_id` is None when it does not exist.
+    """
+    device_id: uuid.UUID
+    owner_id: Optional[uuid.UUID]
+    api_key_hash: Optional[str]
+
+
+def _hmac_key() -> bytes:
+    return (settings.DEVICE_API_KEY_SECRET or settings.SECRET_KEY).encode()
+
+
+def generate_api_key(device_id: uuid.UUID) -> str:
+    return f"{KEY_PREFIX}_{device_id.hex}_{secrets.token_urlsafe(32)}"
+
+
+def hash_api_key(api_key: str) -> str:
+    """
+    Keyed SHA-256 of the whole key. Keys carry 256 random bits, so a fast
+    keyed hash is as safe as bcrypt here and costs microseconds.
+    """
+    return hmac.new(_hmac_key(), api_key.encode(), hashlib.sha256).hexdigest()
+
+
+def parse_device_id(api_key: str) -> Optional[uuid.UUID]:
+    """Extracts the device id from a key, or None if the key is malformed."""
+    prefix, _, rest = api_key.partition("_")
+    device_hex, _, secret = rest.partition("_")
+    if prefix != KEY_PREFIX or not secret:
+        return None
+    try:
+        return uuid.UUID(hex=device_hex)
+    except ValueError:
+        return None
+
+
+class DeviceKeyVerifier:
+    """
+    Verifies device API keys against hashes cached per device. Devices without
+    a key are cached too, so a stream of bad keys for them does not reach the
+    database; ids of devices that do not exist are never cached. Issuing or
+    revoking a key invalidates the device's entry in this process at once
+    and, on Postgres, in every other worker through a NOTIFY on CHANNEL sent
+    with the commit. The TTL only bounds staleness while a worker's listener
+    is reconnecting (the cache is cleared once it is back).
+    """
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self._credentials = TTLCache(max_entries, ttl_seconds)
+
+    def cached(self, device_id: uuid.UUID) -> Optional[DeviceCredential]:
+        """Returns the cached credential, or None on a miss."""
+        return self._credentials.get(device_id)
+
+    def load(self, db: Session, device_id: uuid.UUID) -> DeviceCredential:
+        row = db.query(Device.owner_id, Device.api_key_hash).filter(Device.id == device_id).first()
+        if row is None:
+            # Not cached: arbitrary ids would only fill the cache, and the
+            # device may be created with a key right after.
+            return DeviceCredential(device_id, None, None)
+        credential = DeviceCredential(device_id, row.owner_id, row.api_key_hash)
+        self._credentials.set(device_id, credential)
+        return credential
+
+    def invalidate(self, device_id: uuid.UUID) -> None:
+        self._credentials.delete(device_id)
+
+    def clear(self) -> None:
+        self._credentials.clear()
+
+    def metrics(self) -> Dict[str, Any]:
+        return self._credentials.metrics()
+
+
+verifier = DeviceKeyVerifier(settings.DEVICE_API_KEY_CACHE_MAX_ENTRIES, settings.DEVICE_API_KEY_CACHE_TTL_SECONDS)
+metrics.register("device_api_keys", verifier.metrics)
+notify_listener.listen(CHANNEL, lambda payload: verifier.invalidate(uuid.UUID(payload)), on_connect=verifier.clear)
+
+
+def matches(credential: DeviceCredential, api_key: str) -> bool:
+    if credential.api_key_hash is None:
+        return False
+    return hmac.compare_digest(credential.api_key_hash, hash_api_key(api_key))
+
+
+def issue_api_key(db: Session, device: Device) -> str:
+    """Gives `device` a new API key, replacing any previous one, and returns it in clear."""
+    api_key = generate_api_key(device.id)
+    device.api_key_hash = hash_api_key(api_key)
+    notify(db, CHANNEL, str(device.id))
+    db.commit()
+    verifier.invalidate(device.id)
+    return api_key
+
+
+def revoke_api_key(db: Session, device: Device) -> None:
+    device.api_key_hash = None
+    notify(db, CHANNEL, str(device.id))
+    db.commit()
+    verifier.invalidate(device.id)
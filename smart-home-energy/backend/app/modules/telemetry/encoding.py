@@ -0,0 +1,120 @@
+# backend/app/modules/telemetry/encoding.py
+
+import json
+import math
+import struct
+import sys
+from array import array
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional, Sequence
+
+from fastapi import Response
+
+from .rollups import as_utc
+from .schemas import SeriesFormat
+
+# Media types clients can ask for in the Accept header.
+COLUMNAR_MEDIA_TYPE = "application/vnd.energy.columnar+json"
+PACKED_MEDIA_TYPE = "application/vnd.energy.packed"
+
+_ACCEPTED_MEDIA_TYPES = {
+    COLUMNAR_MEDIA_TYPE: SeriesFormat.COLUMNAR,
+    PACKED_MEDIA_TYPE: SeriesFormat.PACKED,
+    "application/octet-stream": SeriesFormat.PACKED,
+}
+
+# Packed layout, all little-endian:
+#   header   magic (4 bytes), point count n (uint32), value column count k (uint32)
+#   body     n int64 timestamps (ms since the Unix epoch), then k columns of
+#            n float64 values each (NaN marks a missing value)
+PACKED_MAGIC = b"ESR1"
+_PACKED_HEADER = struct.Struct("<4sII")
+
+_UNIX_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_MILLISECOND = timedelta(milliseconds=1)
+
+
+def negotiate(accept: Optional[str], requested: Optional[SeriesFormat] = None) -> SeriesFormat:
+    """
+    Picks the response format: an explicit `format` parameter wins, then the
+    first supported media type in the Accept header, then plain JSON.
+    """
+    if requested is not None:
+        return requested
+    for part in (accept or "").split(","):
+        media_type = part.split(";")[0].strip().lower()
+        if media_type in _ACCEPTED_MEDIA_TYPES:
+            return _ACCEPTED_MEDIA_TYPES[media_type]
+    return SeriesFormat.JSON
+
+
+def epoch_millis(timestamps: Iterable[datetime]) -> List[int]:
+    return [(as_utc(ts) - _UNIX_EPOCH) // _MILLISECOND for ts in timestamps]
+
+
+def columnar_response(timestamps_ms: List[int], fields: Dict[str, object]) -> Response:
+    """
+    Encodes a series as one JSON object of parallel arrays. `fields` holds the
+    value arrays and any metadata; `timestamps` is always epoch milliseconds.
+    """
+    body = json.dumps({**fields, "timestamps": timestamps_ms}, separators=(",", ":"), default=str)
+    return Response(content=body, media_type=COLUMNAR_MEDIA_TYPE)
+
+
+def _little_endian(values: array) -> bytes:
+    if sys.byteorder == "big":
+        values.byteswap()
+    return values.tobytes()
+
+
+def _float_column(values: Sequence[Optional[float]]) -> array:
+    try:
+        return array("d", values)
+    except TypeError:  # contains None
+        return array("d", [math.nan if value is None else value for value in values])
+
+
+def pack_series(timestamps_ms: Sequence[int], columns: Sequence[Sequence[Optional[float]]]) -> bytes:
+    """Encodes timestamps and value columns in the packed binary layout."""
+    parts = [_PACKED_HEADER.pack(PACKED_MAGIC, len(timestamps_ms), len(columns)), _little_endian(array("q", timestamps_ms))]
+    for values in columns:
+        if len(values) != len(timestamps_ms):
+            raise ValueError("Every column must have one value per timestamp.")
+        parts.append(_little_endian(_float_column(values)))
+    return b"".join(parts)
+
+
+def unpack_series(data: bytes) -> tuple[List[int], List[List[Optional[float]]]]:
+    """Decodes the packed binary layout; NaN values come back as None."""
+    magic, count, column_count = _PACKED_HEADER.unpack_from(data)
+    if magic != PACKED_MAGIC:
+        raise ValueError("Not a packed series payload.")
+    offset = _PACKED_HEADER.size
+    timestamps = array("q")
+    timestamps.frombytes(data[offset:offset + 8 * count])
+    columns = []
+    for index in range(column_count):
+        start = offset + 8 * count * (index + 1)
+        values = array("d")
+        values.frombytes(data[start:start + 8 * count])
+        if sys.byteorder == "big":
+            values.byteswap()
+        columns.append([None if math.isnan(value) else value for value in values])
+    if sys.byteorder == "big":
+        timestamps.byteswap()
+    return list(timestamps), columns
+
+
+def packed_response(
+    timestamps_ms: Sequence[int],
+    columns: Sequence[Sequence[Optional[float]]],
+    names: Sequence[str],
+    metadata: Dict[str, object],
+) -> Response:
+    """
+    Sends a packed payload. Column names and metadata travel in `X-Series-*`
+    headers, so the body is nothing but the arrays.
+    """
+    headers = {"X-Series-Columns": ",".join(names)}
+    headers.update({f"X-Series-{key.replace('_', '-').title()}": str(value) for key, value in metadata.items()})
+    return Response(content=pack_series(timestamps_ms, columns), media_type=PACKED_MEDIA_TYPE, headers=headers)
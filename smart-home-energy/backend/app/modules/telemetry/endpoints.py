@@ -1,15 +1,23 @@
 # backend/app/modules/telemetry/endpoints.py
+import math
 import uuid
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from typing import List
-from app.core.db import get_db
+from app.core.config import settings
+from app.core.db import get_read_session, get_session, run_db
 from app.models.user import User
-from app.models.device import Device, Telemetry
+from app.models.device import Device
 from ..auth.dependencies import get_current_user
-from . import schemas
+from . import deltas, device_keys, encoding, export, live, rollups, schemas, series, service, upload
+from .dependencies import IngestPrincipal, get_ingest_principal
+from .stats_cache import make_key, stats_cache
+from .ingest_queue import ingest_queue
 from datetime import datetime, timezone, timedelta
-from sqlalchemy import func
 
 telemetry_router = APIRouter(
     prefix="/telemetry",
@@ -24,73 +32,425 @@ device_router = APIRouter(
 )
 
 
-@telemetry_router.post("/", status_code=status.HTTP_201_CREATED, response_model=schemas.TelemetryPublic)
-def submit_telemetry_data(
+async def _require_owned_device(
+    db: Session, owner_id: uuid.UUID, device_id: uuid.UUID, detail: str = "Device not found"
+) -> None:
+    """Raises 404 unless `device_id` belongs to `owner_id`."""
+    if not await run_db(db, service.get_owned_device_ids, owner_id, [device_id]):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=detail)
+
+
+@telemetry_router.post(
+    "/",
+    status_code=status.HTTP_201_CREATED,
+    response_model=schemas.TelemetryPublic,
+    responses={
+        202: {"description": "Accepted for asynchronous ingestion (queued mode)"},
+        429: {"description": "Ingestion queue is full (queued mode)"},
+    },
+)
+async def submit_telemetry_data(
     telemetry_in: schemas.TelemetryCreate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_session),
+    principal: IngestPrincipal = Depends(get_ingest_principal),
 ):
     """
     Submit a new telemetry data point for a device.
-    The device must belong to the authenticated user.
+    Authenticate with a user token for a device the user owns, or with the
+    device's own key in the `X-Device-Key` header.
+    When TELEMETRY_INGEST_MODE is "queued" the point is validated, queued and
+    acknowledged with 202; a background flusher writes it shortly after.
     """
-    # Security Check: Verify the device belongs to the current user
-    device = db.query(Device).filter(
-        Device.id == telemetry_in.device_id,
-        Device.owner_id == current_user.id
-    ).first()
-
-    if not device:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
+    if principal.device_id is not None:
+        # A device key may only write the device it was issued for
+        if telemetry_in.device_id != principal.device_id:
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Device key is not valid for this device.")
+    else:
+        # Security Check: Verify the device belongs to the current user
+        await _require_owned_device(
+            db, principal.owner_id, telemetry_in.device_id,
             detail="Device not found or you do not have permission to access it.",
         )
 
-    # Create the new telemetry record
-    db_telemetry = Telemetry(
-        device_id=telemetry_in.device_id,
-        timestamp=telemetry_in.timestamp,
-        energy_usage=telemetry_in.energy_usage
+    row = {
+        "device_id": telemetry_in.device_id,
+        "timestamp": telemetry_in.timestamp,
+        "energy_usage": telemetry_in.energy_usage,
+    }
+    if settings.TELEMETRY_INGEST_MODE == "queued":
+        if settings.TELEMETRY_QUEUE_FULL_POLICY == "block":
+            # Waiting for room blocks, so it happens off the event loop
+            queued = await run_in_threadpool(ingest_queue.put, row, settings.TELEMETRY_QUEUE_BLOCK_TIMEOUT_SECONDS)
+        else:
+            queued = ingest_queue.put(row)
+        if not queued:
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Telemetry ingestion queue is full, please retry later.",
+                headers={"Retry-After": str(max(1, math.ceil(settings.TELEMETRY_FLUSH_INTERVAL_SECONDS)))},
+            )
+        return JSONResponse(status_code=status.HTTP_202_ACCEPTED, content=jsonable_encoder(telemetry_in))
+
+    # Write the point with a single upsert; a redelivered reading is resolved by
+    # TELEMETRY_CONFLICT_POLICY instead of failing, and no follow-up SELECT is needed.
+    def write(db: Session):
+        service.upsert_telemetry(db, [row])
+        db.commit()
+
+    await run_db(db, write)
+
+    return telemetry_in
+
+
+@telemetry_router.post("/batch", response_model=schemas.TelemetryBatchResult)
+async def submit_telemetry_batch(
+    batch_in: schemas.TelemetryBatchCreate,
+    db: Session = Depends(get_session),
+    principal: IngestPrincipal = Depends(get_ingest_principal),
+):
+    """
+    Submit many telemetry data points, for any number of devices, in one request.
+    Ownership is checked once per distinct device and all accepted points are
+    written with a single bulk insert. Points for devices the user does not own
+    are rejected and reported per device. With a device key, only points for
+    that device are accepted.
+    """
+    return await run_db(
+        db, service.ingest_telemetry_batch,
+        owner_id=principal.owner_id, points=batch_in.points, device_id=principal.device_id,
     )
-    db.add(db_telemetry)
-    db.commit()
-    db.refresh(db_telemetry)
-    
-    return db_telemetry
+
+
+@telemetry_router.post("/upload", response_model=schemas.TelemetryUploadResult)
+async def upload_telemetry_stream(
+    request: Request,
+    format: schemas.UploadFormat | None = None,
+    skip_rows: int = Query(0, ge=0),
+    byte_offset: int = Query(0, ge=0),
+    db: Session = Depends(get_session),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Bulk upload historical telemetry as a streamed NDJSON or CSV body.
+
+    Rows are parsed as the body arrives and written in fixed-size batches, so
+    uploads of any size use bounded memory. CSV rows are
+    `device_id,timestamp,energy_usage` with an optional header line. The format
+    is taken from `format` or inferred from the Content-Type header.
+
+    To resume a failed upload, either resend the whole body with `skip_rows`
+    set to the last reported `rows_committed`, or send the rest of the file
+    starting at `bytes_committed` with `byte_offset` set to that value.
+    """
+    uploader = upload.TelemetryUpload(
+        owner_id=current_user.id,
+        fmt=format or upload.detect_format(request.headers.get("content-type")),
+        batch_size=settings.TELEMETRY_UPLOAD_BATCH_SIZE,
+        skip_rows=skip_rows,
+        byte_offset=byte_offset,
+    )
+    parse_error: upload.UploadError | None = None
+    try:
+        async for chunk in request.stream():
+            uploader.feed(chunk)
+            if uploader.ready:
+                await run_db(db, uploader.flush)
+        uploader.finish()
+    except upload.UploadError as e:
+        # Keep everything that parsed cleanly so the client can resume at the bad row.
+        parse_error = e
+    await run_db(db, uploader.flush)
+
+    if parse_error:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail={"message": parse_error.message, "row": parse_error.row_number, **uploader.result().model_dump()},
+        )
+    return uploader.result()
 
 
 @device_router.post("/", status_code=status.HTTP_201_CREATED, response_model=schemas.DevicePublic)
-def create_device(
+async def create_device(
     device_in: schemas.DeviceCreate,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_session),
     current_user: User = Depends(get_current_user)
 ):
     """
     Create a new device for the authenticated user.
     """
-    db_device = Device(**device_in.model_dump(), owner_id=current_user.id)
-    db.add(db_device)
-    db.commit()
-    db.refresh(db_device)
-    return db_device
+    def create(db: Session) -> Device:
+        db_device = Device(**device_in.model_dump(), owner_id=current_user.id)
+        db.add(db_device)
+        db.commit()
+        db.refresh(db_device)
+        return db_device
+
+    return await run_db(db, create)
+
+
+@device_router.post("/{device_id}/api-key", status_code=status.HTTP_201_CREATED, response_model=schemas.DeviceApiKey)
+async def create_device_api_key(
+    device_id: uuid.UUID,
+    db: Session = Depends(get_session),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Issue an ingest API key for a device, replacing any previous key.
+    The key is returned only once. Send it in the `X-Device-Key` header to
+    write telemetry for this device without a user token.
+    """
+    def issue(db: Session) -> str | None:
+        device = db.query(Device).filter(Device.id == device_id, Device.owner_id == current_user.id).first()
+        return device_keys.issue_api_key(db, device) if device is not None else None
+
+    api_key = await run_db(db, issue)
+    if api_key is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Device not found")
+    return schemas.DeviceApiKey(device_id=device_id, api_key=api_key)
+
+
+@device_router.delete("/{device_id}/api-key", status_code=status.HTTP_204_NO_CONTENT)
+async def revoke_device_api_key(
+    device_id: uuid.UUID,
+    db: Session = Depends(get_session),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Revoke a device's ingest API key.
+    """
+    def revoke(db: Session) -> bool:
+        device = db.query(Device).filter(Device.id == device_id, Device.owner_id == current_user.id).first()
+        if device is None:
+            return False
+        device_keys.revoke_api_key(db, device)
+        return True
+
+    if not await run_db(db, revoke):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Device not found")
 
 
 @device_router.get("/", response_model=List[schemas.DevicePublic])
-def list_user_devices(
-    db: Session = Depends(get_db),
+async def list_user_devices(
+    db: Session = Depends(get_read_session),
     current_user: User = Depends(get_current_user)
 ):
     """
     List all devices owned by the authenticated user.
     """
-    return db.query(Device).filter(Device.owner_id == current_user.id).all()
+    return await run_db(db, lambda db: db.query(Device).filter(Device.owner_id == current_user.id).all())
+
+
+@device_router.get(
+    "/live",
+    response_class=StreamingResponse,
+    responses={200: {"content": {"text/event-stream": {}}}},
+)
+async def stream_live_telemetry(
+    device_ids: List[str] = Query(["all"]),
+    db: Session = Depends(get_read_session),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Server-Sent Events stream of newly ingested telemetry for the user's
+    devices. `device_ids` is given as on `/devices/stats`. Every committed
+    write produces one `telemetry` event per device, carrying its newest
+    points and its current hourly and daily buckets. A client that falls
+    behind receives a `dropped` event and should reconnect and refetch stats.
+    """
+    if not settings.TELEMETRY_LIVE_ENABLED:
+        raise HTTPException(status.HTTP_404_NOT_FOUND, detail="Live telemetry is disabled.")
+    requested = [part.strip() for value in device_ids for part in value.split(",") if part.strip()]
+    subscribed = await run_db(db, _live_device_ids, current_user.id, requested)
+    return StreamingResponse(
+        live.stream_events(live.live_broker, subscribed, settings.TELEMETRY_LIVE_HEARTBEAT_SECONDS),
+        media_type="text/event-stream",
+        # Proxies must pass events through as they are written
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+def _live_device_ids(db: Session, owner_id: uuid.UUID, requested: List[str]) -> List[uuid.UUID]:
+    if "all" in requested:
+        return [device_id for (device_id,) in db.query(Device.id).filter(Device.owner_id == owner_id)]
+    try:
+        wanted = set(uuid.UUID(value) for value in requested)
+    except ValueError:
+        raise HTTPException(status.HTTP_422_UNPROCESSABLE_ENTITY, detail="device_ids must be UUIDs or \"all\".")
+    # Security Check: every requested device must belong to the current user
+    missing = wanted - service.get_owned_device_ids(db, owner_id, wanted)
+    if missing:
+        raise HTTPException(status.HTTP_404_NOT_FOUND, detail=f"Devices not found: {', '.join(sorted(map(str, missing)))}")
+    return list(wanted)
+
+
+@device_router.get(
+    "/{device_id}/telemetry/export",
+    response_class=StreamingResponse,
+    responses={200: {"content": {"text/csv": {}, "application/x-ndjson": {}}}},
+)
+async def export_device_telemetry(
+    device_id: uuid.UUID,
+    start: datetime | None = None,
+    end: datetime | None = None,
+    format: schemas.UploadFormat | None = None,
+    accept: str | None = Header(None),
+    db: Session = Depends(get_read_session),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Stream a device's raw readings in [start, end) as CSV or NDJSON, oldest
+    first. Both bounds are optional. The format is taken from `format` or the
+    Accept header (text/csv or application/x-ndjson, the default). The output
+    can be sent back to `/telemetry/upload` unchanged.
+    """
+    # Security Check: Verify the device belongs to the current user
+    await _require_owned_device(db, current_user.id, device_id)
+
+    fmt = format or upload.detect_format(accept)
+    # The request session may be closed before the body is streamed, so the
+    # export reads through its own session on the same bind.
+    if isinstance(db, AsyncSession):
+        stream = export.astream_telemetry(
+            AsyncSession(bind=db.bind), device_id, start, end, fmt, settings.TELEMETRY_EXPORT_BATCH_SIZE
+        )
+    else:
+        stream = export.stream_telemetry(
+            Session(bind=db.get_bind()), device_id, start, end, fmt, settings.TELEMETRY_EXPORT_BATCH_SIZE
+        )
+    filename = f"telemetry-{device_id}.{fmt.value}"
+    return StreamingResponse(
+        stream,
+        media_type=export.MEDIA_TYPES[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+@device_router.get("/stats", response_model=schemas.MultiDeviceStats)
+async def get_multi_device_stats(
+    device_ids: List[str] = Query(["all"]),
+    time_window: schemas.TimeWindow | None = None,
+    start: datetime | None = None,
+    end: datetime | None = None,
+    resolution: schemas.Resolution | None = None,
+    fill: schemas.FillMode | None = None,
+    max_points: int | None = Query(None, ge=1),
+    format: schemas.SeriesFormat | None = None,
+    accept: str | None = Header(None),
+    db: Session = Depends(get_read_session),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Get energy usage for many devices at once, plus the whole-home total.
+    `device_ids` may be repeated or comma-separated; "all" (the default)
+    selects every device of the user. The range parameters work as on
+    `/devices/{device_id}/stats`, and every series shares the same bucket axis.
+    Ownership is verified with one IN query and all series come from one
+    grouped aggregation query. Columnar and packed encodings are negotiated
+    as on `/devices/{device_id}/stats`; packed columns are the devices in
+    order followed by the total.
+    """
+    requested = [part.strip() for value in device_ids for part in value.split(",") if part.strip()]
+    series_format = encoding.negotiate(accept, format)
+    return await run_db(
+        db, _multi_device_stats, current_user.id, requested,
+        time_window, start, end, resolution, fill, max_points, series_format,
+    )
 
 
-@device_router.get("/{device_id}/stats", response_model=schemas.DeviceStats)
-def get_device_stats(
+def _multi_device_stats(
+    db: Session,
+    owner_id: uuid.UUID,
+    requested: List[str],
+    time_window: schemas.TimeWindow | None,
+    start: datetime | None,
+    end: datetime | None,
+    resolution: schemas.Resolution | None,
+    fill: schemas.FillMode | None,
+    max_points: int | None,
+    series_format: schemas.SeriesFormat,
+):
+    query = db.query(Device.id, Device.name).filter(Device.owner_id == owner_id)
+    if "all" not in requested:
+        try:
+            wanted = list(dict.fromkeys(uuid.UUID(value) for value in requested))
+        except ValueError:
+            raise HTTPException(status.HTTP_422_UNPROCESSABLE_ENTITY, detail="device_ids must be UUIDs or \"all\".")
+        # Security Check: every requested device must belong to the current user
+        devices = query.filter(Device.id.in_(wanted)).all()
+        missing = set(wanted) - {device.id for device in devices}
+        if missing:
+            raise HTTPException(status.HTTP_404_NOT_FOUND, detail=f"Devices not found: {', '.join(sorted(map(str, missing)))}")
+        order = {device_id: index for index, device_id in enumerate(wanted)}
+        devices.sort(key=lambda device: order[device.id])
+    else:
+        devices = query.order_by(Device.name).all()
+
+    start, end, resolution = _resolve_range(time_window, start, end, resolution, max_points)
+    fill = fill or schemas.FillMode.ZERO
+    label_format = series.LABEL_FORMATS[resolution]
+
+    def to_points(points):
+        return [
+            schemas.EnergyUsagePoint(timestamp=bucket, total_energy=total, label=bucket.strftime(label_format))
+            for bucket, total in points
+        ]
+
+    by_device = series.build_series(db, [device.id for device in devices], start, end, resolution, fill)
+    if by_device:
+        total = series.sum_series(list(by_device.values()))
+    else:  # A home without devices still gets a flat axis
+        empty = 0.0 if fill == schemas.FillMode.ZERO else None
+        total = [(bucket, empty) for bucket in series.iter_buckets(start, end, resolution)]
+
+    if series_format != schemas.SeriesFormat.JSON:
+        timestamps = encoding.epoch_millis(bucket for bucket, _ in total)
+        metadata = {"start": start.isoformat(), "end": end.isoformat(), "resolution": resolution.value}
+        device_values = [[value for _, value in by_device[device.id]] for device in devices]
+        total_values = [value for _, value in total]
+        if series_format == schemas.SeriesFormat.COLUMNAR:
+            return encoding.columnar_response(timestamps, {
+                **metadata,
+                "devices": [
+                    {"device_id": str(device.id), "name": device.name, "values": values}
+                    for device, values in zip(devices, device_values)
+                ],
+                "total": total_values,
+            })
+        return encoding.packed_response(
+            timestamps, device_values + [total_values], [str(device.id) for device in devices] + ["total"], metadata
+        )
+
+    return schemas.MultiDeviceStats(
+        start=start,
+        end=end,
+        resolution=resolution,
+        devices=[
+            schemas.DeviceSeries(device_id=device.id, name=device.name, data_points=to_points(by_device[device.id]))
+            for device in devices
+        ],
+        total=to_points(total),
+    )
+
+
+@device_router.get(
+    "/{device_id}/stats",
+    response_model=schemas.DeviceStats,
+    responses={304: {"description": "Unchanged since the ETag given in If-None-Match"}},
+)
+async def get_device_stats(
+    response: Response,
     device_id: uuid.UUID,
-    time_window: schemas.TimeWindow,
-    db: Session = Depends(get_db),
+    time_window: schemas.TimeWindow | None = None,
+    start: datetime | None = None,
+    end: datetime | None = None,
+    resolution: schemas.Resolution | None = None,
+    fill: schemas.FillMode | None = None,
+    max_points: int | None = Query(None, ge=1),
+    format: schemas.SeriesFormat | None = None,
+    since: str | None = None,
+    accept: str | None = Header(None),
+    if_none_match: str | None = Header(None),
+    db: Session = Depends(get_read_session),
     current_user: User = Depends(get_current_user)
 ):
     """
@@ -98,66 +458,323 @@ def get_device_stats(
     - 7d: Last 7 days data with daily aggregation (7 bars)
     - 12h: Last 12 hours data with hourly aggregation (12 bars)
     - 6h: Last 6 hours data with hourly aggregation (6 bars)
+
+    Windows start on a bucket boundary, so responses are cached per
+    (device, window, current bucket) until the TTL expires or new readings for
+    the window are ingested.
+
+    Arbitrary ranges are requested with `start` (and optionally `end`, default
+    now) or with `time_window` plus any of `resolution`, `fill` and
+    `max_points`. They return one point per bucket, oldest first, with empty
+    buckets filled with 0 (`fill=zero`, the default) or null (`fill=null`).
+    Without a `resolution`, the finest one that fits `max_points` is used; a
+    requested resolution that would exceed `max_points` (or the
+    STATS_MAX_POINTS cap) is coarsened automatically.
+
+    Long series can be fetched without per-point objects: `format=columnar`
+    (or Accept: application/vnd.energy.columnar+json) returns parallel
+    `timestamps` (epoch ms) and `values` arrays, and `format=packed` (or
+    Accept: application/vnd.energy.packed) returns them as little-endian
+    int64/float64 arrays; see `encoding.py` for the layout.
+
+    Polling clients can avoid refetching the whole series: every response
+    carries a `watermark` (in the body, or the metadata of encoded formats)
+    and an ETag. With `since=<watermark>` only the buckets whose values
+    changed afterwards are returned (`delta: true`), and a matching
+    If-None-Match is answered with 304 when nothing in the range changed.
+    Both rely on the rollup tables; without them full responses are sent.
     """
+    since_at = None
+    if since is not None:
+        try:
+            since_at = deltas.decode_watermark(since)
+        except ValueError as e:
+            raise HTTPException(status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(e))
+
     # Security Check: Verify the device belongs to the current user
-    device = db.query(Device).filter(Device.id == device_id, Device.owner_id == current_user.id).first()
-    if not device:
-        raise HTTPException(status.HTTP_404_NOT_FOUND, detail="Device not found")
+    await _require_owned_device(db, current_user.id, device_id)
+
+    series_format = encoding.negotiate(accept, format)
+    result, etag = await run_db(
+        db, _device_stats, device_id, time_window, start, end, resolution, fill, max_points, series_format,
+        since_at, if_none_match,
+    )
+    if result is None:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+    if etag is not None:
+        (result if isinstance(result, Response) else response).headers["ETag"] = etag
+    return result
 
-    # Calculate the time window
+
+def _device_stats(
+    db: Session,
+    device_id: uuid.UUID,
+    time_window: schemas.TimeWindow | None,
+    start: datetime | None,
+    end: datetime | None,
+    resolution: schemas.Resolution | None,
+    fill: schemas.FillMode | None,
+    max_points: int | None,
+    series_format: schemas.SeriesFormat,
+    since: datetime | None = None,
+    if_none_match: str | None = None,
+):
+    """
+    Returns (response, ETag); the response is None when If-None-Match
+    matched and the ETag is None when deltas are not supported.
+    """
     now = datetime.now(timezone.utc)
-    if time_window == schemas.TimeWindow.SEVEN_DAYS:
-        start_date = now - timedelta(days=7)
-        # For 7 days, we group by date
-        stats = db.query(
-            func.date_trunc('day', Telemetry.timestamp).label('timestamp'),
-            func.sum(Telemetry.energy_usage).label('total_energy')
-        ).filter(
-            Telemetry.device_id == device_id,
-            Telemetry.timestamp >= start_date
-        ).group_by(
-            func.date_trunc('day', Telemetry.timestamp)
-        ).order_by(
-            func.date_trunc('day', Telemetry.timestamp).desc()
-        ).all()
-
-        # Convert to data points with day labels
-        data_points = [
-            schemas.EnergyUsagePoint(
-                timestamp=stat.timestamp,
-                total_energy=stat.total_energy,
-                label=stat.timestamp.strftime("%A")  # Day name
-            ) for stat in stats
-        ]
+    if start is None and end is None and resolution is None and fill is None and max_points is None:
+        if time_window is None:
+            raise HTTPException(status.HTTP_422_UNPROCESSABLE_ENTITY, detail="Provide time_window or start.")
+        window_start, unit, _ = _window_bounds(time_window, now)
+        etag = _stats_etag(
+            db, device_id, window_start, now, "window", time_window.value, window_start.isoformat(), series_format.value
+        )
+        if etag is not None and deltas.etag_matches(if_none_match, etag):
+            return None, etag
+        if since is not None and etag is not None:
+            stats = _window_delta(db, device_id, time_window, since, now)
+        else:
+            stats = _window_stats(db, device_id, time_window)
+        if series_format == schemas.SeriesFormat.JSON:
+            return stats, etag
+        points = [(point.timestamp, point.total_energy) for point in stats.data_points]
+        metadata = {"time_window": time_window.value, "watermark": stats.watermark, "delta": stats.delta}
+        return _encoded_series(series_format, device_id, points, metadata), etag
+
+    open_ended = end is None
+    start, end, resolution = _resolve_range(time_window, start, end, resolution, max_points)
+    fill = fill or schemas.FillMode.ZERO
+    etag = _stats_etag(
+        db, device_id, start, end, "range", start.isoformat(), end.isoformat(), resolution.value, fill.value, series_format.value
+    )
+    if etag is not None and deltas.etag_matches(if_none_match, etag):
+        return None, etag
+    delta = since is not None and etag is not None
+    if series_format == schemas.SeriesFormat.JSON:
+        if delta:
+            return _range_delta(db, device_id, start, end, resolution, fill, since, now), etag
+        return _range_stats(db, device_id, start, end, resolution, fill, open_ended), etag
+    # Straight from the aggregation to the encoder, with no per-point models
+    if delta:
+        points = _changed_points(db, device_id, start, end, resolution, fill, since)
+    else:
+        points = series.build_series(db, [device_id], start, end, resolution, fill)[device_id]
+    metadata = {
+        "start": start.isoformat(), "end": end.isoformat(), "resolution": resolution.value,
+        "watermark": deltas.encode_watermark(now), "delta": delta,
+    }
+    return _encoded_series(series_format, device_id, points, metadata), etag
+
+
+def _stats_etag(db: Session, device_id: uuid.UUID, start: datetime, end: datetime, *request_key) -> str | None:
+    if not deltas.supported():
+        return None
+    return deltas.state_tag(db, device_id, start, end, request_key)
+
+
+# Length of each preset window when it is used as the range of a ranged query.
+_WINDOW_SPANS = {
+    schemas.TimeWindow.SEVEN_DAYS: timedelta(days=7),
+    schemas.TimeWindow.TWELVE_HOURS: timedelta(hours=12),
+    schemas.TimeWindow.SIX_HOURS: timedelta(hours=6),
+}
 
+
+def _window_bounds(time_window: schemas.TimeWindow, now: datetime) -> tuple[datetime, str, str]:
+    """Start, bucket unit and label format of a preset window ending now."""
+    # 7 days are grouped by day, 12h/6h by hour
+    if time_window == schemas.TimeWindow.SEVEN_DAYS:
+        unit, label_format = "day", "%A"  # Day name
     else:  # 12h or 6h
-        hours = 12 if time_window == schemas.TimeWindow.TWELVE_HOURS else 6
-        start_date = now - timedelta(hours=hours)
-        
-        # For hours, we group by hour
-        stats = db.query(
-            func.date_trunc('hour', Telemetry.timestamp).label('timestamp'),
-            func.sum(Telemetry.energy_usage).label('total_energy')
-        ).filter(
-            Telemetry.device_id == device_id,
-            Telemetry.timestamp >= start_date
-        ).group_by(
-            func.date_trunc('hour', Telemetry.timestamp)
-        ).order_by(
-            func.date_trunc('hour', Telemetry.timestamp).desc()
-        ).all()
-
-        # Convert to data points with hour labels
-        data_points = [
-            schemas.EnergyUsagePoint(
-                timestamp=stat.timestamp,
-                total_energy=stat.total_energy,
-                label=stat.timestamp.strftime("%H:00")  # Hour in 24-hour format
-            ) for stat in stats
-        ]
+        unit, label_format = "hour", "%H:00"  # Hour in 24-hour format
+    return rollups.floor_time(now, unit) - _WINDOW_SPANS[time_window], unit, label_format
+
 
+def _window_stats(db: Session, device_id: uuid.UUID, time_window: schemas.TimeWindow) -> schemas.DeviceStats:
+    """The preset-window response: buckets with data only, newest first."""
+    now = datetime.now(timezone.utc)
+    start_date, unit, label_format = _window_bounds(time_window, now)
+    current_bucket = rollups.floor_time(now, unit)
+
+    cache_key = make_key(device_id, time_window.value, current_bucket.isoformat())
+    cached = stats_cache.get(cache_key)
+    if cached is not None:
+        return cached
+    generation = stats_cache.generation(device_id)
+
+    # Whole buckets come from the rollup tables; raw rows only cover the edges
+    stats = rollups.aggregate_buckets(db, [device_id], start_date, now, unit)
+
+    # Convert to data points, newest first
+    data_points = [
+        schemas.EnergyUsagePoint(
+            timestamp=stat.bucket,
+            total_energy=stat.total_energy,
+            label=stat.bucket.strftime(label_format)
+        ) for stat in reversed(stats)
+    ]
+
+    result = schemas.DeviceStats(
+        device_id=device_id,
+        time_window=time_window,
+        data_points=data_points,
+        watermark=deltas.encode_watermark(now),
+    )
+    stats_cache.set(cache_key, device_id, start_date, None, result, generation)
+    return result
+
+
+def _window_delta(
+    db: Session, device_id: uuid.UUID, time_window: schemas.TimeWindow, since: datetime, now: datetime
+) -> schemas.DeviceStats:
+    """The buckets of a preset window that changed after `since`, newest first."""
+    start_date, unit, label_format = _window_bounds(time_window, now)
+    step = timedelta(days=1) if unit == "day" else timedelta(hours=1)
+    ranges = deltas.changed_ranges(
+        deltas.changed_hours(db, device_id, start_date, now, since),
+        lambda ts: rollups.floor_time(ts, unit), lambda bucket: bucket + step, start_date, now,
+    )
+    stats = [stat for lo, hi in ranges for stat in rollups.aggregate_buckets(db, [device_id], lo, hi, unit)]
     return schemas.DeviceStats(
         device_id=device_id,
         time_window=time_window,
-        data_points=data_points
+        data_points=[
+            schemas.EnergyUsagePoint(timestamp=stat.bucket, total_energy=stat.total_energy, label=stat.bucket.strftime(label_format))
+            for stat in reversed(stats)
+        ],
+        watermark=deltas.encode_watermark(now),
+        delta=True,
     )
+
+
+def _resolve_range(
+    time_window: schemas.TimeWindow | None,
+    start: datetime | None,
+    end: datetime | None,
+    resolution: schemas.Resolution | None,
+    max_points: int | None,
+) -> tuple[datetime, datetime, schemas.Resolution]:
+    """
+    Validates the parameters of a ranged stats query and returns the aligned
+    [start, end) range with the resolution to use.
+    """
+    now = datetime.now(timezone.utc)
+    if start is None:
+        if time_window is None:
+            raise HTTPException(status.HTTP_422_UNPROCESSABLE_ENTITY, detail="Provide time_window or start.")
+        start = (end or now) - _WINDOW_SPANS[time_window]
+    elif time_window is not None:
+        raise HTTPException(status.HTTP_422_UNPROCESSABLE_ENTITY, detail="Use either time_window or start, not both.")
+    end = rollups.as_utc(end) if end is not None else now
+    start = rollups.as_utc(start)
+    if start >= end:
+        raise HTTPException(status.HTTP_422_UNPROCESSABLE_ENTITY, detail="start must be before end.")
+
+    limit = min(max_points or settings.STATS_MAX_POINTS, settings.STATS_MAX_POINTS)
+    try:
+        resolution = series.choose_resolution(start, end, limit, requested=resolution)
+    except ValueError as e:
+        raise HTTPException(status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(e))
+    start, end = series.align_range(start, end, resolution)
+    return start, end, resolution
+
+
+def _range_stats(
+    db: Session,
+    device_id: uuid.UUID,
+    start: datetime,
+    end: datetime,
+    resolution: schemas.Resolution,
+    fill: schemas.FillMode,
+    open_ended: bool,
+) -> schemas.DeviceStats:
+    """A ranged response: one point per bucket, oldest first, gaps filled."""
+    # Open-ended ranges end on the current bucket, so the key rolls over with it
+    cache_key = make_key(device_id, "range", start.isoformat(), end.isoformat(), resolution.value, fill.value)
+    cached = stats_cache.get(cache_key)
+    if cached is not None:
+        return cached
+    generation = stats_cache.generation(device_id)
+
+    computed_at = datetime.now(timezone.utc)
+    points = series.build_series(db, [device_id], start, end, resolution, fill)[device_id]
+    result = _ranged_response(device_id, start, end, resolution, points, computed_at)
+    stats_cache.set(cache_key, device_id, start, None if open_ended else end, result, generation)
+    return result
+
+
+def _range_delta(
+    db: Session,
+    device_id: uuid.UUID,
+    start: datetime,
+    end: datetime,
+    resolution: schemas.Resolution,
+    fill: schemas.FillMode,
+    since: datetime,
+    now: datetime,
+) -> schemas.DeviceStats:
+    """The buckets of a ranged response that changed after `since`, oldest first."""
+    points = _changed_points(db, device_id, start, end, resolution, fill, since)
+    return _ranged_response(device_id, start, end, resolution, points, now, delta=True)
+
+
+def _changed_points(
+    db: Session,
+    device_id: uuid.UUID,
+    start: datetime,
+    end: datetime,
+    resolution: schemas.Resolution,
+    fill: schemas.FillMode,
+    since: datetime,
+) -> List[tuple]:
+    """(bucket, total) for every bucket in [start, end) that changed after `since`; only those are aggregated."""
+    ranges = deltas.changed_ranges(
+        deltas.changed_hours(db, device_id, start, end, since),
+        lambda ts: series.floor_bucket(ts, resolution), lambda bucket: series.next_bucket(bucket, resolution),
+        start, end,
+    )
+    return [
+        point for lo, hi in ranges
+        for point in series.build_series(db, [device_id], lo, hi, resolution, fill)[device_id]
+    ]
+
+
+def _ranged_response(
+    device_id: uuid.UUID,
+    start: datetime,
+    end: datetime,
+    resolution: schemas.Resolution,
+    points: List[tuple],
+    computed_at: datetime,
+    delta: bool = False,
+) -> schemas.DeviceStats:
+    label_format = series.LABEL_FORMATS[resolution]
+    return schemas.DeviceStats(
+        device_id=device_id,
+        start=start,
+        end=end,
+        resolution=resolution,
+        data_points=[
+            schemas.EnergyUsagePoint(timestamp=bucket, total_energy=total, label=bucket.strftime(label_format))
+            for bucket, total in points
+        ],
+        watermark=deltas.encode_watermark(computed_at),
+        delta=delta,
+    )
+
+
+def _encoded_series(
+    series_format: schemas.SeriesFormat,
+    device_id: uuid.UUID,
+    points: List[tuple],
+    metadata: dict,
+) -> Response:
+    """Encodes one device's (bucket, total) pairs as columnar JSON or packed binary."""
+    timestamps = encoding.epoch_millis(bucket for bucket, _ in points)
+    values = [total for _, total in points]
+    metadata = {"device_id": str(device_id), **metadata}
+    if series_format == schemas.SeriesFormat.COLUMNAR:
+        return encoding.columnar_response(timestamps, {**metadata, "values": values})
+    return encoding.packed_response(timestamps, [values], [str(device_id)], metadata)
@@ -0,0 +1,89 @@
+# backend/app/modules/telemetry/export.py
+
+import json
+import uuid
+from datetime import datetime
+from typing import AsyncIterator, Iterator
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.models.device import Telemetry
+from . import schemas
+from .upload import CSV_HEADER
+
+MEDIA_TYPES = {
+    schemas.UploadFormat.CSV: "text/csv",
+    schemas.UploadFormat.NDJSON: "application/x-ndjson",
+}
+
+
+def _format_row(fmt: schemas.UploadFormat, device_id: str, timestamp: datetime, energy_usage) -> str:
+    if fmt == schemas.UploadFormat.CSV:
+        return f"{device_id},{timestamp.isoformat()},{energy_usage}\n"
+    return json.dumps({"device_id": device_id, "timestamp": timestamp.isoformat(), "energy_usage": energy_usage}) + "\n"
+
+
+def _export_statement(device_id: uuid.UUID, start: datetime | None, end: datetime | None, batch_size: int):
+    table = Telemetry.__table__
+    stmt = select(table.c.timestamp, table.c.energy_usage).where(table.c.device_id == device_id)
+    if start is not None:
+        stmt = stmt.where(table.c.timestamp >= start)
+    if end is not None:
+        stmt = stmt.where(table.c.timestamp < end)
+    return stmt.order_by(table.c.timestamp).execution_options(yield_per=batch_size)
+
+
+def _header(fmt: schemas.UploadFormat) -> bytes:
+    return f"{CSV_HEADER},timestamp,energy_usage\n".encode() if fmt == schemas.UploadFormat.CSV else b""
+
+
+def _encode_partition(fmt: schemas.UploadFormat, device: str, partition) -> bytes:
+    return "".join(_format_row(fmt, device, timestamp, energy) for timestamp, energy in partition).encode()
+
+
+def stream_telemetry(
+    db: Session,
+    device_id: uuid.UUID,
+    start: datetime | None,
+    end: datetime | None,
+    fmt: schemas.UploadFormat,
+    batch_size: int,
+) -> Iterator[bytes]:
+    """
+    Yields the device's raw readings in [start, end), oldest first, as CSV or
+    NDJSON in the same layout the upload endpoint accepts.
+
+    Rows are fetched with `yield_per`, which makes psycopg2 use a named
+    server-side cursor: only one batch is held in memory at a time and the
+    first bytes go out as soon as the first batch arrives. One chunk is
+    yielded per batch. The session is closed when the generator finishes or
+    the client disconnects.
+    """
+    device = str(device_id)
+    try:
+        yield _header(fmt)
+        for partition in db.execute(_export_statement(device_id, start, end, batch_size)).partitions():
+            yield _encode_partition(fmt, device, partition)
+    finally:
+        db.close()
+
+
+async def astream_telemetry(
+    db: AsyncSession,
+    device_id: uuid.UUID,
+    start: datetime | None,
+    end: datetime | None,
+    fmt: schemas.UploadFormat,
+    batch_size: int,
+) -> AsyncIterator[bytes]:
+    """`stream_telemetry` for an AsyncSession, streaming from an asyncpg server-side cursor."""
+    device = str(device_id)
+    try:
+        yield _header(fmt)
+        result = await db.stream(_export_statement(device_id, start, end, batch_size))
+        async for partition in result.partitions():
+            yield _encode_partition(fmt, device, partition)
+    finally:
+        await db.close()
@@ -0,0 +1,187 @@
+# backend/app/modules/telemetry/ingest_queue.py
+
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, List
+
+from app.core import metrics
+from app.core.config import settings
+from app.core.db import SessionLocal
+from . import service
+
+
+def write_batch(rows: List[dict]) -> None:
+    """Writes one flushed batch in its own session and transaction."""
+    db = SessionLocal()
+    try:
+        service.upsert_telemetry(db, rows)
+        db.commit()
+    finally:
+        db.close()
+
+
+class TelemetryIngestQueue:
+    """
+    Bounded in-process queue with a write-behind flusher thread.
+
+    Request handlers `put` validated rows and return immediately; the flusher
+    drains the queue into batched inserts whenever `batch_size` rows are
+    waiting or `flush_interval` seconds have passed since the first row of the
+    batch arrived. A failed write is retried up to `max_retries` times with
+    exponential backoff (capped at `retry_backoff_max`) while new rows wait in
+    the queue; only then are its rows dropped and counted. Rows still queued
+    when the process shuts down are written by `stop` before it returns.
+    """
+    def __init__(
+        self,
+        max_size: int,
+        batch_size: int,
+        flush_interval: float,
+        flush_batch: Callable[[List[dict]], None] = write_batch,
+        max_retries: int = 5,
+        retry_backoff: float = 0.5,
+        retry_backoff_max: float = 10.0,
+    ):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.flush_batch = flush_batch
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self.retry_backoff_max = retry_backoff_max
+        self._queue: queue.Queue = queue.Queue(maxsize=max_size)
+        self._stopping = threading.Event()
+        self._thread: threading.Thread | None = None
+
+        self._lock = threading.Lock()
+        self._enqueued = 0
+        self._rejected = 0
+        self._flushed = 0
+        self._retries = 0
+        self._dropped = 0
+        self._flushes = 0
+        self._last_flush_ms = 0.0
+        self._total_flush_ms = 0.0
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def put(self, row: dict, timeout: float | None = None) -> bool:
+        """
+        Queues a row for writing. Returns False when the queue is full, after
+        waiting up to `timeout` seconds if one is given.
+        """
+        try:
+            if timeout:
+                self._queue.put(row, timeout=timeout)
+            else:
+                self._queue.put_nowait(row)
+        except queue.Full:
+            with self._lock:
+                self._rejected += 1
+            return False
+        with self._lock:
+            self._enqueued += 1
+        return True
+
+    def start(self) -> None:
+        if self.running:
+            return
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name="telemetry-flusher", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 30.0) -> None:
+        """Stops the flusher after writing everything that is still queued."""
+        self._stopping.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            if self._thread.is_alive():
+                # Still writing (e.g. retrying a failed batch): draining here as
+                # well would race it, so leave the rest to the flusher.
+                print(f"Telemetry flusher still running after {timeout}s; {self._queue.qsize()} points left queued.")
+                return
+            self._thread = None
+        # Anything left over (e.g. the flusher was never started) is written here.
+        while not self._queue.empty():
+            self._flush(self._take_batch(deadline=time.monotonic()))
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "running": self.running,
+                "depth": self._queue.qsize(),
+                "capacity": self._queue.maxsize,
+                "enqueued": self._enqueued,
+                "rejected": self._rejected,
+                "flushed": self._flushed,
+                "retries": self._retries,
+                "dropped": self._dropped,
+                "flushes": self._flushes,
+                "last_flush_ms": round(self._last_flush_ms, 3),
+                "avg_flush_ms": round(self._total_flush_ms / self._flushes, 3) if self._flushes else 0.0,
+            }
+
+    def _run(self) -> None:
+        while not (self._stopping.is_set() and self._queue.empty()):
+            try:
+                first = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                continue
+            batch = [first] + self._take_batch(deadline=time.monotonic() + self.flush_interval, limit=self.batch_size - 1)
+            self._flush(batch)
+
+    def _take_batch(self, deadline: float, limit: int | None = None) -> List[dict]:
+        limit = self.batch_size if limit is None else limit
+        batch: List[dict] = []
+        while len(batch) < limit:
+            remaining = deadline - time.monotonic()
+            try:
+                if remaining > 0 and not self._stopping.is_set():
+                    batch.append(self._queue.get(timeout=remaining))
+                else:
+                    batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _flush(self, batch: List[dict]) -> None:
+        if not batch:
+            return
+        started = time.perf_counter()
+        succeeded = False
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                with self._lock:
+                    self._retries += 1
+                time.sleep(min(self.retry_backoff * 2 ** (attempt - 1), self.retry_backoff_max))
+            try:
+                self.flush_batch(batch)
+                succeeded = True
+                break
+            except Exception as e:
+                error = e
+        if not succeeded:
+            print(f"Telemetry flush of {len(batch)} points failed after {self.max_retries + 1} attempts, dropping them: {error}")
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        with self._lock:
+            self._flushes += 1
+            self._last_flush_ms = elapsed_ms
+            self._total_flush_ms += elapsed_ms
+            if succeeded:
+                self._flushed += len(batch)
+            else:
+                self._dropped += len(batch)
+
+
+# Process-wide queue used by the telemetry endpoint when TELEMETRY_INGEST_MODE is "queued".
+ingest_queue = TelemetryIngestQueue(
+    max_size=settings.TELEMETRY_QUEUE_MAX_SIZE,
+    batch_size=settings.TELEMETRY_FLUSH_BATCH_SIZE,
+    flush_interval=settings.TELEMETRY_FLUSH_INTERVAL_SECONDS,
+    max_retries=settings.TELEMETRY_FLUSH_MAX_RETRIES,
+    retry_backoff=settings.TELEMETRY_FLUSH_RETRY_BACKOFF_SECONDS,
+    retry_backoff_max=settings.TELEMETRY_FLUSH_RETRY_BACKOFF_MAX_SECONDS,
+)
+metrics.register("telemetry_ingest_queue", lambda: ingest_queue.metrics())
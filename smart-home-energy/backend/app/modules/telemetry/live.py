@@ -0,0 +1,290 @@
+# backend/app/modules/telemetry/live.py
+
+import asyncio
+import json
+import os
+import threading
+import uuid
+from collections import defaultdict
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional, Sequence
+
+from sqlalchemy import and_, event, or_, select
+from sqlalchemy.orm import Session
+
+from app.core import metrics
+from app.core.config import settings
+from app.core.notify import notify, notify_listener
+from . import rollups
+
+# Postgres channel that carries committed telemetry between workers.
+CHANNEL = "telemetry_live"
+
+# Session.info keys: points written in the current transaction, and the
+# events built from them that wait for the commit to be published locally.
+_POINTS_KEY = "telemetry_live_points"
+_EVENTS_KEY = "telemetry_live_events"
+
+# NOTIFY payloads must stay below 8000 bytes.
+_MAX_PAYLOAD_BYTES = 7900
+
+# Tags this process's NOTIFYs so its listener can skip events it already
+# published locally. The pid tells apart workers forked after import.
+_INSTANCE = uuid.uuid4().hex
+
+# Upper bound on the number of (device, bucket) conditions in one lookup.
+_MAX_CONDITIONS = 500
+
+
+class Subscription:
+    """
+    One live stream: the devices it follows and a bounded buffer of encoded
+    events. A None in the buffer means the subscriber fell behind and was dropped.
+    """
+    def __init__(self, device_ids: Iterable[uuid.UUID], buffer_size: int):
+        self.device_ids = frozenset(device_ids)
+        self.queue: asyncio.Queue = asyncio.Queue(buffer_size)
+        self.dropped = False
+
+
+class LiveBroker:
+    """
+    In-process pub/sub for live telemetry events, keyed by device.
+
+    Events are published from any thread (request threadpool, ingest flusher,
+    the NOTIFY listener) and handed to the event loop, where they are put on
+    each interested subscriber's bounded queue without waiting. A subscriber
+    whose queue is full is dropped instead of slowing down everyone else.
+    """
+    def __init__(self, buffer_size: int):
+        self.buffer_size = buffer_size
+        self._subscribers: Dict[uuid.UUID, set] = defaultdict(set)
+        self._active: set = set()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._lock = threading.Lock()
+        self.published = 0
+        self.delivered = 0
+        self.dropped = 0
+
+    def subscribe(self, device_ids: Iterable[uuid.UUID]) -> Subscription:
+        """Registers a subscription; must be called on the event loop that will consume it."""
+        self._loop = asyncio.get_running_loop()
+        subscription = Subscription(device_ids, self.buffer_size)
+        self._active.add(subscription)
+        for device_id in subscription.device_ids:
+            self._subscribers[device_id].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        self._active.discard(subscription)
+        for device_id in subscription.device_ids:
+            subscribers = self._subscribers.get(device_id)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[device_id]
+
+    def publish(self, events: Sequence[dict]) -> None:
+        """Hands events to the subscribers' loop; safe to call from any thread."""
+        loop = self._loop
+        if not events or loop is None or not self._subscribers:
+            return
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            self._deliver(events)
+            return
+        try:
+            loop.call_soon_threadsafe(self._deliver, events)
+        except RuntimeError:
+            # The loop has been closed, e.g. during shutdown
+            pass
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "subscribers": len(self._active),
+                "devices": len(self._subscribers),
+                "published": self.published,
+                "delivered": self.delivered,
+                "dropped_subscribers": self.dropped,
+                "listener": notify_listener.metrics(),
+            }
+
+    def _deliver(self, events: Sequence[dict]) -> None:
+        delivered = dropped = 0
+        for live_event in events:
+            subscribers = self._subscribers.get(uuid.UUID(live_event["device_id"]))
+            if not subscribers:
+                continue
+            # Encoded once and shared by every subscriber of the device.
+            message = encode_event(live_event)
+            for subscription in list(subscribers):
+                try:
+                    subscription.queue.put_nowait(message)
+                    delivered += 1
+                except asyncio.QueueFull:
+                    self._drop(subscription)
+                    dropped += 1
+        with self._lock:
+            self.published += len(events)
+            self.delivered += delivered
+            self.dropped += dropped
+
+    def _drop(self, subscription: Subscription) -> None:
+        self.unsubscribe(subscription)
+        subscription.dropped = True
+        # Make room for the end-of-stream marker; the stream ends right after.
+        while not subscription.queue.empty():
+            subscription.queue.get_nowait()
+        subscription.queue.put_nowait(None)
+
+
+def encode_event(live_event: dict) -> str:
+    return f"event: telemetry\ndata: {json.dumps(live_event, separators=(',', ':'))}\n\n"
+
+
+async def stream_events(
+    broker: LiveBroker, device_ids: Iterable[uuid.UUID], heartbeat: float
+) -> AsyncIterator[str]:
+    """
+    Server-Sent Events for the given devices. Idle periods are filled with
+    comment lines; a dropped subscriber gets a final `dropped` event. The
+    subscription lives exactly as long as the stream (including disconnects).
+    """
+    subscription = broker.subscribe(device_ids)
+    try:
+        yield f"retry: {int(heartbeat * 1000)}\n\n"
+        while True:
+            try:
+                message = await asyncio.wait_for(subscription.queue.get(), heartbeat)
+            except asyncio.TimeoutError:
+                yield ": keep-alive\n\n"
+                continue
+            if message is None:
+                yield "event: dropped\ndata: {}\n\n"
+                return
+            yield message
+    finally:
+        broker.unsubscribe(subscription)
+
+
+def record_points(db: Session, rows: Sequence[dict]) -> None:
+    """
+    Remembers the newest points per device written in the session's current
+    transaction; they are announced when (and only if) it commits.
+    """
+    if not settings.TELEMETRY_LIVE_ENABLED or not rows:
+        return
+    points = db.info.setdefault(_POINTS_KEY, defaultdict(dict))
+    for row in rows:
+        points[row["device_id"]][rollups.as_utc(row["timestamp"])] = row["energy_usage"]
+
+
+def _bucket_payload(row) -> dict:
+    return {
+        "bucket": rollups.as_utc(row.bucket).isoformat(),
+        "total_energy": row.total_energy,
+        "sample_count": row.sample_count,
+        "min_energy": row.min_energy,
+        "max_energy": row.max_energy,
+    }
+
+
+def _current_buckets(db: Session, latest: Dict[uuid.UUID, Any]) -> Dict[uuid.UUID, Dict[str, dict]]:
+    """The rollup rows of the hour and day each device's newest point falls into."""
+    buckets: Dict[uuid.UUID, Dict[str, dict]] = defaultdict(dict)
+    if not settings.TELEMETRY_ROLLUPS_ENABLED:
+        return buckets
+    for unit, model in rollups.ROLLUPS.items():
+        table = model.__table__
+        conditions = [
+            and_(table.c.device_id == device_id, table.c.bucket == rollups.floor_time(ts, unit))
+            for device_id, ts in latest.items()
+        ]
+        for offset in range(0, len(conditions), _MAX_CONDITIONS):
+            for row in db.execute(select(table).where(or_(*conditions[offset:offset + _MAX_CONDITIONS]))):
+                buckets[row.device_id][unit] = _bucket_payload(row)
+    return buckets
+
+
+def build_events(db: Session, points: Dict[uuid.UUID, Dict[Any, float]]) -> List[dict]:
+    """One event per device: its newest points and its current hourly and daily buckets."""
+    latest = {device_id: max(readings) for device_id, readings in points.items()}
+    buckets = _current_buckets(db, latest)
+    events = []
+    for device_id, readings in points.items():
+        newest = sorted(readings)[-settings.TELEMETRY_LIVE_MAX_POINTS:]
+        events.append({
+            "device_id": str(device_id),
+            "points": [{"timestamp": ts.isoformat(), "energy_usage": readings[ts]} for ts in newest],
+            "buckets": buckets.get(device_id, {}),
+        })
+    return events
+
+
+def origin() -> str:
+    """Identifies the current worker process in NOTIFY payloads."""
+    return f"{_INSTANCE}-{os.getpid()}"
+
+
+def notify_payloads(events: Sequence[dict], sender: str) -> List[str]:
+    """
+    Packs events into as few NOTIFY payloads as fit, each a JSON object
+    with the sending worker's `origin` and an `events` array.
+    """
+    prefix = '{"origin":' + json.dumps(sender) + ',"events":['
+    payloads, current, size = [], [], len(prefix) + 2
+    for live_event in events:
+        encoded = json.dumps(live_event, separators=(",", ":"))
+        if current and size + len(encoded) + 1 > _MAX_PAYLOAD_BYTES:
+            payloads.append(prefix + ",".join(current) + "]}")
+            current, size = [], len(prefix) + 2
+        current.append(encoded)
+        size += len(encoded) + 1
+    if current:
+        payloads.append(prefix + ",".join(current) + "]}")
+    return payloads
+
+
+def receive_notification(payload: str) -> None:
+    """Publishes events another worker committed; this worker's own were published at commit."""
+    message = json.loads(payload)
+    if message["origin"] != origin():
+        live_broker.publish(message["events"])
+
+
+@event.listens_for(Session, "before_commit")
+def _announce_before_commit(session: Session) -> None:
+    points = session.info.pop(_POINTS_KEY, None)
+    if not points:
+        return
+    events = build_events(session, points)
+    # Published here right after the commit, whatever happens to the NOTIFY:
+    # behind a transaction-mode pooler it is never delivered.
+    session.info[_EVENTS_KEY] = events
+    if session.get_bind().dialect.name == "postgresql":
+        # Postgres delivers the notification when the transaction commits, to
+        # every worker's listener, and never on rollback.
+        for payload in notify_payloads(events, origin()):
+            notify(session, CHANNEL, payload)
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_after_commit(session: Session) -> None:
+    events = session.info.pop(_EVENTS_KEY, None)
+    if events:
+        live_broker.publish(events)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_after_rollback(session: Session) -> None:
+    session.info.pop(_POINTS_KEY, None)
+    session.info.pop(_EVENTS_KEY, None)
+
+
+live_broker = LiveBroker(settings.TELEMETRY_LIVE_BUFFER_SIZE)
+# Other workers' ingests arrive through the shared listener.
+notify_listener.listen(CHANNEL, receive_notification)
+metrics.register("telemetry_live", live_broker.metrics)
@@ -0,0 +1,94 @@
+# backend/app/modules/telemetry/ownership.py
+
+import threading
+import uuid
+from typing import Any, Dict, Iterable
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session, object_session
+
+from app.core import metrics
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.models.device import Device
+
+# Session.info key under which device changes wait for the commit.
+_CHANGED_KEY = "devices_changed"
+
+
+class DeviceOwnershipIndex:
+    """
+    Bounded in-memory map of device id -> owner id used for authorization.
+
+    Only devices that exist are stored, so an unknown or foreign id always
+    costs one query, never a wrong answer. Lookups for the devices missing
+    from the index are batched into a single IN query. Entries are dropped
+    when a device is inserted, re-owned or deleted and that transaction
+    commits; other workers catch up within the TTL.
+    """
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self._owners = TTLCache(max_entries, ttl_seconds)
+        self._lock = threading.Lock()
+        self.checks = 0
+        self.cached_checks = 0
+
+    def owned_ids(self, db: Session, owner_id: uuid.UUID, device_ids: Iterable[uuid.UUID]) -> set[uuid.UUID]:
+        """Returns the subset of `device_ids` that belong to `owner_id`."""
+        distinct_ids = set(device_ids)
+        if not distinct_ids:
+            return set()
+        owners = {device_id: self._owners.get(device_id) for device_id in distinct_ids}
+        unknown_ids = [device_id for device_id, owner in owners.items() if owner is None]
+        if unknown_ids:
+            for device_id, device_owner in db.query(Device.id, Device.owner_id).filter(Device.id.in_(unknown_ids)):
+                owners[device_id] = device_owner
+                self._owners.set(device_id, device_owner)
+        with self._lock:
+            self.checks += 1
+            self.cached_checks += not unknown_ids
+        return {device_id for device_id, owner in owners.items() if owner == owner_id}
+
+    def warm(self, db: Session) -> int:
+        """Loads up to `max_entries` devices into the index; returns how many."""
+        rows = db.query(Device.id, Device.owner_id).limit(self._owners.max_entries).all()
+        for device_id, owner_id in rows:
+            self._owners.set(device_id, owner_id)
+        return len(rows)
+
+    def invalidate(self, device_id: uuid.UUID) -> None:
+        self._owners.delete(device_id)
+
+    def clear(self) -> None:
+        self._owners.clear()
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            **self._owners.metrics(),
+            "checks": self.checks,
+            "cached_checks": self.cached_checks,
+            "check_hit_rate": round(self.cached_checks / self.checks, 4) if self.checks else 0.0,
+        }
+
+
+ownership_index = DeviceOwnershipIndex(settings.DEVICE_OWNERSHIP_MAX_ENTRIES, settings.DEVICE_OWNERSHIP_TTL_SECONDS)
+metrics.register("device_ownership", ownership_index.metrics)
+
+
+@event.listens_for(Device, "after_insert")
+@event.listens_for(Device, "after_update")
+@event.listens_for(Device, "after_delete")
+def _record_change(mapper, connection, device: Device) -> None:
+    session = object_session(device)
+    if session is not None:
+        session.info.setdefault(_CHANGED_KEY, set()).add(device.id)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_after_commit(session: Session) -> None:
+    for device_id in session.info.pop(_CHANGED_KEY, ()):
+        ownership_index.invalidate(device_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_after_rollback(session: Session) -> None:
+    session.info.pop(_CHANGED_KEY, None)
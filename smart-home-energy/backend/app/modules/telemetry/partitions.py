@@ -0,0 +1,169 @@
+# backend/app/modules/telemetry/partitions.py
+
+import re
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Sequence
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.core import metrics
+from app.core.config import settings
+from app.core.db import SessionLocal, engine
+from app.core.locks import exclusive_run
+from app.core.tasks import PeriodicTask
+from .rollups import floor_time
+
+PARENT_TABLE = "telemetry"
+DEFAULT_PARTITION = "telemetry_default"
+
+_BOUND = re.compile(r"FROM \((.+?)\) TO \((.+?)\)")
+
+
+@dataclass(frozen=True)
+class Partition:
+    """One range partition of `telemetry`; None bounds stand for MINVALUE/MAXVALUE."""
+    name: str
+    start: Optional[datetime]
+    end: Optional[datetime]
+
+    def overlaps(self, start: datetime, end: datetime) -> bool:
+        return (self.start is None or self.start < end) and (self.end is None or start < self.end)
+
+
+def partition_start(ts: datetime, interval: str) -> datetime:
+    """Start of the `interval` partition containing `ts`; weeks start on Monday (UTC)."""
+    if interval == "week":
+        day = floor_time(ts, "day")
+        return day - timedelta(days=day.weekday())
+    return floor_time(ts, "month")
+
+
+def next_partition_start(start: datetime, interval: str) -> datetime:
+    if interval == "week":
+        return start + timedelta(weeks=1)
+    return start.replace(year=start.year + start.month // 12, month=start.month % 12 + 1)
+
+
+def partition_name(start: datetime) -> str:
+    return f"{PARENT_TABLE}_p{start:%Y%m%d}"
+
+
+def plan_partitions(
+    existing: Sequence[Partition], start: datetime, end: datetime, interval: str
+) -> List[Partition]:
+    """
+    Partitions of width `interval` needed to cover [start, end), skipping any
+    that would overlap an existing one (e.g. after the interval was changed).
+    """
+    planned = []
+    bucket = partition_start(start, interval)
+    while bucket < end:
+        upper = next_partition_start(bucket, interval)
+        if not any(partition.overlaps(bucket, upper) for partition in existing):
+            planned.append(Partition(partition_name(bucket), bucket, upper))
+        bucket = upper
+    return planned
+
+
+def is_partitioned(db: Session) -> bool:
+    if db.get_bind().dialect.name != "postgresql":
+        return False
+    return db.execute(text(
+        "SELECT EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(:parent))"
+    ), {"parent": PARENT_TABLE}).scalar()
+
+
+def _parse_bound(value: str) -> Optional[datetime]:
+    if value in ("MINVALUE", "MAXVALUE"):
+        return None
+    return datetime.fromisoformat(value.strip("'")).astimezone(timezone.utc)
+
+
+def list_partitions(db: Session) -> List[Partition]:
+    """Range partitions of `telemetry`, oldest first; the default partition is left out."""
+    rows = db.execute(text("""
+        SELECT child.relname AS name, pg_get_expr(child.relpartbound, child.oid) AS bound
+        FROM pg_inherits
+        JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+        WHERE pg_inherits.inhparent = to_regclass(:parent)
+    """), {"parent": PARENT_TABLE}).all()
+    partitions = []
+    for row in rows:
+        match = _BOUND.search(row.bound)
+        if match:
+            partitions.append(Partition(row.name, _parse_bound(match.group(1)), _parse_bound(match.group(2))))
+    return sorted(partitions, key=lambda p: p.start or datetime.min.replace(tzinfo=timezone.utc))
+
+
+def create_partition(db: Session, partition: Partition) -> None:
+    """
+    Creates `partition`. Rows that already landed in the default partition
+    for its range are moved into it, since Postgres refuses to create a
+    partition whose rows are still in the default one.
+    """
+    bounds = {"start": partition.start, "end": partition.end}
+    db.execute(text(
+        f"CREATE TEMP TABLE IF NOT EXISTS telemetry_moved (LIKE {PARENT_TABLE}) ON COMMIT DROP"
+    ))
+    db.execute(text(f"""
+        WITH moved AS (
+            DELETE FROM {DEFAULT_PARTITION} WHERE "timestamp" >= :start AND "timestamp" < :end RETURNING *
+        )
+        INSERT INTO telemetry_moved SELECT * FROM moved
+    """), bounds)
+    # DDL cannot take bind parameters; the bounds are datetimes we computed.
+    db.execute(text(
+        f"CREATE TABLE {partition.name} PARTITION OF {PARENT_TABLE} "
+        f"FOR VALUES FROM ('{partition.start.isoformat()}') TO ('{partition.end.isoformat()}')"
+    ))
+    db.execute(text(f"INSERT INTO {PARENT_TABLE} SELECT * FROM telemetry_moved"))
+    db.execute(text("TRUNCATE telemetry_moved"))
+
+
+def ensure_partitions(
+    db: Session,
+    now: Optional[datetime] = None,
+    ahead: int = settings.TELEMETRY_PARTITIONS_AHEAD,
+    interval: str = settings.TELEMETRY_PARTITION_INTERVAL,
+) -> List[str]:
+    """
+    Creates any missing partition from the current one through `ahead`
+    intervals into the future. Returns the names created; the caller commits.
+    """
+    start = partition_start(now or datetime.now(timezone.utc), interval)
+    end = start
+    for _ in range(ahead + 1):
+        end = next_partition_start(end, interval)
+    planned = plan_partitions(list_partitions(db), start, end, interval)
+    for partition in planned:
+        create_partition(db, partition)
+    return [partition.name for partition in planned]
+
+
+def maintain_partitions() -> Dict[str, object]:
+    """
+    One run of the partition manager, in exactly one worker at a time; a
+    no-op until `telemetry` is partitioned.
+    """
+    with exclusive_run(engine, "telemetry-partitions") as acquired:
+        if not acquired:
+            return {"skipped": "running in another worker"}
+        db = SessionLocal()
+        try:
+            if not is_partitioned(db):
+                return {"partitioned": False}
+            created = ensure_partitions(db)
+            db.commit()
+            if created:
+                print(f"Created telemetry partitions: {', '.join(created)}")
+            return {"partitioned": True, "created": created}
+        finally:
+            db.close()
+
+
+partition_manager = PeriodicTask(
+    "telemetry-partitions", settings.TELEMETRY_PARTITION_CHECK_INTERVAL_SECONDS, maintain_partitions
+)
+metrics.register("telemetry_partitions", partition_manager.metrics)
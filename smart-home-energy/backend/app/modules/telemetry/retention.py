@@ -0,0 +1,182 @@
+# backend/app/modules/telemetry/retention.py
+
+import uuid
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Mapping, Optional
+
+from sqlalchemy import delete, func, select, text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+
+from app.core import metrics
+from app.core.config import settings
+from app.core.db import SessionLocal, engine
+from app.core.locks import exclusive_run
+from app.core.tasks import PeriodicTask
+from app.models.device import Device, Telemetry, TelemetryDaily, TelemetryHourly
+from . import partitions, rollups, stats_cache
+
+DEFAULT_POLICY = "default"
+
+
+@dataclass(frozen=True)
+class RetentionPolicy:
+    """Days to keep each level of data; None keeps it forever."""
+    raw: Optional[int] = None
+    hourly: Optional[int] = None
+    daily: Optional[int] = None
+
+    def __post_init__(self):
+        # Every level is built from the finer one, so a coarser level may not
+        # expire before a finer one.
+        forever = float("inf")
+        raw, hourly, daily = (forever if days is None else days for days in (self.raw, self.hourly, self.daily))
+        if not raw <= hourly <= daily:
+            raise ValueError(f"Retention must not shrink from raw to hourly to daily: {self}")
+
+    def cutoff(self, level: str, now: datetime) -> Optional[datetime]:
+        """Data of `level` older than this (a UTC midnight) has expired."""
+        days = getattr(self, level)
+        return None if days is None else rollups.floor_time(now - timedelta(days=days), "day")
+
+
+def load_policies(config: Mapping[str, Mapping[str, Optional[int]]]) -> Dict[str, RetentionPolicy]:
+    policies = {device_type: RetentionPolicy(**levels) for device_type, levels in config.items()}
+    policies.setdefault(DEFAULT_POLICY, RetentionPolicy())
+    return policies
+
+
+def _devices_by_policy(db: Session, policies: Dict[str, RetentionPolicy]) -> Dict[str, List[uuid.UUID]]:
+    grouped = defaultdict(list)
+    for device_id, device_type in db.query(Device.id, Device.type):
+        grouped[device_type if device_type in policies else DEFAULT_POLICY].append(device_id)
+    return grouped
+
+
+def expire_raw(db: Session, device_id: uuid.UUID, cutoff: datetime, batch_size: int) -> int:
+    """
+    Deletes a device's raw readings older than `cutoff`, oldest first, in
+    transactions of about `batch_size` rows. Each batch covers whole hours,
+    which are rolled up from the raw rows right before they are deleted.
+    Returns the number of rows deleted.
+    """
+    raw = Telemetry.__table__
+    deleted = 0
+    while True:
+        oldest_batch = select(raw.c.timestamp).where(
+            raw.c.device_id == device_id, raw.c.timestamp < cutoff
+        ).order_by(raw.c.timestamp).limit(batch_size).subquery()
+        first, last = db.execute(select(func.min(oldest_batch.c.timestamp), func.max(oldest_batch.c.timestamp))).one()
+        if first is None:
+            return deleted
+        start = rollups.floor_time(first, "hour")
+        end = min(rollups.floor_time(last, "hour") + timedelta(hours=1), cutoff)
+        rollups.rebuild_rollups(db, start, end, [device_id])
+        deleted += db.execute(delete(raw).where(
+            raw.c.device_id == device_id, raw.c.timestamp >= start, raw.c.timestamp < end
+        )).rowcount
+        stats_cache.record_changed(db, device_id, start, end)
+        db.commit()
+
+
+def expire_rollups(db: Session, level: str, device_ids: List[uuid.UUID], cutoff: datetime) -> int:
+    """Deletes `level` rollup rows older than `cutoff`; hourly rows are folded into days first."""
+    table = (TelemetryHourly if level == "hourly" else TelemetryDaily).__table__
+    deleted = 0
+    for device_id in device_ids:
+        oldest = db.execute(select(func.min(table.c.bucket)).where(table.c.device_id == device_id)).scalar()
+        if oldest is None or rollups.as_utc(oldest) >= cutoff:
+            continue
+        if level == "hourly":
+            rollups.rebuild_rollups(db, oldest, cutoff, [device_id], units=("day",))
+        deleted += db.execute(delete(table).where(table.c.device_id == device_id, table.c.bucket < cutoff)).rowcount
+        stats_cache.record_changed(db, device_id, oldest, cutoff)
+        db.commit()
+    return deleted
+
+
+def drop_expired_partitions(db: Session, cutoff: datetime) -> List[str]:
+    """
+    Detaches and drops every telemetry partition that ends at or before
+    `cutoff`, after rolling its rows up. A partition whose lock cannot be had
+    within TELEMETRY_RETENTION_LOCK_TIMEOUT_MS is left for the next run.
+    """
+    dropped = []
+    for partition in partitions.list_partitions(db):
+        if partition.end is None or partition.end > cutoff:
+            continue
+        spans = db.execute(text(
+            f'SELECT device_id, min("timestamp"), max("timestamp") FROM {partition.name} GROUP BY device_id'
+        )).all()
+        for device_id, first, last in spans:
+            # rebuild_rollups takes a half-open range
+            rollups.rebuild_rollups(db, first, last + timedelta(microseconds=1), [device_id])
+            stats_cache.record_changed(db, device_id, first, last)
+        try:
+            db.execute(text(f"SET LOCAL lock_timeout = {int(settings.TELEMETRY_RETENTION_LOCK_TIMEOUT_MS)}"))
+            db.execute(text(f"ALTER TABLE {partitions.PARENT_TABLE} DETACH PARTITION {partition.name}"))
+            db.execute(text(f"DROP TABLE {partition.name}"))
+            db.commit()
+        except OperationalError as e:
+            db.rollback()
+            print(f"Could not drop telemetry partition {partition.name} yet: {e}")
+            continue
+        dropped.append(partition.name)
+    return dropped
+
+
+def apply_retention(
+    db: Session, policies: Dict[str, RetentionPolicy], now: Optional[datetime] = None
+) -> Dict[str, object]:
+    """
+    Applies every policy once. Whole partitions are dropped when the raw
+    retention of every policy has passed them; anything left is deleted in
+    batches per device. Returns what was removed.
+    """
+    now = now or datetime.now(timezone.utc)
+    result: Dict[str, object] = {"partitions_dropped": [], "raw": 0, "hourly": 0, "daily": 0}
+
+    raw_cutoffs = [policy.cutoff("raw", now) for policy in policies.values()]
+    if None not in raw_cutoffs and partitions.is_partitioned(db):
+        result["partitions_dropped"] = drop_expired_partitions(db, min(raw_cutoffs))
+
+    for policy_name, device_ids in _devices_by_policy(db, policies).items():
+        policy = policies[policy_name]
+        raw_cutoff = policy.cutoff("raw", now)
+        if raw_cutoff is not None:
+            for device_id in device_ids:
+                result["raw"] += expire_raw(db, device_id, raw_cutoff, settings.TELEMETRY_RETENTION_BATCH_SIZE)
+        for level in ("hourly", "daily"):
+            cutoff = policy.cutoff(level, now)
+            if cutoff is not None:
+                result[level] += expire_rollups(db, level, device_ids, cutoff)
+    return result
+
+
+retention_policies = load_policies(settings.TELEMETRY_RETENTION_POLICIES)
+
+
+def run_retention() -> Dict[str, object]:
+    """One run of the retention job, in exactly one worker at a time."""
+    with exclusive_run(engine, "telemetry-retention") as acquired:
+        if not acquired:
+            return {"skipped": "running in another worker"}
+        db = SessionLocal()
+        try:
+            return apply_retention(db, retention_policies)
+        finally:
+            db.close()
+
+
+retention_job = PeriodicTask("telemetry-retention", settings.TELEMETRY_RETENTION_INTERVAL_SECONDS, run_retention)
+metrics.register("telemetry_retention", retention_job.metrics)
+
+
+def retention_configured() -> bool:
+    return any(
+        days is not None
+        for policy in retention_policies.values()
+        for days in (policy.raw, policy.hourly, policy.daily)
+    )
@@ -0,0 +1,372 @@
+# backend/app/modules/telemetry/rollups.py
+
+import uuid
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Sequence
+
+from sqlalchemy import BigInteger, DateTime, and_, case, cast, func, literal, or_, select, union_all
+from sqlalchemy.orm import Session
+
+from app.core import metrics
+from app.core.config import settings
+from app.core.db import SessionLocal, engine
+from app.core.locks import exclusive_run, lock_for_transaction, lock_key
+from app.core.sql import date_trunc, dialect_insert
+from app.core.tasks import PeriodicTask
+from app.models.device import Telemetry, TelemetryDaily, TelemetryHourly
+
+# Bucket units understood by the planner, from finest to coarsest.
+UNIT_ORDER = {"minute": 0, "hour": 1, "day": 2, "month": 3}
+
+# Rollup tables by the bucket width they store, coarsest first.
+ROLLUPS = {"day": TelemetryDaily, "hour": TelemetryHourly}
+
+_STEPS = {"hour": timedelta(hours=1), "day": timedelta(days=1)}
+
+# Upper bound on the number of (device, range) conditions in one refresh statement.
+_MAX_CONDITIONS = 500
+
+_AGGREGATE_COLUMNS = ("total_energy", "sample_count", "min_energy", "max_energy")
+
+
+def as_utc(ts: datetime) -> datetime:
+    """Returns `ts` as an aware UTC datetime, treating naive values as UTC."""
+    return ts.astimezone(timezone.utc) if ts.tzinfo else ts.replace(tzinfo=timezone.utc)
+
+
+def floor_time(ts: datetime, unit: str) -> datetime:
+    """Truncates `ts` to the start of its UTC `unit` bucket."""
+    ts = as_utc(ts)
+    if unit == "minute":
+        return ts.replace(second=0, microsecond=0)
+    if unit == "hour":
+        return ts.replace(minute=0, second=0, microsecond=0)
+    if unit == "day":
+        return ts.replace(hour=0, minute=0, second=0, microsecond=0)
+    if unit == "month":
+        return ts.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    raise ValueError(f"Unsupported bucket unit: {unit}")
+
+
+def ceil_time(ts: datetime, unit: str) -> datetime:
+    """Rounds `ts` up to the next `unit` boundary (unchanged if already on one)."""
+    floored = floor_time(ts, unit)
+    return floored if floored == as_utc(ts) else floored + _STEPS[unit]
+
+
+def _contiguous_ranges(buckets: Iterable[datetime], step: timedelta) -> List[tuple[datetime, datetime]]:
+    """Collapses bucket starts into half-open [start, end) runs of adjacent buckets."""
+    ranges: List[tuple[datetime, datetime]] = []
+    for bucket in sorted(buckets):
+        if ranges and ranges[-1][1] == bucket:
+            ranges[-1] = (ranges[-1][0], bucket + step)
+        else:
+            ranges.append((bucket, bucket + step))
+    return ranges
+
+
+def _source_columns(unit: str):
+    """The table a rollup is computed from, with its time column and aggregates."""
+    if unit == "hour":
+        raw = Telemetry.__table__
+        return raw, raw.c.timestamp, (
+            func.sum(raw.c.energy_usage),
+            func.count(),
+            func.min(raw.c.energy_usage),
+            func.max(raw.c.energy_usage),
+        )
+    hourly = TelemetryHourly.__table__
+    return hourly, hourly.c.bucket, (
+        func.sum(hourly.c.total_energy),
+        func.sum(hourly.c.sample_count),
+        func.min(hourly.c.min_energy),
+        func.max(hourly.c.max_energy),
+    )
+
+
+def bucket_lock_keys(hours_by_device: dict) -> List[int]:
+    """
+    Advisory lock keys serializing rollup maintenance per (device, UTC day).
+    One key covers a day row and all of its hours, so the hourly and daily
+    levels are always updated under the same lock.
+    """
+    return [
+        lock_key("rollup", device_id, day.date().isoformat())
+        for device_id, hours in hours_by_device.items()
+        for day in {floor_time(hour, "day") for hour in hours}
+    ]
+
+
+def _refresh_table(db: Session, unit: str, ranges_by_device: dict) -> None:
+    """
+    Recomputes the `unit` rollup for the given per-device [start, end) ranges
+    from the next finer level and upserts the results. Rows whose values did
+    not change keep their `updated_at`. The caller holds the bucket locks.
+    """
+    target = ROLLUPS[unit].__table__
+    source, source_time, aggregates = _source_columns(unit)
+    bucket = date_trunc(unit, source_time)
+    # Stamped from the application clock rather than now(), which on Postgres
+    # is the transaction start and only has second precision on SQLite.
+    updated_at = literal(datetime.now(timezone.utc), DateTime(timezone=True))
+    conditions = [
+        and_(source.c.device_id == device_id, source_time >= start, source_time < end)
+        for device_id, ranges in ranges_by_device.items()
+        for start, end in ranges
+    ]
+
+    for offset in range(0, len(conditions), _MAX_CONDITIONS):
+        recomputed = select(source.c.device_id, bucket, *aggregates, updated_at).where(
+            or_(*conditions[offset:offset + _MAX_CONDITIONS])
+        ).group_by(source.c.device_id, bucket)
+        stmt = dialect_insert(db)(target).from_select(
+            ["device_id", "bucket", *_AGGREGATE_COLUMNS, "updated_at"],
+            recomputed,
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[target.c.device_id, target.c.bucket],
+            set_={
+                **{column: stmt.excluded[column] for column in _AGGREGATE_COLUMNS},
+                "updated_at": stmt.excluded.updated_at,
+            },
+            where=or_(*(target.c[column] != stmt.excluded[column] for column in _AGGREGATE_COLUMNS)),
+        )
+        db.execute(stmt)
+
+
+def _add_deltas(db: Session, unit: str, rows: Sequence[dict]) -> None:
+    """
+    Adds freshly inserted readings to their `unit` buckets: totals and counts
+    are incremented and min/max widened, without reading raw telemetry back.
+    Only valid for rows that did not exist before; the caller holds the
+    bucket locks.
+    """
+    buckets: dict[tuple, list] = {}
+    for row in rows:
+        key = (row["device_id"], floor_time(row["timestamp"], unit))
+        value = row["energy_usage"]
+        bucket = buckets.get(key)
+        if bucket is None:
+            buckets[key] = [value, 1, value, value]
+        else:
+            bucket[0] += value
+            bucket[1] += 1
+            bucket[2] = min(bucket[2], value)
+            bucket[3] = max(bucket[3], value)
+
+    target = ROLLUPS[unit].__table__
+    updated_at = datetime.now(timezone.utc)
+    stmt = dialect_insert(db)(target)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[target.c.device_id, target.c.bucket],
+        set_={
+            "total_energy": target.c.total_energy + stmt.excluded.total_energy,
+            "sample_count": target.c.sample_count + stmt.excluded.sample_count,
+            "min_energy": case((stmt.excluded.min_energy < target.c.min_energy, stmt.excluded.min_energy), else_=target.c.min_energy),
+            "max_energy": case((stmt.excluded.max_energy > target.c.max_energy, stmt.excluded.max_energy), else_=target.c.max_energy),
+            "updated_at": stmt.excluded.updated_at,
+        },
+    )
+    db.execute(stmt, [
+        {
+            "device_id": device_id, "bucket": bucket, "total_energy": total, "sample_count": count,
+            "min_energy": low, "max_energy": high, "updated_at": updated_at,
+        }
+        for (device_id, bucket), (total, count, low, high) in buckets.items()
+    ])
+
+
+def _hours_by_device(rows: Iterable[dict]) -> dict:
+    hours_by_device: dict[uuid.UUID, set] = defaultdict(set)
+    for row in rows:
+        hours_by_device[row["device_id"]].add(floor_time(row["timestamp"], "hour"))
+    return hours_by_device
+
+
+def _recompute_hours(db: Session, hours_by_device: dict) -> None:
+    """Recomputes the given hours from raw telemetry, then their days from the hourly rollup."""
+    _refresh_table(db, "hour", {
+        device_id: _contiguous_ranges(hours, _STEPS["hour"])
+        for device_id, hours in hours_by_device.items()
+    })
+    _refresh_table(db, "day", {
+        device_id: _contiguous_ranges({floor_time(h, "day") for h in hours}, _STEPS["day"])
+        for device_id, hours in hours_by_device.items()
+    })
+
+
+def refresh_rollups(db: Session, inserted: Sequence[dict], changed: Sequence[dict] = ()) -> None:
+    """
+    Brings the hourly and daily rollups up to date for freshly written rows.
+    `inserted` are readings that did not exist before (with their stored
+    values) and are added to their buckets as deltas. `changed` are existing
+    readings an overwrite or sum replaced; their buckets are recomputed from
+    raw telemetry (hours) and the hourly rollup (days), which keeps min/max
+    exact. Both run under per-(device, day) advisory locks taken in a
+    statement of their own, so concurrent ingests of the same bucket are
+    serialized and every recompute sees the raw rows of writers that
+    committed before it. The caller owns the transaction.
+    """
+    if not (inserted or changed) or not settings.TELEMETRY_ROLLUPS_ENABLED:
+        return
+    changed_hours = _hours_by_device(changed)
+    lock_for_transaction(db, bucket_lock_keys(_hours_by_device([*inserted, *changed])))
+    if inserted:
+        _add_deltas(db, "hour", inserted)
+        _add_deltas(db, "day", inserted)
+    if changed_hours:
+        _recompute_hours(db, changed_hours)
+
+
+def rebuild_rollups(
+    db: Session,
+    start: datetime,
+    end: datetime,
+    device_ids: Sequence[uuid.UUID],
+    units: Sequence[str] = ("hour", "day"),
+) -> None:
+    """
+    Recomputes every rollup bucket of `device_ids` overlapping [start, end).
+    Used to backfill or repair rollups, e.g. after re-enabling them, and to
+    downsample data before retention deletes its source. `units` limits the
+    levels rebuilt; each is computed from the next finer one. Takes the
+    bucket locks of the whole range first.
+    """
+    first_day, end_day = floor_time(start, "day"), ceil_time(end, "day")
+    days = [first_day + timedelta(days=n) for n in range((end_day - first_day).days)]
+    lock_for_transaction(db, bucket_lock_keys({device_id: days for device_id in device_ids}))
+    for unit in ("hour", "day"):
+        if unit in units:
+            bucket_range = [(floor_time(start, unit), ceil_time(end, unit))]
+            _refresh_table(db, unit, {device_id: bucket_range for device_id in device_ids})
+
+
+def compact_rollups(db: Session, since: datetime) -> int:
+    """
+    Recomputes, exactly, every hourly bucket (and its day) that has been
+    written since `since`, correcting any drift the delta updates may have
+    accumulated (e.g. rounding). Buckets already exact are left untouched.
+    Returns the number of hours checked; the caller commits.
+    """
+    hourly = TelemetryHourly.__table__
+    touched = db.execute(
+        select(hourly.c.device_id, hourly.c.bucket).where(hourly.c.updated_at >= since)
+    ).all()
+    hours_by_device: dict[uuid.UUID, set] = defaultdict(set)
+    for device_id, bucket in touched:
+        hours_by_device[device_id].add(as_utc(bucket))
+    if hours_by_device:
+        lock_for_transaction(db, bucket_lock_keys(hours_by_device))
+        _recompute_hours(db, hours_by_device)
+    return len(touched)
+
+
+def run_compaction() -> Dict[str, object]:
+    """One run of the rollup compactor, in exactly one worker at a time."""
+    with exclusive_run(engine, "telemetry-rollup-compactor") as acquired:
+        if not acquired:
+            return {"skipped": "running in another worker"}
+        # Overlap the previous run so buckets written while it ran are covered
+        since = datetime.now(timezone.utc) - timedelta(seconds=2 * settings.TELEMETRY_ROLLUP_COMPACT_INTERVAL_SECONDS)
+        db = SessionLocal()
+        try:
+            checked = compact_rollups(db, since)
+            db.commit()
+            return {"hours_checked": checked}
+        finally:
+            db.close()
+
+
+rollup_compactor = PeriodicTask(
+    "telemetry-rollup-compactor", settings.TELEMETRY_ROLLUP_COMPACT_INTERVAL_SECONDS, run_compaction
+)
+metrics.register("telemetry_rollup_compactor", rollup_compactor.metrics)
+
+
+def plan_segments(start: datetime, end: datetime, unit: str) -> List[tuple[str, datetime, datetime]]:
+    """
+    Splits [start, end) into segments served by the coarsest source that fits.
+    Returns (source, start, end) tuples where source is "day", "hour" or "raw".
+    Only rollups no wider than `unit` are eligible, and raw rows are only used
+    for the ragged edges that do not cover a whole rollup bucket.
+    """
+    grains = [
+        grain for grain in ROLLUPS
+        if settings.TELEMETRY_ROLLUPS_ENABLED and UNIT_ORDER[grain] <= UNIT_ORDER[unit]
+    ]
+
+    def split(lo: datetime, hi: datetime, grains: List[str]) -> List[tuple[str, datetime, datetime]]:
+        if lo >= hi:
+            return []
+        if not grains:
+            return [("raw", lo, hi)]
+        grain, finer = grains[0], grains[1:]
+        inner_lo, inner_hi = ceil_time(lo, grain), floor_time(hi, grain)
+        if inner_lo >= inner_hi:
+            return split(lo, hi, finer)
+        return split(lo, inner_lo, finer) + [(grain, inner_lo, inner_hi)] + split(inner_hi, hi, finer)
+
+    return split(as_utc(start), as_utc(end), grains)
+
+
+def _segment_select(source: str, device_ids: Sequence[uuid.UUID], start: datetime, end: datetime, unit: str):
+    if source == "raw":
+        raw = Telemetry.__table__
+        bucket = date_trunc(unit, raw.c.timestamp)
+        return select(
+            raw.c.device_id,
+            bucket.label("bucket"),
+            func.sum(raw.c.energy_usage).label("total_energy"),
+            func.count().label("sample_count"),
+            func.min(raw.c.energy_usage).label("min_energy"),
+            func.max(raw.c.energy_usage).label("max_energy"),
+        ).where(
+            raw.c.device_id.in_(device_ids),
+            raw.c.timestamp >= start,
+            raw.c.timestamp < end,
+        ).group_by(raw.c.device_id, bucket)
+
+    rollup = ROLLUPS[source].__table__
+    bucket = rollup.c.bucket if source == unit else date_trunc(unit, rollup.c.bucket)
+    return select(
+        rollup.c.device_id,
+        bucket.label("bucket"),
+        func.sum(rollup.c.total_energy).label("total_energy"),
+        func.sum(rollup.c.sample_count).label("sample_count"),
+        func.min(rollup.c.min_energy).label("min_energy"),
+        func.max(rollup.c.max_energy).label("max_energy"),
+    ).where(
+        rollup.c.device_id.in_(device_ids),
+        rollup.c.bucket >= start,
+        rollup.c.bucket < end,
+    ).group_by(rollup.c.device_id, bucket)
+
+
+def aggregate_buckets(
+    db: Session, device_ids: Sequence[uuid.UUID], start: datetime, end: datetime, unit: str
+) -> list:
+    """
+    Aggregates energy usage per device per `unit` bucket over [start, end).
+    Every segment of the plan becomes one branch of a UNION ALL, so the whole
+    series is fetched in a single round trip. Rows expose `device_id`,
+    `bucket`, `total_energy`, `sample_count`, `min_energy` and `max_energy`,
+    ordered by bucket.
+    """
+    segments = [
+        _segment_select(source, device_ids, lo, hi, unit)
+        for source, lo, hi in plan_segments(start, end, unit)
+    ]
+    if not segments:
+        return []
+    combined = (segments[0] if len(segments) == 1 else union_all(*segments)).subquery()
+    stmt = select(
+        combined.c.device_id,
+        combined.c.bucket,
+        func.sum(combined.c.total_energy).label("total_energy"),
+        # SUM of a BIGINT is NUMERIC on Postgres; cast so counts come back as int, not Decimal
+        cast(func.sum(combined.c.sample_count), BigInteger).label("sample_count"),
+        func.min(combined.c.min_energy).label("min_energy"),
+        func.max(combined.c.max_energy).label("max_energy"),
+    ).group_by(combined.c.device_id, combined.c.bucket).order_by(combined.c.bucket)
+    return db.execute(stmt).all()
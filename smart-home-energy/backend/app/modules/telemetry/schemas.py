@@ -11,6 +11,31 @@ class TimeWindow(str, Enum):
     TWELVE_HOURS = "12h"
     SIX_HOURS = "6h"
 
+class Resolution(str, Enum):
+    """Bucket widths for ranged stats queries, finest first."""
+    ONE_MINUTE = "1m"
+    FIVE_MINUTES = "5m"
+    FIFTEEN_MINUTES = "15m"
+    ONE_HOUR = "1h"
+    SIX_HOURS = "6h"
+    ONE_DAY = "1d"
+    ONE_WEEK = "1w"
+    ONE_MONTH = "1M"
+
+class FillMode(str, Enum):
+    ZERO = "zero"
+    NULL = "null"
+
+class SeriesFormat(str, Enum):
+    """Response encodings for time series: per-point objects, parallel arrays or packed binary."""
+    JSON = "json"
+    COLUMNAR = "columnar"
+    PACKED = "packed"
+
+class UploadFormat(str, Enum):
+    NDJSON = "ndjson"
+    CSV = "csv"
+
 class TelemetryBase(BaseModel):
     device_id: UUID4
     timestamp: datetime
@@ -26,11 +51,49 @@ class TelemetryPublic(TelemetryBase):
     """
     Schema for representing a returned telemetry data point.
     """
-    id: UUID4
-
     class Config:
         from_attributes = True
 
+# Upper bound on the number of points accepted by a single batch request.
+MAX_BATCH_POINTS = 10_000
+
+class TelemetryBatchCreate(BaseModel):
+    """
+    Schema for a batch of telemetry data points, possibly spanning many devices.
+    """
+    points: list[TelemetryCreate] = Field(..., min_length=1, max_length=MAX_BATCH_POINTS)
+
+class DeviceIngestSummary(BaseModel):
+    """
+    Per-device outcome of a batch ingestion.
+    """
+    device_id: UUID4
+    accepted: int
+    rejected: int
+
+class TelemetryBatchResult(BaseModel):
+    """
+    Schema for the response of a batch ingestion.
+    Points for devices the user does not own are counted as rejected.
+    """
+    accepted: int
+    rejected: int
+    devices: list[DeviceIngestSummary]
+
+class TelemetryUploadResult(BaseModel):
+    """
+    Schema for the response of a streaming telemetry upload.
+    `rows_committed` counts the data rows of this request body that are durably
+    handled (skipped rows included); resend the same body with `skip_rows` set
+    to it to resume. `bytes_committed` is the absolute byte offset in the
+    original file up to which rows are durably handled; resend the remainder
+    with `byte_offset` set to it to resume.
+    """
+    accepted: int
+    rejected: int
+    rows_committed: int
+    bytes_committed: int
+
 # --- We'll also add schemas for Device management now ---
 
 class DeviceCreate(BaseModel):
@@ -44,15 +107,51 @@ class DevicePublic(DeviceCreate):
     class Config:
         from_attributes = True
 
+class DeviceApiKey(BaseModel):
+    """
+    A newly issued device API key. Only its hash is stored, so this is the
+    one time the key can be read.
+    """
+    device_id: UUID4
+    api_key: str
+
 class EnergyUsagePoint(BaseModel):
     timestamp: datetime
-    total_energy: float
+    total_energy: Optional[float]  # None for an empty bucket when fill=null
     label: str  # "Monday", "Tuesday", etc. for days or "14:00", "15:00" etc. for hours
 
 class DeviceStats(BaseModel):
     """
     Schema for returning hourly energy usage data for a device.
+    Ranged queries also report the range and the resolution actually used,
+    which may be coarser than requested to respect the points cap.
+    `watermark` is passed back as `since` to fetch only the buckets that
+    changed afterwards; such responses have `delta` set.
     """
     device_id: UUID4
-    time_window: TimeWindow
-    data_points: list[EnergyUsagePoint]
\ No newline at end of file
+    time_window: Optional[TimeWindow] = None
+    start: Optional[datetime] = None
+    end: Optional[datetime] = None
+    resolution: Optional[Resolution] = None
+    data_points: list[EnergyUsagePoint]
+    watermark: Optional[str] = None
+    delta: bool = False
+
+class DeviceSeries(BaseModel):
+    """
+    One device's series within a multi-device stats response.
+    """
+    device_id: UUID4
+    name: str
+    data_points: list[EnergyUsagePoint]
+
+class MultiDeviceStats(BaseModel):
+    """
+    Schema for returning energy usage of several devices over a shared bucket
+    axis, plus the whole-home total per bucket.
+    """
+    start: datetime
+    end: datetime
+    resolution: Resolution
+    devices: list[DeviceSeries]
+    total: list[EnergyUsagePoint]
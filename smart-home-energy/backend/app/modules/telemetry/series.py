@@ -0,0 +1,143 @@
+# backend/app/modules/telemetry/series.py
+
+import uuid
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterator, List, Optional, Sequence
+
+from sqlalchemy.orm import Session
+
+from .rollups import aggregate_buckets, as_utc, floor_time
+from .schemas import FillMode, Resolution
+
+# Resolution -> (SQL bucket unit it is computed from, fixed bucket width).
+# Widths that are a multiple of the unit (5m, 15m, 6h, 1w) are folded in
+# Python; calendar months have no fixed width.
+_RESOLUTIONS = {
+    Resolution.ONE_MINUTE: ("minute", timedelta(minutes=1)),
+    Resolution.FIVE_MINUTES: ("minute", timedelta(minutes=5)),
+    Resolution.FIFTEEN_MINUTES: ("minute", timedelta(minutes=15)),
+    Resolution.ONE_HOUR: ("hour", timedelta(hours=1)),
+    Resolution.SIX_HOURS: ("hour", timedelta(hours=6)),
+    Resolution.ONE_DAY: ("day", timedelta(days=1)),
+    Resolution.ONE_WEEK: ("day", timedelta(weeks=1)),
+    Resolution.ONE_MONTH: ("month", None),
+}
+
+LABEL_FORMATS = {
+    Resolution.ONE_MINUTE: "%H:%M",
+    Resolution.FIVE_MINUTES: "%H:%M",
+    Resolution.FIFTEEN_MINUTES: "%H:%M",
+    Resolution.ONE_HOUR: "%H:00",
+    Resolution.SIX_HOURS: "%d %b %H:00",
+    Resolution.ONE_DAY: "%Y-%m-%d",
+    Resolution.ONE_WEEK: "%Y-%m-%d",
+    Resolution.ONE_MONTH: "%Y-%m",
+}
+
+# Fixed-width buckets are aligned to this instant. It is a Monday at midnight
+# UTC, so weekly buckets start on Mondays and all others on natural boundaries.
+_EPOCH = datetime(1970, 1, 5, tzinfo=timezone.utc)
+
+
+def floor_bucket(ts: datetime, resolution: Resolution) -> datetime:
+    """Start of the `resolution` bucket containing `ts`."""
+    width = _RESOLUTIONS[resolution][1]
+    if width is None:
+        return floor_time(ts, "month")
+    return _EPOCH + ((as_utc(ts) - _EPOCH) // width) * width
+
+
+def next_bucket(bucket: datetime, resolution: Resolution) -> datetime:
+    width = _RESOLUTIONS[resolution][1]
+    if width is None:
+        return bucket.replace(year=bucket.year + bucket.month // 12, month=bucket.month % 12 + 1)
+    return bucket + width
+
+
+def ceil_bucket(ts: datetime, resolution: Resolution) -> datetime:
+    """Rounds `ts` up to a bucket boundary (unchanged if already on one)."""
+    floored = floor_bucket(ts, resolution)
+    return floored if floored == as_utc(ts) else next_bucket(floored, resolution)
+
+
+def align_range(start: datetime, end: datetime, resolution: Resolution) -> tuple[datetime, datetime]:
+    """Widens [start, end) outwards to whole buckets."""
+    return floor_bucket(start, resolution), ceil_bucket(end, resolution)
+
+
+def count_buckets(start: datetime, end: datetime, resolution: Resolution) -> int:
+    start, end = align_range(start, end, resolution)
+    width = _RESOLUTIONS[resolution][1]
+    if width is None:
+        return (end.year - start.year) * 12 + end.month - start.month
+    return (end - start) // width
+
+
+def iter_buckets(start: datetime, end: datetime, resolution: Resolution) -> Iterator[datetime]:
+    """Every bucket start in the aligned range, oldest first."""
+    bucket, end = align_range(start, end, resolution)
+    while bucket < end:
+        yield bucket
+        bucket = next_bucket(bucket, resolution)
+
+
+def choose_resolution(
+    start: datetime, end: datetime, max_points: int, requested: Optional[Resolution] = None
+) -> Resolution:
+    """
+    Picks the finest resolution, no finer than `requested`, that covers
+    [start, end) in at most `max_points` buckets. Raises ValueError when even
+    the coarsest one does not fit.
+    """
+    candidates = list(Resolution)
+    if requested is not None:
+        candidates = candidates[candidates.index(requested):]
+    for resolution in candidates:
+        if count_buckets(start, end, resolution) <= max_points:
+            return resolution
+    raise ValueError(f"The range needs more than {max_points} points even at {candidates[-1].value} resolution.")
+
+
+def build_series(
+    db: Session,
+    device_ids: Sequence[uuid.UUID],
+    start: datetime,
+    end: datetime,
+    resolution: Resolution,
+    fill: FillMode,
+) -> Dict[uuid.UUID, List[tuple[datetime, Optional[float]]]]:
+    """
+    Returns, per device, one (bucket, total_energy) pair for every bucket of
+    the aligned range, oldest first. Buckets without readings are filled with
+    0 or None according to `fill`, so every series shares the same axis.
+    All devices are aggregated in a single query.
+    """
+    unit = _RESOLUTIONS[resolution][0]
+    start, end = align_range(start, end, resolution)
+    totals: Dict[uuid.UUID, Dict[datetime, float]] = defaultdict(dict)
+    for row in aggregate_buckets(db, device_ids, start, end, unit) if device_ids else []:
+        bucket = floor_bucket(row.bucket, resolution)
+        device_totals = totals[row.device_id]
+        device_totals[bucket] = device_totals.get(bucket, 0.0) + row.total_energy
+
+    empty = 0.0 if fill == FillMode.ZERO else None
+    buckets = list(iter_buckets(start, end, resolution))
+    return {
+        device_id: [(bucket, totals[device_id].get(bucket, empty)) for bucket in buckets]
+        for device_id in device_ids
+    }
+
+
+def sum_series(
+    all_series: Sequence[List[tuple[datetime, Optional[float]]]]
+) -> List[tuple[datetime, Optional[float]]]:
+    """
+    Adds aligned series bucket by bucket. A bucket is None only when it is
+    None in every series, so null-filled gaps stay visible in the total.
+    """
+    totals: List[tuple[datetime, Optional[float]]] = []
+    for column in zip(*all_series):
+        values = [value for _, value in column if value is not None]
+        totals.append((column[0][0], sum(values) if values else None))
+    return totals
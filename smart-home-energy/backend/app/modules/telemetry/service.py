@@ -0,0 +1,207 @@
+# backend/app/modules/telemetry/service.py
+
+import io
+import uuid
+from collections import defaultdict
+from typing import Iterable
+
+from sqlalchemy import bindparam, text, update
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.sql import dialect_insert
+from app.models.device import Telemetry
+from app.models.types import energy_storage_value
+from . import live, rollups, schemas, stats_cache
+from .ownership import ownership_index
+
+
+def get_owned_device_ids(
+    db: Session, owner_id: uuid.UUID, device_ids: Iterable[uuid.UUID]
+) -> set[uuid.UUID]:
+    """
+    Returns the subset of `device_ids` that belong to `owner_id`.
+    Answered from the ownership index; devices missing from it are checked
+    with a single IN query.
+    """
+    return ownership_index.owned_ids(db, owner_id, device_ids)
+
+
+def _collapse_duplicates(rows: list[dict], policy: str) -> list[dict]:
+    """
+    Merges rows that share a (device_id, timestamp) key according to `policy`.
+    A single upsert statement may not touch the same row twice, so repeats
+    inside one batch are resolved here before they reach the database.
+    """
+    merged: dict[tuple, dict] = {}
+    for row in rows:
+        key = (row["device_id"], row["timestamp"])
+        existing = merged.get(key)
+        if existing is None or policy == "overwrite":
+            merged[key] = row
+        elif policy == "sum":
+            merged[key] = {**existing, "energy_usage": existing["energy_usage"] + row["energy_usage"]}
+    return rows if len(merged) == len(rows) else list(merged.values())
+
+
+def _row_key(row) -> tuple:
+    return (row["device_id"], rollups.as_utc(row["timestamp"]))
+
+
+def _inserted_rows(result) -> list[dict]:
+    """The rows an INSERT ... RETURNING device_id, timestamp, energy_usage actually wrote."""
+    return [dict(row) for row in result.mappings()]
+
+
+def _apply_conflicts(db: Session, rows: list[dict], inserted: list[dict], policy: str) -> list[dict]:
+    """
+    Applies `policy` to the rows that were not inserted because the reading
+    already existed: "overwrite" replaces the stored value, "sum" adds to it
+    and "ignore" leaves it. Returns the rows that were changed.
+    """
+    if policy == "ignore" or len(inserted) == len(rows):
+        return []
+    written = {_row_key(row) for row in inserted}
+    conflicts = [row for row in rows if _row_key(row) not in written]
+    if not conflicts:
+        return []
+    table = Telemetry.__table__
+    new_value = bindparam("new_energy_usage", type_=table.c.energy_usage.type)
+    db.execute(
+        update(table)
+        .where(table.c.device_id == bindparam("row_device_id"), table.c.timestamp == bindparam("row_timestamp"))
+        .values(energy_usage=new_value if policy == "overwrite" else table.c.energy_usage + new_value),
+        [
+            {"row_device_id": row["device_id"], "row_timestamp": row["timestamp"], "new_energy_usage": row["energy_usage"]}
+            for row in conflicts
+        ],
+    )
+    return conflicts
+
+
+def upsert_telemetry(db: Session, rows: list[dict], policy: str | None = None) -> None:
+    """
+    Writes many telemetry rows with one multi-row INSERT ... ON CONFLICT DO
+    NOTHING ... RETURNING. Each row is a dict with `device_id`, `timestamp`
+    and `energy_usage` keys. Rows that already exist are ignored, overwritten
+    or summed depending on `policy` (TELEMETRY_CONFLICT_POLICY by default), so
+    redelivered readings never raise. The hourly and daily rollups are
+    updated in the same transaction, which the caller owns: inserted rows as
+    deltas, changed ones by recomputing their buckets. Cached stats covering
+    the rows are invalidated, and live subscribers notified, once it commits.
+    """
+    if not rows:
+        return
+    policy = policy or settings.TELEMETRY_CONFLICT_POLICY
+    table = Telemetry.__table__
+    rows = _collapse_duplicates(rows, policy)
+    stmt = (
+        dialect_insert(db)(table)
+        .on_conflict_do_nothing(index_elements=[table.c.device_id, table.c.timestamp])
+        .returning(table.c.device_id, table.c.timestamp, table.c.energy_usage)
+    )
+    inserted = _inserted_rows(db.execute(stmt, rows))
+    changed = _apply_conflicts(db, rows, inserted, policy)
+    rollups.refresh_rollups(db, inserted, changed)
+    stats_cache.record_ingested(db, rows)
+    live.record_points(db, rows)
+
+
+def copy_telemetry_rows(db: Session, rows: list[dict], policy: str | None = None) -> None:
+    """
+    Writes many telemetry rows as fast as the database allows.
+    On Postgres via psycopg2 the rows are streamed through COPY into a
+    temporary staging table on the session's own connection, then moved into
+    `telemetry` with one INSERT ... SELECT ... ON CONFLICT DO NOTHING, so it
+    stays inside the caller's transaction; existing readings then get the
+    conflict policy as in `upsert_telemetry`. Other databases and drivers
+    (including asyncpg sessions) fall back to `upsert_telemetry`.
+    """
+    if not rows:
+        return
+    dialect = db.get_bind().dialect
+    if dialect.name != "postgresql" or dialect.driver != "psycopg2":
+        upsert_telemetry(db, rows, policy)
+        return
+
+    policy = policy or settings.TELEMETRY_CONFLICT_POLICY
+    rows = _collapse_duplicates(rows, policy)
+    buffer = io.StringIO()
+    for row in rows:
+        buffer.write(f"{row['device_id']},{row['timestamp'].isoformat()},{energy_storage_value(row['energy_usage'])}\n")
+    buffer.seek(0)
+    db.execute(text(
+        "CREATE TEMP TABLE IF NOT EXISTS telemetry_staging "
+        "(LIKE telemetry INCLUDING DEFAULTS) ON COMMIT DELETE ROWS"
+    ))
+    cursor = db.connection().connection.cursor()
+    try:
+        cursor.copy_expert(
+            "COPY telemetry_staging (device_id, timestamp, energy_usage) FROM STDIN WITH (FORMAT csv)",
+            buffer,
+        )
+    finally:
+        cursor.close()
+    table = Telemetry.__table__
+    result = db.execute(
+        text(
+            "INSERT INTO telemetry (device_id, timestamp, energy_usage) "
+            "SELECT device_id, timestamp, energy_usage FROM telemetry_staging "
+            "ON CONFLICT (device_id, timestamp) DO NOTHING "
+            "RETURNING device_id, timestamp, energy_usage"
+        ).columns(table.c.device_id, table.c.timestamp, table.c.energy_usage)
+    )
+    inserted = _inserted_rows(result)
+    db.execute(text("TRUNCATE telemetry_staging"))
+    changed = _apply_conflicts(db, rows, inserted, policy)
+    rollups.refresh_rollups(db, inserted, changed)
+    stats_cache.record_ingested(db, rows)
+    live.record_points(db, rows)
+
+
+def ingest_telemetry_batch(
+    db: Session,
+    owner_id: uuid.UUID,
+    points: list[schemas.TelemetryCreate],
+    device_id: uuid.UUID | None = None,
+) -> schemas.TelemetryBatchResult:
+    """
+    Ingests a batch of telemetry points that may span many devices.
+    Points for devices not owned by `owner_id` are rejected; everything else is
+    written in a single transaction. When `device_id` is given (a device API
+    key) only that device's points are accepted.
+    """
+    if device_id is not None:
+        owned_ids = {device_id}
+    else:
+        owned_ids = get_owned_device_ids(db, owner_id, (p.device_id for p in points))
+
+    accepted: dict[uuid.UUID, int] = defaultdict(int)
+    rejected: dict[uuid.UUID, int] = defaultdict(int)
+    rows = []
+    for point in points:
+        if point.device_id in owned_ids:
+            accepted[point.device_id] += 1
+            rows.append({
+                "device_id": point.device_id,
+                "timestamp": point.timestamp,
+                "energy_usage": point.energy_usage,
+            })
+        else:
+            rejected[point.device_id] += 1
+
+    upsert_telemetry(db, rows)
+    db.commit()
+
+    device_ids = list(dict.fromkeys(p.device_id for p in points))
+    return schemas.TelemetryBatchResult(
+        accepted=len(rows),
+        rejected=len(points) - len(rows),
+        devices=[
+            schemas.DeviceIngestSummary(
+                device_id=device_id,
+                accepted=accepted[device_id],
+                rejected=rejected[device_id],
+            ) for device_id in device_ids
+        ],
+    )
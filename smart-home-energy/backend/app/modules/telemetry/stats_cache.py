@@ -0,0 +1,298 @@
+# backend/app/modules/telemetry/stats_cache.py
+
+import threading
+import uuid
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional, Sequence
+
+from sqlalchemy import delete, event, or_, select
+from sqlalchemy.orm import Session
+
+from app.core import metrics
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.db import SessionLocal
+from app.core.sql import dialect_insert
+from app.core.table_cache import TableCache
+from app.models.cache import StatsCacheEntry, StatsCacheGeneration
+from . import schemas
+from .rollups import as_utc
+
+# Session.info key under which ingestion records what it wrote until commit.
+_INGESTED_KEY = "telemetry_ingested"
+
+
+def make_key(device_id: uuid.UUID, *parts: Any) -> str:
+    """Builds a cache key from the device and the request parameters that shape the response."""
+    return ":".join([str(device_id), *(str(part) for part in parts)])
+
+
+class StatsCacheBackend(ABC):
+    """
+    Storage for cached device stats responses.
+
+    Every entry records the device and the [window_start, window_end) range it
+    summarises (an open end means "up to now"), so ingestion can invalidate
+    exactly the entries its readings fall into instead of everything cached
+    for the device.
+
+    Every invalidation also bumps the device's generation. A reader takes
+    `generation(device_id)` before computing a response and passes it to
+    `set`, which stores nothing if an invalidation happened in between;
+    otherwise a response computed from data that was replaced while it ran
+    could be cached for the whole TTL.
+    """
+    @abstractmethod
+    def get(self, key: str) -> Optional[schemas.DeviceStats]:
+        ...
+
+    @abstractmethod
+    def generation(self, device_id: uuid.UUID) -> Optional[int]:
+        """The device's current invalidation count, or None if it cannot be read (then nothing is cached)."""
+
+    @abstractmethod
+    def set(
+        self,
+        key: str,
+        device_id: uuid.UUID,
+        window_start: datetime,
+        window_end: Optional[datetime],
+        stats: schemas.DeviceStats,
+        generation: Optional[int],
+    ) -> None:
+        ...
+
+    @abstractmethod
+    def invalidate(self, device_id: uuid.UUID, earliest: datetime, latest: datetime) -> int:
+        """Drops the device's entries whose window overlaps [earliest, latest]; returns how many."""
+
+    @abstractmethod
+    def metrics(self) -> Dict[str, Any]:
+        ...
+
+
+class NullStatsCache(StatsCacheBackend):
+    """Backend used when caching is disabled; every lookup misses."""
+    def get(self, key):
+        return None
+
+    def generation(self, device_id):
+        return None
+
+    def set(self, key, device_id, window_start, window_end, stats, generation):
+        pass
+
+    def invalidate(self, device_id, earliest, latest):
+        return 0
+
+    def metrics(self):
+        return {"backend": "none"}
+
+
+class InMemoryStatsCache(StatsCacheBackend):
+    """
+    Per-process backend on top of a TTL/LRU cache. A secondary index of
+    device -> {key: window} makes invalidation proportional to the entries of
+    one device rather than the whole cache.
+    """
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self._cache = TTLCache(max_entries, ttl_seconds, on_evict=self._forget)
+        self._windows: Dict[uuid.UUID, Dict[str, tuple]] = {}
+        self._generations: Dict[uuid.UUID, int] = {}
+        self._lock = threading.Lock()
+        self.invalidations = 0
+        self.stale_sets = 0
+
+    def get(self, key):
+        entry = self._cache.get(key)
+        return entry[1] if entry is not None else None
+
+    def generation(self, device_id):
+        with self._lock:
+            return self._generations.get(device_id, 0)
+
+    def set(self, key, device_id, window_start, window_end, stats, generation):
+        with self._lock:
+            if self._generations.get(device_id, 0) != generation:
+                self.stale_sets += 1
+                return
+            self._windows.setdefault(device_id, {})[key] = (as_utc(window_start), window_end and as_utc(window_end))
+        self._cache.set(key, (device_id, stats))
+        # An invalidation that ran between the check and the insert may have
+        # missed the new entry; it bumped the generation first, so look again.
+        with self._lock:
+            raced = self._generations.get(device_id, 0) != generation
+        if raced:
+            self._cache.delete(key)
+
+    def invalidate(self, device_id, earliest, latest):
+        # The index lock is never held while taking the cache's lock, because
+        # evictions call back into _forget with the cache's lock held.
+        with self._lock:
+            self._generations[device_id] = self._generations.get(device_id, 0) + 1
+            windows = self._windows.get(device_id)
+            if not windows:
+                return 0
+            stale = [
+                key for key, (start, end) in windows.items()
+                if start <= latest and (end is None or earliest < end)
+            ]
+            for key in stale:
+                del windows[key]
+            if not windows:
+                del self._windows[device_id]
+        removed = sum(1 for key in stale if self._cache.delete(key))
+        with self._lock:
+            self.invalidations += removed
+        return removed
+
+    def metrics(self):
+        return {
+            "backend": "memory", **self._cache.metrics(),
+            "invalidations": self.invalidations, "stale_sets": self.stale_sets,
+        }
+
+    def _forget(self, key: str, entry: tuple) -> None:
+        with self._lock:
+            windows = self._windows.get(entry[0])
+            if windows is not None:
+                windows.pop(key, None)
+                if not windows:
+                    del self._windows[entry[0]]
+
+
+class PostgresStatsCache(StatsCacheBackend):
+    """
+    Backend stored in the `stats_cache` table so every worker shares one
+    cache, with each device's generation kept in `stats_cache_generations`.
+    """
+    def __init__(
+        self,
+        max_entries: int,
+        ttl_seconds: float,
+        session_factory: Callable[[], Session] = SessionLocal,
+    ):
+        self.store = TableCache(StatsCacheEntry.__table__, "Stats cache", max_entries, ttl_seconds, session_factory)
+
+    def get(self, key):
+        row = self.store.get(key, "payload")
+        return schemas.DeviceStats.model_validate_json(row.payload) if row is not None else None
+
+    def generation(self, device_id):
+        table = StatsCacheGeneration.__table__
+
+        def read(db: Session):
+            # Make sure the row exists, so `set` always has one to lock
+            db.execute(dialect_insert(db)(table).values(device_id=device_id, generation=0).on_conflict_do_nothing())
+            return db.execute(select(table.c.generation).where(table.c.device_id == device_id)).scalar()
+
+        return self.store.run(read)
+
+    def set(self, key, device_id, window_start, window_end, stats, generation):
+        if generation is None:
+            return
+        generations = StatsCacheGeneration.__table__
+
+        def unchanged(db: Session) -> bool:
+            # The share lock makes a concurrent invalidation (which updates
+            # this row before deleting entries) wait for this write to commit,
+            # so its delete sees the new entry; or, if it got there first, the
+            # generation read here has already moved on.
+            current = db.execute(
+                select(generations.c.generation)
+                .where(generations.c.device_id == device_id)
+                .with_for_update(read=True)
+            ).scalar()
+            if current != generation:
+                self.store.count("stale_sets")
+                return False
+            return True
+
+        self.store.set(key, {
+            "device_id": device_id,
+            "window_start": window_start,
+            "window_end": window_end,
+            "payload": stats.model_dump_json(),
+        }, check=unchanged)
+
+    def invalidate(self, device_id, earliest, latest):
+        table = StatsCacheEntry.__table__
+        generations = StatsCacheGeneration.__table__
+        stmt = delete(table).where(
+            table.c.device_id == device_id,
+            table.c.window_start <= latest,
+            or_(table.c.window_end.is_(None), table.c.window_end > earliest),
+        )
+
+        def bump_and_delete(db: Session):
+            bump = dialect_insert(db)(generations).values(device_id=device_id, generation=1)
+            db.execute(bump.on_conflict_do_update(
+                index_elements=["device_id"], set_={"generation": generations.c.generation + 1},
+            ))
+            return db.execute(stmt).rowcount
+
+        removed = self.store.run(bump_and_delete) or 0
+        self.store.count("invalidations", removed)
+        return removed
+
+    def trim(self) -> None:
+        self.store.trim()
+
+    def metrics(self):
+        return {
+            "backend": "postgres", "size": self.store.size(),
+            "invalidations": 0, "stale_sets": 0, **self.store.metrics(),
+        }
+
+
+def create_backend(name: str) -> StatsCacheBackend:
+    if name == "memory":
+        return InMemoryStatsCache(settings.STATS_CACHE_MAX_ENTRIES, settings.STATS_CACHE_TTL_SECONDS)
+    if name == "postgres":
+        return PostgresStatsCache(settings.STATS_CACHE_MAX_ENTRIES, settings.STATS_CACHE_TTL_SECONDS)
+    return NullStatsCache()
+
+
+stats_cache = create_backend(settings.STATS_CACHE_BACKEND)
+metrics.register("stats_cache", lambda: stats_cache.metrics())
+
+
+def record_ingested(db: Session, rows: Sequence[dict]) -> None:
+    """
+    Remembers, per device, the time span of rows written in the session's
+    current transaction. The affected cache entries are invalidated once the
+    transaction commits, so readers never re-cache data that is about to be
+    rolled back.
+    """
+    spans = db.info.setdefault(_INGESTED_KEY, {})
+    for row in rows:
+        ts = as_utc(row["timestamp"])
+        span = spans.get(row["device_id"])
+        if span is None:
+            spans[row["device_id"]] = (ts, ts)
+        elif ts < span[0] or ts > span[1]:
+            spans[row["device_id"]] = (min(ts, span[0]), max(ts, span[1]))
+
+
+def record_changed(db: Session, device_id: uuid.UUID, earliest: datetime, latest: datetime) -> None:
+    """Like record_ingested, for a whole [earliest, latest] span of one device (e.g. deleted data)."""
+    earliest, latest = as_utc(earliest), as_utc(latest)
+    spans = db.info.setdefault(_INGESTED_KEY, {})
+    span = spans.get(device_id)
+    if span is None:
+        spans[device_id] = (earliest, latest)
+    elif earliest < span[0] or latest > span[1]:
+        spans[device_id] = (min(earliest, span[0]), max(latest, span[1]))
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_after_commit(session: Session) -> None:
+    spans = session.info.pop(_INGESTED_KEY, None)
+    for device_id, (earliest, latest) in (spans or {}).items():
+        stats_cache.invalidate(device_id, earliest, latest)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_after_rollback(session: Session) -> None:
+    session.info.pop(_INGESTED_KEY, None)
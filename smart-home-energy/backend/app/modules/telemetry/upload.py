@@ -0,0 +1,172 @@
+# backend/app/modules/telemetry/upload.py
+
+import json
+import uuid
+from datetime import datetime, timezone
+
+from sqlalchemy.orm import Session
+
+from . import schemas, service
+
+# A single row longer than this is rejected instead of being buffered forever.
+MAX_LINE_BYTES = 64 * 1024
+
+# Parsed device ids are memoised per upload, up to this many distinct ids.
+MAX_CACHED_DEVICE_IDS = 10_000
+
+CSV_HEADER = "device_id"
+
+
+class UploadError(Exception):
+    """Raised when a row of an upload body cannot be parsed."""
+    def __init__(self, message: str, row_number: int):
+        super().__init__(message)
+        self.message = message
+        self.row_number = row_number
+
+
+def detect_format(content_type: str | None) -> schemas.UploadFormat:
+    """Infers the upload format from the Content-Type header, defaulting to NDJSON."""
+    if content_type and "csv" in content_type.lower():
+        return schemas.UploadFormat.CSV
+    return schemas.UploadFormat.NDJSON
+
+
+class TelemetryUpload:
+    """
+    Incremental parser and writer for a streamed telemetry upload.
+
+    Chunks of the request body are fed in as they arrive. Complete lines are
+    parsed into rows and buffered until `batch_size` rows are pending, at which
+    point the caller flushes them to the database. Memory use is bounded by one
+    batch plus one partial line, regardless of the size of the upload.
+
+    Offsets are tracked so a failed upload can be resumed: `rows_committed` and
+    `bytes_committed` always describe the prefix of the original body that is
+    durably handled, taking the `skip_rows` and `byte_offset` of a resumed
+    upload into account.
+    """
+    def __init__(
+        self,
+        owner_id: uuid.UUID,
+        fmt: schemas.UploadFormat,
+        batch_size: int,
+        skip_rows: int = 0,
+        byte_offset: int = 0,
+    ):
+        self.owner_id = owner_id
+        self.fmt = fmt
+        self.batch_size = batch_size
+        self.skip_rows = skip_rows
+
+        self.accepted = 0
+        self.rejected = 0
+        self.rows_committed = 0
+        self.bytes_committed = byte_offset
+
+        self._buffer = b""
+        self._position = byte_offset  # absolute offset of the start of _buffer
+        self._rows_seen = 0  # data rows parsed or skipped, header excluded
+        self._first_line = True
+        self._pending: list[dict] = []
+        self._pending_end = byte_offset
+        self._pending_rows_seen = 0
+        self._ownership: dict[uuid.UUID, bool] = {}
+        self._device_ids: dict[str, uuid.UUID] = {}  # uploads repeat a handful of ids
+
+    @property
+    def ready(self) -> bool:
+        """True when enough rows are pending to warrant a flush."""
+        return len(self._pending) >= self.batch_size
+
+    def feed(self, chunk: bytes) -> None:
+        """Parses every complete line in `chunk` and buffers the resulting rows."""
+        self._buffer += chunk
+        start = 0
+        while True:
+            newline = self._buffer.find(b"\n", start)
+            if newline == -1:
+                break
+            self._consume_line(self._buffer[start:newline], newline + 1 - start)
+            start = newline + 1
+        self._buffer = self._buffer[start:]
+        if len(self._buffer) > MAX_LINE_BYTES:
+            raise UploadError("Row exceeds the maximum line length.", self._rows_seen + 1)
+
+    def finish(self) -> None:
+        """Parses a trailing line that is not terminated by a newline."""
+        if self._buffer:
+            line, self._buffer = self._buffer, b""
+            self._consume_line(line, len(line))
+
+    def flush(self, db: Session) -> None:
+        """
+        Writes the pending rows in one transaction on `db` and advances the
+        committed offsets. Rows for devices the user does not own are dropped and counted
+        as rejected.
+        """
+        if not self._pending and self._pending_end == self.bytes_committed:
+            return
+
+        unknown_ids = {row["device_id"] for row in self._pending} - self._ownership.keys()
+        if unknown_ids:
+            owned_ids = service.get_owned_device_ids(db, self.owner_id, unknown_ids)
+            self._ownership.update({device_id: device_id in owned_ids for device_id in unknown_ids})
+
+        rows = [row for row in self._pending if self._ownership[row["device_id"]]]
+        service.copy_telemetry_rows(db, rows)
+        db.commit()
+
+        self.accepted += len(rows)
+        self.rejected += len(self._pending) - len(rows)
+        self.rows_committed = self._pending_rows_seen
+        self.bytes_committed = self._pending_end
+        self._pending = []
+
+    def result(self) -> schemas.TelemetryUploadResult:
+        return schemas.TelemetryUploadResult(
+            accepted=self.accepted,
+            rejected=self.rejected,
+            rows_committed=self.rows_committed,
+            bytes_committed=self.bytes_committed,
+        )
+
+    def _consume_line(self, line: bytes, size: int) -> None:
+        line = line.strip()
+        first_line, self._first_line = self._first_line, False
+        is_header = first_line and self.fmt == schemas.UploadFormat.CSV and line.startswith(CSV_HEADER.encode())
+        if line and not is_header:
+            if self._rows_seen + 1 > self.skip_rows:
+                self._pending.append(self._parse_row(line, self._rows_seen + 1))
+            self._rows_seen += 1
+        # Offsets only advance once the line has been parsed successfully, so a
+        # malformed row is never reported as committed.
+        self._position += size
+        self._pending_end = self._position
+        self._pending_rows_seen = self._rows_seen
+
+    def _parse_row(self, line: bytes, row_number: int) -> dict:
+        try:
+            text = line.decode("utf-8")
+            if self.fmt == schemas.UploadFormat.CSV:
+                device_id, timestamp, energy_usage = text.split(",")
+            else:
+                record = json.loads(text)
+                device_id, timestamp, energy_usage = (
+                    record["device_id"], record["timestamp"], record["energy_usage"]
+                )
+            parsed_device_id = self._device_ids.get(device_id)
+            if parsed_device_id is None:
+                parsed_device_id = uuid.UUID(device_id.strip())
+                if len(self._device_ids) < MAX_CACHED_DEVICE_IDS:
+                    self._device_ids[device_id] = parsed_device_id
+            parsed_timestamp = datetime.fromisoformat(timestamp.strip())
+            if parsed_timestamp.tzinfo is None:
+                parsed_timestamp = parsed_timestamp.replace(tzinfo=timezone.utc)
+            return {
+                "device_id": parsed_device_id,
+                "timestamp": parsed_timestamp,
+                "energy_usage": float(energy_usage),
+            }
+        except (ValueError, KeyError, TypeError, AttributeError) as e:
+            raise UploadError(f"Malformed row: {e}", row_number)
@@ -7,7 +7,9 @@ from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import StaticPool
 
 from app.main import app
-from app.core.db import Base, get_db
+from app.core.config import settings
+from app.core.db import Base, get_db, get_read_db
+from app.modules.auth import limits
 
 # Use an in-memory SQLite database for testing
 SQLALCHEMY_DATABASE_URL = "sqlite:///:memory:"
@@ -27,6 +29,12 @@ def setup_database():
     yield
     Base.metadata.drop_all(bind=engine)
 
+# The LLM parse cache opens its own sessions on the configured DATABASE_URL;
+# tests that exercise it build one on a private database instead.
+@pytest.fixture(autouse=True)
+def disable_llm_parse_cache(monkeypatch):
+    monkeypatch.setattr(settings, "LLM_PARSE_CACHE_ENABLED", False)
+
 # Fixture to override the get_db dependency with a test database session
 @pytest.fixture()
 def db_session():
@@ -44,5 +52,10 @@ def client(db_session):
         yield db_session
     
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_read_db] = override_get_db
+    # Every test starts with full login rate-limit buckets
+    limits.account_limiter.clear()
+    limits.ip_limiter.clear()
     yield TestClient(app)
-    del app.dependency_overrides[get_db]
\ No newline at end of file
+    del app.dependency_overrides[get_db]
+    del app.dependency_overrides[get_read_db]
\ No newline at end of file
@@ -0,0 +1,122 @@
+# backend/app/tests/core/test_db.py
+
+import asyncio
+import os
+import threading
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event, text
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.util import greenlet_spawn
+
+from app.core import db as core_db
+from app.core.db import get_db, get_read_db, run_blocking, run_db
+from app.main import app
+from app.models.device import Device
+from app.modules.auth.schemas import UserCreate
+from app.modules.auth.service import create_user
+
+POSTGRES_URL = os.environ.get("TEST_POSTGRES_URL")
+
+
+def test_run_db_runs_sync_sessions_in_the_threadpool(db_session: Session):
+    """Tests that run_db hands a sync session's work to a worker thread and returns its result."""
+    # Arrange
+    loop_thread = threading.get_ident()
+
+    def work(db: Session):
+        return threading.get_ident(), db.execute(text("SELECT 1")).scalar()
+
+    # Act
+    worker_thread, value = asyncio.run(run_db(db_session, work))
+
+    # Assert
+    assert value == 1
+    assert worker_thread != loop_thread
+
+
+def test_run_blocking_leaves_the_event_loop_inside_run_sync():
+    """Tests that blocking cache I/O reached from AsyncSession.run_sync is moved off the loop thread."""
+    # Arrange: greenlet_spawn is what AsyncSession.run_sync runs sync code under
+    threads = {}
+
+    def sync_code():
+        threads["caller"] = threading.get_ident()
+        return run_blocking(lambda: threads.setdefault("io", threading.get_ident()))
+
+    async def scenario():
+        threads["loop"] = threading.get_ident()
+        return await greenlet_spawn(sync_code)
+
+    # Act
+    asyncio.run(scenario())
+    direct = run_blocking(threading.get_ident)
+
+    # Assert
+    assert threads["caller"] == threads["loop"]
+    assert threads["io"] != threads["loop"]
+    assert direct == threading.get_ident()
+
+
+@pytest.mark.skipif(not POSTGRES_URL, reason="TEST_POSTGRES_URL is not set")
+def test_async_session_dependency_and_run_db(monkeypatch):
+    """Smoke test of get_async_db and run_db against a real Postgres server over asyncpg."""
+    # Arrange
+    pytest.importorskip("asyncpg")
+    from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+    engine = create_async_engine(core_db.async_database_url(POSTGRES_URL))
+    monkeypatch.setattr(core_db, "AsyncSessionLocal", async_sessionmaker(engine, expire_on_commit=False))
+
+    async def scenario():
+        dependency = core_db.get_async_db()
+        session = await dependency.__anext__()
+        try:
+            assert isinstance(session, AsyncSession)
+            return await run_db(session, lambda db: db.execute(text("SELECT 41 + 1")).scalar())
+        finally:
+            await dependency.aclose()
+            await engine.dispose()
+
+    # Act
+    value = asyncio.run(scenario())
+
+    # Assert
+    assert value == 42
+
+
+def test_stats_reads_use_the_replica_and_writes_the_primary(client: TestClient, db_session: Session):
+    """Tests that telemetry writes go through the primary session and stats queries through the read session."""
+    # Arrange: two sessions on the test connection standing in for primary and replica
+    primary = sessionmaker(bind=db_session.connection())()
+    replica = sessionmaker(bind=db_session.connection())()
+    statements = {"primary": [], "replica": []}
+    for name, session in (("primary", primary), ("replica", replica)):
+        event.listen(session, "do_orm_execute", lambda state, name=name: statements[name].append(str(state.statement)))
+    app.dependency_overrides[get_db] = lambda: primary
+    app.dependency_overrides[get_read_db] = lambda: replica
+    user = create_user(db_session, UserCreate(email=f"routing_{uuid.uuid4()}@example.com", password="password"))
+    device = Device(name="Router", owner_id=user.id)
+    db_session.add(device)
+    db_session.commit()
+    login_response = client.post("/api/v1/auth/login", data={"username": user.email, "password": "password"})
+    headers = {"Authorization": f"Bearer {login_response.json()['access_token']}"}
+    point = {"device_id": str(device.id), "timestamp": (datetime.now(timezone.utc) - timedelta(hours=1)).isoformat(), "energy_usage": 1.5}
+
+    # Act
+    written = client.post("/api/v1/telemetry/batch", headers=headers, json={"points": [point]})
+    write_statements = {name: list(executed) for name, executed in statements.items()}
+    statements["primary"].clear()
+    read = client.get(f"/api/v1/devices/{device.id}/stats", headers=headers, params={"time_window": "6h", "resolution": "1h"})
+
+    # Assert
+    assert written.status_code == 200 and read.status_code == 200
+    assert any(sql.startswith("INSERT INTO telemetry ") for sql in write_statements["primary"])
+    assert write_statements["replica"] == []
+    assert any("FROM telemetry" in sql for sql in statements["replica"])
+    assert not any(sql.startswith(("INSERT", "UPDATE", "DELETE")) for sql in statements["replica"])
+    assert not any("telemetry" in sql for sql in statements["primary"])
+
@@ -0,0 +1,53 @@
+# backend/app/tests/modules/auth/test_login_limits.py
+
+import time
+import uuid
+from fastapi.testclient import TestClient
+
+from app.core.ratelimit import TokenBucketLimiter
+from app.modules.auth.hashing import password_hasher
+
+
+def test_token_bucket_allows_burst_then_refills():
+    """Tests that a bucket spends its burst, reports the wait, and refills over time."""
+    limiter = TokenBucketLimiter(rate=100.0, burst=2)
+
+    assert [limiter.acquire("key") for _ in range(2)] == [0.0, 0.0]
+    wait = limiter.acquire("key")
+    time.sleep(wait + 0.005)
+
+    assert 0 < wait <= 0.01
+    assert limiter.acquire("key") == 0.0
+    assert limiter.acquire("other") == 0.0
+    assert limiter.metrics() == {"keys": 2, "allowed": 4, "limited": 1}
+
+
+def test_login_is_rate_limited_per_account(client: TestClient):
+    """Tests that repeated logins for one account get 429 while other accounts are unaffected."""
+    # Arrange
+    email = f"limited_{uuid.uuid4()}@example.com"
+    form = {"username": email, "password": "wrong"}
+
+    # Act
+    statuses = [client.post("/api/v1/auth/login", data=form).status_code for _ in range(5)]
+    limited = client.post("/api/v1/auth/login", data=form)
+    other = client.post("/api/v1/auth/login", data={"username": f"other_{email}", "password": "wrong"})
+
+    # Assert
+    assert statuses == [401] * 5
+    assert limited.status_code == 429
+    assert int(limited.headers["Retry-After"]) >= 1
+    assert other.status_code == 401
+
+
+def test_saturated_hasher_returns_503(client: TestClient, monkeypatch):
+    """Tests that registration is shed with 503 when the hashing queue is full."""
+    # Arrange
+    monkeypatch.setattr(password_hasher, "max_pending", 0)
+
+    # Act
+    response = client.post("/api/v1/auth/register", json={"email": f"busy_{uuid.uuid4()}@example.com", "password": "pw"})
+
+    # Assert
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
@@ -0,0 +1,78 @@
+# backend/app/tests/modules/auth/test_user_cache.py
+
+import uuid
+from fastapi.testclient import TestClient
+from jose import jwt
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.user import User
+from app.modules.auth import service
+from app.modules.auth.schemas import UserCreate
+from app.modules.auth.user_cache import user_cache
+
+
+def create_logged_in_user(client: TestClient, db: Session) -> tuple[User, dict]:
+    user = service.create_user(db, UserCreate(email=f"cache_{uuid.uuid4()}@example.com", password="password"))
+    login_response = client.post("/api/v1/auth/login", data={"username": user.email, "password": "password"})
+    return user, {"Authorization": f"Bearer {login_response.json()['access_token']}"}
+
+
+def test_token_carries_user_id_and_repeat_requests_hit_cache(client: TestClient, db_session: Session):
+    """Tests that login tokens include the uid claim and a resolved user is served from the cache."""
+    # Arrange
+    user, headers = create_logged_in_user(client, db_session)
+    token = headers["Authorization"].split()[1]
+
+    # Act
+    first = client.get("/api/v1/devices/", headers=headers)
+    hits_before = user_cache.hits
+    second = client.get("/api/v1/devices/", headers=headers)
+
+    # Assert
+    claims = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+    assert claims["uid"] == str(user.id)
+    assert first.status_code == second.status_code == 200
+    assert user_cache.hits == hits_before + 1
+
+
+def test_deactivation_invalidates_cached_user(client: TestClient, db_session: Session):
+    """Tests that a deactivated user is rejected even after having been cached."""
+    # Arrange
+    user, headers = create_logged_in_user(client, db_session)
+    assert client.get("/api/v1/devices/", headers=headers).status_code == 200
+
+    # Act
+    service.set_user_active(db_session, user, False)
+    response = client.get("/api/v1/devices/", headers=headers)
+
+    # Assert
+    assert response.status_code == 401
+    assert user_cache.get(user.id) is None
+
+
+def test_password_change_invalidates_cached_user(client: TestClient, db_session: Session):
+    """Tests that changing the password drops the cached entry."""
+    # Arrange
+    user, headers = create_logged_in_user(client, db_session)
+    client.get("/api/v1/devices/", headers=headers)
+    assert user_cache.get(user.id) is not None
+
+    # Act
+    service.change_password(db_session, user, service.get_password_hash("new-password"))
+
+    # Assert
+    assert user_cache.get(user.id) is None
+
+
+def test_token_without_user_id_still_resolves(client: TestClient, db_session: Session):
+    """Tests that tokens issued before the uid claim fall back to the email lookup."""
+    # Arrange
+    user = service.create_user(db_session, UserCreate(email=f"legacy_{uuid.uuid4()}@example.com", password="password"))
+    token = service.create_access_token(subject=user.email)
+
+    # Act
+    response = client.get("/api/v1/devices/", headers={"Authorization": f"Bearer {token}"})
+
+    # Assert
+    assert response.status_code == 200
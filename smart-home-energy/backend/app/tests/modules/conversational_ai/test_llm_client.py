@@ -0,0 +1,188 @@
+# backend/app/tests/modules/conversational_ai/test_llm_client.py
+
+import asyncio
+import json
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+
+from app.modules.conversational_ai.llm_client import Coalescer, LLMClient, LLMTimeout
+
+
+class StubMessagesServer:
+    """
+    A local stand-in for the Messages API. Each request takes the next
+    (status, delay) from `script` (the last one repeats) and records how
+    many requests were being served at once.
+    """
+    def __init__(self, script):
+        self.script = list(script)
+        self.requests = 0
+        self.active = 0
+        self.max_active = 0
+        self._lock = threading.Lock()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                self.rfile.read(int(self.headers["Content-Length"]))
+                with stub._lock:
+                    status, delay = stub.script[min(stub.requests, len(stub.script) - 1)]
+                    stub.requests += 1
+                    stub.active += 1
+                    stub.max_active = max(stub.max_active, stub.active)
+                time.sleep(delay)
+                with stub._lock:
+                    stub.active -= 1
+                body = json.dumps(stub.reply(status)).encode()
+                try:
+                    self.send_response(status)
+                    self.send_header("Content-Type", "application/json")
+                    self.send_header("Content-Length", str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+                except (BrokenPipeError, ConnectionResetError):
+                    pass  # the client gave up
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    @staticmethod
+    def reply(status: int) -> dict:
+        if status != 200:
+            return {"type": "error", "error": {"type": "overloaded_error", "message": "Overloaded"}}
+        return {
+            "id": f"msg_{uuid.uuid4().hex}", "type": "message", "role": "assistant", "model": "stub",
+            "content": [{"type": "text", "text": "ok"}], "stop_reason": "end_turn", "stop_sequence": None,
+            "usage": {"input_tokens": 1, "output_tokens": 1},
+        }
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture()
+def stub_server(request):
+    server = StubMessagesServer(request.param)
+    yield server
+    server.close()
+
+
+def make_client(server: StubMessagesServer, **options) -> LLMClient:
+    defaults = {"max_concurrency": 4, "deadline_seconds": 5.0, "max_retries": 3, "backoff_seconds": 0.01, "backoff_max_seconds": 0.05}
+    return LLMClient(api_key="test-key", base_url=server.url, **{**defaults, **options})
+
+
+async def ask(client: LLMClient) -> str:
+    message = await client.create_message(model="stub", max_tokens=10, messages=[{"role": "user", "content": "hi"}])
+    return message.content[0].text
+
+
+@pytest.mark.parametrize("stub_server", [[(529, 0), (503, 0), (200, 0)]], indirect=True)
+def test_overloaded_responses_are_retried(stub_server):
+    """Tests that transient 5xx answers are retried until one succeeds."""
+    # Arrange
+    client = make_client(stub_server)
+
+    # Act
+    answer = asyncio.run(ask(client))
+
+    # Assert
+    assert answer == "ok"
+    assert stub_server.requests == 3
+    assert client.metrics()["retries"] == 2
+
+
+@pytest.mark.parametrize("stub_server", [[(200, 2.0)]], indirect=True)
+def test_slow_call_fails_at_its_deadline(stub_server):
+    """Tests that a call is abandoned once its deadline passes."""
+    # Arrange
+    client = make_client(stub_server, deadline_seconds=0.3)
+
+    # Act
+    started = time.perf_counter()
+    with pytest.raises(LLMTimeout):
+        asyncio.run(ask(client))
+    elapsed = time.perf_counter() - started
+
+    # Assert
+    assert elapsed < 1.5
+    assert client.metrics()["timeouts"] == 1
+
+
+@pytest.mark.parametrize("stub_server", [[(200, 0.1)]], indirect=True)
+def test_concurrency_is_bounded(stub_server):
+    """Tests that no more than max_concurrency calls reach the server at once."""
+    # Arrange
+    client = make_client(stub_server, max_concurrency=2)
+
+    async def scenario():
+        return await asyncio.gather(*(ask(client) for _ in range(8)))
+
+    # Act
+    answers = asyncio.run(scenario())
+
+    # Assert
+    assert answers == ["ok"] * 8
+    assert stub_server.max_active == 2
+    assert client.metrics()["in_flight"] == 0
+
+
+def test_identical_in_flight_questions_are_coalesced():
+    """Tests that concurrent calls with one key share a single execution, and other keys do not."""
+    # Arrange
+    coalescer = Coalescer()
+    calls = []
+
+    async def answer(key):
+        calls.append(key)
+        await asyncio.sleep(0.05)
+        return {"summary": f"answer for {key}"}
+
+    async def scenario():
+        same = [coalescer.run(("user-1", "q"), lambda: answer("user-1")) for _ in range(3)]
+        other = coalescer.run(("user-2", "q"), lambda: answer("user-2"))
+        return await asyncio.gather(*same, other)
+
+    # Act
+    results = asyncio.run(scenario())
+
+    # Assert
+    assert calls == ["user-1", "user-2"]
+    assert results[0] is results[1] is results[2]
+    assert results[3] == {"summary": "answer for user-2"}
+    assert coalescer.metrics() == {"in_flight": 0, "started": 2, "coalesced": 2}
+
+
+def test_waiter_takes_over_when_the_leader_is_cancelled():
+    """Tests that cancelling the caller doing the work does not fail the callers waiting on it."""
+    # Arrange
+    coalescer = Coalescer()
+    calls = []
+
+    async def answer():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return "done"
+
+    async def scenario():
+        leader = asyncio.ensure_future(coalescer.run("key", answer))
+        await asyncio.sleep(0)
+        waiter = asyncio.ensure_future(coalescer.run("key", answer))
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        return await waiter, leader.cancelled()
+
+    # Act
+    result, leader_cancelled = asyncio.run(scenario())
+
+    # Assert
+    assert result == "done" and leader_cancelled
+    assert len(calls) == 2
@@ -0,0 +1,122 @@
+# backend/app/tests/modules/conversational_ai/test_parse_cache.py
+
+import json
+import uuid
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.core.db import Base
+from app.models.device import Device
+from app.modules.conversational_ai.parse_cache import ParseCache, ParsedPlan, normalize_question
+from app.modules.conversational_ai.parser import LLMParser
+
+PLAN = {
+    "sql": "SELECT SUM(t.energy_usage) AS total FROM telemetry t JOIN devices d ON d.id = t.device_id "
+           "WHERE d.owner_id = :user_id AND t.timestamp >= :period_1_start AND t.timestamp < :period_1_end",
+    "summary": "Your fridge used {total} Wh {period_1}.",
+}
+
+
+class FakeLLMClient:
+    """Stands in for the shared LLM client, answering every request with one canned plan."""
+    def __init__(self, reply: dict):
+        self.requests = []
+        self.reply = reply
+
+    async def create_message(self, **kwargs):
+        self.requests.append(kwargs)
+        return SimpleNamespace(content=[SimpleNamespace(text=json.dumps(self.reply))])
+
+
+def make_cache(max_entries: int = 100, ttl_seconds: float = 60) -> ParseCache:
+    # A private database so the cache's own sessions can commit
+    engine = create_engine("sqlite:///:memory:", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    return ParseCache(max_entries=max_entries, ttl_seconds=ttl_seconds, session_factory=sessionmaker(bind=engine))
+
+
+def test_paraphrased_periods_normalize_to_one_question():
+    """Tests that case, punctuation and the relative period asked about do not change the normalized text."""
+    # Arrange
+    now = datetime(2025, 7, 16, 9, 30, tzinfo=timezone.utc)  # a Wednesday
+
+    # Act
+    yesterday = normalize_question("How much did my Fridge use yesterday?", now)
+    last_week = normalize_question("how much  did my fridge use LAST WEEK", now)
+    rolling = normalize_question("How much did my fridge use in the past 3 days?", now)
+
+    # Assert
+    assert yesterday.text == last_week.text == "how much did my fridge use {period_1}"
+    assert rolling.text == "how much did my fridge use in the {period_1}"
+    assert yesterday.params() == {
+        "period_1_start": datetime(2025, 7, 15, tzinfo=timezone.utc),
+        "period_1_end": datetime(2025, 7, 16, tzinfo=timezone.utc),
+    }
+    assert last_week.params()["period_1_start"] == datetime(2025, 7, 7, tzinfo=timezone.utc)
+    assert last_week.params()["period_1_end"] == datetime(2025, 7, 14, tzinfo=timezone.utc)
+    assert rolling.params()["period_1_start"] == now - timedelta(days=3)
+    assert rolling.render("Used {period_1}.") == "Used past 3 days."
+
+
+def test_repeated_question_is_served_from_the_cache():
+    """Tests that a paraphrase reuses the cached plan with its own period bound, without another LLM call."""
+    # Arrange
+    client = FakeLLMClient(PLAN)
+    cache = make_cache()
+    parser = LLMParser(client=client, cache=cache)
+    devices = [Device(id=uuid.uuid4(), name="Fridge")]
+
+    # Act
+    first = parser.parse("How much did my fridge use yesterday?", devices)
+    second = parser.parse("how much did my Fridge use last week", devices)
+
+    # Assert
+    assert len(client.requests) == 1
+    assert "{period_1}" in client.requests[0]["messages"][0]["content"]
+    assert "{period_1}" in client.requests[0]["system"]
+    assert first.sql_query == second.sql_query == PLAN["sql"]
+    assert first.params["period_1_end"] - first.params["period_1_start"] == timedelta(days=1)
+    assert second.params["period_1_end"] - second.params["period_1_start"] == timedelta(weeks=1)
+    assert second.summary_template == "Your fridge used {total} Wh last week."
+    assert cache.metrics()["hits"] == 1
+    assert cache.metrics()["hit_rate"] == 0.5
+
+
+def test_different_device_set_misses():
+    """Tests that the same question from a user with other devices gets its own plan."""
+    # Arrange
+    client = FakeLLMClient(PLAN)
+    parser = LLMParser(client=client, cache=make_cache())
+    question = "How much did my fridge use today?"
+
+    # Act
+    parser.parse(question, [Device(id=uuid.uuid4(), name="Fridge")])
+    parser.parse(question, [Device(id=uuid.uuid4(), name="Fridge")])
+
+    # Assert
+    assert len(client.requests) == 2
+
+
+def test_expired_and_least_recently_used_plans_are_evicted():
+    """Tests TTL expiry on lookup and LRU trimming down to max_entries."""
+    # Arrange
+    cache = make_cache(max_entries=1)
+    expired = make_cache(ttl_seconds=-1)
+    plan = ParsedPlan(sql_query="SELECT 1", summary_template="One.")
+    question = normalize_question("what is one")
+
+    # Act
+    cache.set("old", question, "devices", plan)
+    cache.set("new", question, "devices", plan)
+    cache.get("new")
+    cache.trim()
+    expired.set("stale", question, "devices", plan)
+
+    # Assert
+    assert cache.get("old") is None
+    assert cache.get("new") == plan
+    assert cache.metrics()["evictions"] == 1
+    assert expired.get("stale") is None
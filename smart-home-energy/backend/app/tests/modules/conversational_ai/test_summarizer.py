@@ -0,0 +1,75 @@
+# backend/app/tests/modules/conversational_ai/test_summarizer.py
+
+import asyncio
+import json
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from types import SimpleNamespace
+
+from app.modules.conversational_ai.summarizer import Summarizer, fit_to_budget
+
+
+class FakeLLMClient:
+    """Stands in for the shared LLM client, recording summarization requests."""
+    def __init__(self):
+        self.requests = []
+
+    async def create_message(self, **kwargs):
+        self.requests.append(kwargs)
+        return SimpleNamespace(content=[SimpleNamespace(text="Usage peaked in the evening.")])
+
+
+def test_scalar_and_small_results_use_templates():
+    """Tests that aggregates, filled summary templates and small results never reach the LLM."""
+    # Arrange
+    client = FakeLLMClient()
+    summarizer = Summarizer(template_max_rows=3, token_budget=1000)
+    aggregate = {"metric": "SUM", "value": 123.45, "kwargs": {"device_name": "Office Heater"}}
+    single_row = {"metric": "RAW_SQL", "data": [{"total": Decimal("12.5000")}], "summary_template": "Your fridge used {total} Wh yesterday."}
+    few_rows = {"metric": "RAW_SQL", "data": [{"name": "Fridge", "total": 2}, {"name": "Oven", "total": 3.333}]}
+
+    # Act
+    summaries = [asyncio.run(summarizer.summarize(result, "question", client)) for result in (aggregate, single_row, few_rows)]
+
+    # Assert
+    assert summaries == [
+        "The total energy usage for Office Heater was 123.45 Watts.",
+        "Your fridge used 12.5 Wh yesterday.",
+        "Found 2 results:\n- name: Fridge, total: 2\n- name: Oven, total: 3.33",
+    ]
+    assert client.requests == []
+    assert summarizer.metrics()["llm_calls_saved"] == 3
+
+
+def test_large_results_are_sampled_to_the_token_budget_for_the_llm():
+    """Tests that a complex result is sent once, sampled down to the budget, with the row count noted."""
+    # Arrange
+    client = FakeLLMClient()
+    summarizer = Summarizer(template_max_rows=3, token_budget=200)
+    start = datetime(2025, 7, 1, tzinfo=timezone.utc)
+    rows = [{"timestamp": start + timedelta(hours=h), "energy_usage": Decimal(h)} for h in range(500)]
+
+    # Act
+    summary = asyncio.run(summarizer.summarize({"metric": "RAW_SQL", "data": rows}, "when do I use the most?", client))
+
+    # Assert
+    assert summary == "Usage peaked in the evening."
+    assert len(client.requests) == 1
+    sent = json.loads(client.requests[0]["messages"][0]["content"])
+    assert len(client.requests[0]["messages"][0]["content"]) <= 200 * 4
+    assert sent[0]["energy_usage"] == 0 and sent[-1]["energy_usage"] == 499
+    assert f"The data has 500 rows; {len(sent)} evenly spaced rows are shown." in client.requests[0]["system"]
+    assert summarizer.metrics()["llm_calls"] == 1
+    assert summarizer.metrics()["sampled"] == 1
+
+
+def test_fit_to_budget_keeps_results_that_fit():
+    """Tests that rows within the budget are passed through untouched."""
+    # Arrange
+    rows = [{"value": value} for value in range(10)]
+
+    # Act
+    kept, total = fit_to_budget(rows, token_budget=1000)
+
+    # Assert
+    assert kept == rows and total == 10
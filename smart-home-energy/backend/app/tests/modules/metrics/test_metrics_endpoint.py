@@ -0,0 +1,63 @@
+# backend/app/tests/modules/metrics/test_metrics_endpoint.py
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+
+from app.core.config import settings
+from app.core.pool import InstrumentedQueuePool, pool_metrics
+
+
+def test_metrics_endpoint_exposes_pool_and_cache_metrics(client: TestClient, monkeypatch):
+    """Tests that the metrics endpoint reports every registered component."""
+    # Arrange
+    monkeypatch.setattr(settings, "METRICS_TOKEN", "metrics-secret")
+
+    # Act
+    response = client.get("/api/v1/metrics/", headers={"Authorization": "Bearer metrics-secret"})
+
+    # Assert
+    assert response.status_code == 200
+    body = response.json()
+    assert {"checked_out", "idle", "overflow", "avg_wait_ms", "timeouts"} <= body["db_pool"]["primary"].keys()
+    assert "hits" in body["stats_cache"]
+    assert "depth" in body["telemetry_ingest_queue"]
+
+
+def test_metrics_endpoint_requires_the_metrics_token(client: TestClient, monkeypatch):
+    """Tests that metrics are hidden without a configured token and refused without the right one."""
+    # Act
+    monkeypatch.setattr(settings, "METRICS_TOKEN", None)
+    disabled = client.get("/api/v1/metrics/", headers={"Authorization": "Bearer anything"})
+    monkeypatch.setattr(settings, "METRICS_TOKEN", "metrics-secret")
+    anonymous = client.get("/api/v1/metrics/")
+    wrong = client.get("/api/v1/metrics/", headers={"Authorization": "Bearer guess"})
+
+    # Assert
+    assert disabled.status_code == 404
+    assert anonymous.status_code == 401
+    assert wrong.status_code == 401
+
+
+def test_instrumented_pool_tracks_occupancy_and_timeouts():
+    """Tests checked-out/idle/overflow gauges and that exhausted checkouts are counted."""
+    # Arrange: one connection, no overflow, fail fast
+    engine = create_engine(
+        "sqlite://", poolclass=InstrumentedQueuePool, pool_size=1, max_overflow=0, pool_timeout=0.05
+    )
+
+    # Act
+    held = engine.connect()
+    busy = pool_metrics(engine)
+    with pytest.raises(PoolTimeoutError):
+        engine.connect()
+    held.close()
+    idle = pool_metrics(engine)
+
+    # Assert
+    assert (busy["checked_out"], busy["idle"], busy["overflow"]) == (1, 0, 0)
+    assert (idle["checked_out"], idle["idle"]) == (0, 1)
+    assert idle["checkouts"] == 2
+    assert idle["timeouts"] == 1
+    assert idle["max_wait_ms"] >= 50
@@ -0,0 +1,108 @@
+# backend/app/tests/modules/telemetry/test_device_keys.py
+
+import uuid
+from datetime import datetime, timezone
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from app.core.notify import notify_listener
+from app.models.device import Device, Telemetry
+from app.modules.auth.schemas import UserCreate
+from app.modules.auth.service import create_user
+from app.modules.telemetry import device_keys
+
+
+def create_device_with_key(client: TestClient, db: Session) -> tuple[Device, str, dict]:
+    user = create_user(db, UserCreate(email=f"gateway_{uuid.uuid4()}@example.com", password="password"))
+    login_response = client.post("/api/v1/auth/login", data={"username": user.email, "password": "password"})
+    headers = {"Authorization": f"Bearer {login_response.json()['access_token']}"}
+    device = Device(name="Meter", owner_id=user.id)
+    db.add(device)
+    db.commit()
+    response = client.post(f"/api/v1/devices/{device.id}/api-key", headers=headers)
+    assert response.status_code == 201
+    return device, response.json()["api_key"], headers
+
+
+def reading(device_id: uuid.UUID) -> dict:
+    return {"device_id": str(device_id), "timestamp": datetime.now(timezone.utc).isoformat(), "energy_usage": 1.5}
+
+
+def test_device_key_writes_its_own_device(client: TestClient, db_session: Session):
+    """Tests that a device key authenticates single and batch writes for its device, storing only a hash."""
+    # Arrange
+    device, api_key, _ = create_device_with_key(client, db_session)
+    key_headers = {"X-Device-Key": api_key}
+
+    # Act
+    single = client.post("/api/v1/telemetry/", headers=key_headers, json=reading(device.id))
+    batch = client.post("/api/v1/telemetry/batch", headers=key_headers, json={"points": [reading(device.id)]})
+
+    # Assert
+    assert single.status_code == 201
+    assert batch.json()["accepted"] == 1
+    db_session.refresh(device)
+    assert device.api_key_hash == device_keys.hash_api_key(api_key) != api_key
+    assert db_session.query(Telemetry).filter(Telemetry.device_id == device.id).count() == 2
+
+
+def test_device_key_is_scoped_to_its_device(client: TestClient, db_session: Session):
+    """Tests that a key cannot write another device, even one with the same owner."""
+    # Arrange
+    device, api_key, _ = create_device_with_key(client, db_session)
+    sibling = Device(name="Oven", owner_id=device.owner_id)
+    db_session.add(sibling)
+    db_session.commit()
+    key_headers = {"X-Device-Key": api_key}
+
+    # Act
+    single = client.post("/api/v1/telemetry/", headers=key_headers, json=reading(sibling.id))
+    batch = client.post("/api/v1/telemetry/batch", headers=key_headers, json={"points": [reading(sibling.id)]})
+    devices = client.get("/api/v1/devices/", headers={"Authorization": f"Bearer {api_key}"})
+
+    # Assert
+    assert single.status_code == 403
+    assert batch.json()["rejected"] == 1
+    assert devices.status_code == 401
+
+
+def test_rotated_and_revoked_keys_are_rejected(client: TestClient, db_session: Session):
+    """Tests that issuing a new key or revoking it stops the old key from working."""
+    # Arrange
+    device, old_key, headers = create_device_with_key(client, db_session)
+    assert client.post("/api/v1/telemetry/", headers={"X-Device-Key": old_key}, json=reading(device.id)).status_code == 201
+
+    # Act
+    new_key = client.post(f"/api/v1/devices/{device.id}/api-key", headers=headers).json()["api_key"]
+    old_after_rotation = client.post("/api/v1/telemetry/", headers={"X-Device-Key": old_key}, json=reading(device.id))
+    client.delete(f"/api/v1/devices/{device.id}/api-key", headers=headers)
+    new_after_revocation = client.post("/api/v1/telemetry/", headers={"X-Device-Key": new_key}, json=reading(device.id))
+
+    # Assert
+    assert old_after_rotation.status_code == 401
+    assert new_after_revocation.status_code == 401
+    assert client.post("/api/v1/telemetry/", headers={"X-Device-Key": "dk_garbage"}, json=reading(device.id)).status_code == 401
+
+
+def test_unknown_devices_are_not_cached_and_notifications_invalidate(db_session: Session, monkeypatch):
+    """Tests that lookups of nonexistent devices stay uncached and a key-change notification drops a cached entry."""
+    # Arrange
+    verifier = device_keys.DeviceKeyVerifier(max_entries=10, ttl_seconds=60)
+    monkeypatch.setattr(device_keys, "verifier", verifier)
+    user = create_user(db_session, UserCreate(email=f"notify_{uuid.uuid4()}@example.com", password="password"))
+    device = Device(name="Meter", owner_id=user.id)
+    db_session.add(device)
+    db_session.commit()
+    unknown = uuid.uuid4()
+
+    # Act
+    missing = verifier.load(db_session, unknown)
+    verifier.load(db_session, device.id)
+    cached_before = verifier.cached(device.id)
+    notify_listener.dispatch(device_keys.CHANNEL, str(device.id))
+
+    # Assert
+    assert missing.owner_id is None
+    assert verifier.cached(unknown) is None
+    assert cached_before is not None and cached_before.owner_id == user.id
+    assert verifier.cached(device.id) is None
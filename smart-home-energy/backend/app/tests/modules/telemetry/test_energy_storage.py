@@ -0,0 +1,66 @@
+# backend/app/tests/modules/telemetry/test_energy_storage.py
+
+from sqlalchemy import Column, Integer, MetaData, Table, create_engine, func, insert, select
+
+from app.models.types import MilliwattHours, MilliwattHoursTotal, energy_storage_value, energy_type
+
+
+def make_table():
+    metadata = MetaData()
+    table = Table(
+        "readings", metadata,
+        Column("id", Integer, primary_key=True),
+        Column("energy", MilliwattHours()),
+    )
+    engine = create_engine("sqlite://")
+    metadata.create_all(engine)
+    return engine, table
+
+
+def test_milliwatt_hours_round_trip_as_integers():
+    """Tests that readings are stored as whole milliwatt-hours and read back as floats."""
+    # Arrange
+    engine, table = make_table()
+
+    # Act
+    with engine.begin() as conn:
+        conn.execute(insert(table), [{"energy": 1.23456}, {"energy": 0.1}, {"energy": None}])
+        stored = conn.exec_driver_sql("SELECT energy FROM readings ORDER BY id").scalars().all()
+        values = conn.execute(select(table.c.energy).order_by(table.c.id)).scalars().all()
+
+    # Assert
+    assert stored == [1235, 100, None]
+    assert values == [1.235, 0.1, None]
+    assert all(value is None or type(value) is float for value in values)
+
+
+def test_milliwatt_hours_sum_is_exact():
+    """Tests that a SUM adds integers in the database, so no float error accumulates."""
+    # Arrange: 0.1 summed 1000 times drifts as a float
+    engine, table = make_table()
+    with engine.begin() as conn:
+        conn.execute(insert(table), [{"energy": 0.1}] * 1000)
+
+    # Act
+    with engine.connect() as conn:
+        total = conn.execute(select(func.sum(table.c.energy))).scalar()
+
+    # Assert
+    assert sum([0.1] * 1000) != 100.0
+    assert total == 100.0
+    assert type(total) is float
+
+
+def test_energy_type_follows_storage_setting(monkeypatch):
+    """Tests that the column type and COPY value follow TELEMETRY_ENERGY_STORAGE."""
+    # Arrange
+    from app.core.config import settings
+
+    # Act / Assert: the default keeps NUMERIC but never returns Decimal
+    assert energy_type().asdecimal is False
+    assert energy_storage_value(1.5) == 1.5
+
+    monkeypatch.setattr(settings, "TELEMETRY_ENERGY_STORAGE", "milliwatt_hours")
+    assert isinstance(energy_type(), MilliwattHours)
+    assert isinstance(energy_type(total=True), MilliwattHoursTotal)
+    assert energy_storage_value(1.5) == 1500
@@ -0,0 +1,133 @@
+# backend/app/tests/modules/telemetry/test_ingest_queue.py
+
+import threading
+import uuid
+from datetime import datetime, timezone
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.device import Device
+from app.modules.auth.schemas import UserCreate
+from app.modules.auth.service import create_user
+from app.modules.telemetry import endpoints
+from app.modules.telemetry.ingest_queue import TelemetryIngestQueue
+
+
+def make_row(minute: int = 0) -> dict:
+    return {"device_id": uuid.uuid4(), "timestamp": datetime(2025, 1, 1, 0, minute, tzinfo=timezone.utc), "energy_usage": 1.0}
+
+
+def test_queue_rejects_when_full():
+    """Tests that a full queue refuses new rows instead of growing."""
+    ingest_queue = TelemetryIngestQueue(max_size=2, batch_size=10, flush_interval=0.05, flush_batch=lambda rows: None)
+
+    assert ingest_queue.put(make_row(0))
+    assert ingest_queue.put(make_row(1))
+    assert not ingest_queue.put(make_row(2))
+    assert not ingest_queue.put(make_row(3), timeout=0.01)
+
+    stats = ingest_queue.metrics()
+    assert stats["depth"] == 2
+    assert stats["rejected"] == 2
+
+
+def test_queue_flushes_in_batches_and_drains_on_stop():
+    """Tests that the flusher writes size-bounded batches and stop() drains everything."""
+    batches = []
+    ingest_queue = TelemetryIngestQueue(max_size=100, batch_size=4, flush_interval=0.05, flush_batch=batches.append)
+    for minute in range(10):
+        ingest_queue.put(make_row(minute))
+
+    ingest_queue.start()
+    ingest_queue.stop()
+
+    assert sum(len(batch) for batch in batches) == 10
+    assert max(len(batch) for batch in batches) <= 4
+    stats = ingest_queue.metrics()
+    assert stats["depth"] == 0
+    assert stats["flushed"] == 10
+    assert not stats["running"]
+
+
+def test_failed_flush_is_retried_then_dropped():
+    """Tests that a failing write is retried with backoff and only counted as dropped once retries run out."""
+    # Arrange
+    attempts = []
+
+    def flaky(rows):
+        attempts.append(len(rows))
+        if len(attempts) < 3:
+            raise ConnectionError("database unavailable")
+
+    recovering = TelemetryIngestQueue(max_size=10, batch_size=10, flush_interval=0.05, flush_batch=flaky, max_retries=3, retry_backoff=0.01)
+    failing = TelemetryIngestQueue(
+        max_size=10, batch_size=10, flush_interval=0.05, flush_batch=lambda rows: 1 / 0, max_retries=2, retry_backoff=0.01
+    )
+    for minute in range(3):
+        recovering.put(make_row(minute))
+        failing.put(make_row(minute))
+
+    # Act
+    recovering.stop()
+    failing.stop()
+
+    # Assert
+    assert attempts == [3, 3, 3]
+    assert (recovering.metrics()["flushed"], recovering.metrics()["retries"], recovering.metrics()["dropped"]) == (3, 2, 0)
+    assert (failing.metrics()["flushed"], failing.metrics()["retries"], failing.metrics()["dropped"]) == (0, 2, 3)
+
+
+def test_stop_does_not_drain_behind_a_running_flusher():
+    """Tests that stop() leaves the queue to a flusher that outlived the join timeout."""
+    # Arrange
+    release = threading.Event()
+    writers = []
+
+    def slow(rows):
+        writers.append(threading.current_thread().name)
+        release.wait(5)
+
+    ingest_queue = TelemetryIngestQueue(max_size=10, batch_size=1, flush_interval=0.01, flush_batch=slow)
+    ingest_queue.put(make_row(0))
+    ingest_queue.start()
+    while not writers:
+        release.wait(0.01)
+    ingest_queue.put(make_row(1))
+
+    # Act
+    ingest_queue.stop(timeout=0.05)
+    still_queued = ingest_queue.metrics()["depth"]
+    release.set()
+    ingest_queue.stop()
+
+    # Assert
+    assert still_queued == 1
+    assert writers == ["telemetry-flusher", "telemetry-flusher"]
+    assert ingest_queue.metrics()["flushed"] == 2
+
+
+def test_submit_telemetry_queued_mode_returns_202(client: TestClient, db_session: Session, monkeypatch):
+    """Tests that queued mode acknowledges with 202 and answers 429 when the queue is full."""
+    # Arrange
+    test_queue = TelemetryIngestQueue(max_size=1, batch_size=10, flush_interval=0.05, flush_batch=lambda rows: None)
+    monkeypatch.setattr(settings, "TELEMETRY_INGEST_MODE", "queued")
+    monkeypatch.setattr(endpoints, "ingest_queue", test_queue)
+    user = create_user(db_session, UserCreate(email=f"queued_{uuid.uuid4()}@example.com", password="password"))
+    device = Device(name="Freezer", owner_id=user.id)
+    db_session.add(device)
+    db_session.commit()
+    login_response = client.post("/api/v1/auth/login", data={"username": user.email, "password": "password"})
+    headers = {"Authorization": f"Bearer {login_response.json()['access_token']}"}
+    payload = {"device_id": str(device.id), "timestamp": datetime.now(timezone.utc).isoformat(), "energy_usage": 3.5}
+
+    # Act
+    accepted = client.post("/api/v1/telemetry/", headers=headers, json=payload)
+    rejected = client.post("/api/v1/telemetry/", headers=headers, json=payload)
+
+    # Assert
+    assert accepted.status_code == 202
+    assert accepted.json()["energy_usage"] == 3.5
+    assert rejected.status_code == 429
+    assert "Retry-After" in rejected.headers
+    assert test_queue.metrics()["depth"] == 1
@@ -0,0 +1,206 @@
+# backend/app/tests/modules/telemetry/test_live.py
+
+import asyncio
+import json
+import uuid
+from datetime import datetime, timedelta, timezone
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from app.models.device import Device
+from app.modules.auth.schemas import UserCreate
+from app.modules.auth.service import create_user
+from app.modules.telemetry import live, service
+
+
+def create_device(db: Session, name: str = "Heat pump") -> Device:
+    user = create_user(db, UserCreate(email=f"live_{uuid.uuid4()}@example.com", password="password"))
+    device = Device(name=name, owner_id=user.id)
+    db.add(device)
+    db.commit()
+    return device
+
+
+def make_event(device_id: uuid.UUID, value: float = 1.0) -> dict:
+    return {"device_id": str(device_id), "points": [{"timestamp": "2025-06-01T10:00:00+00:00", "energy_usage": value}], "buckets": {}}
+
+
+def drain(subscription: live.Subscription) -> list:
+    messages = []
+    while not subscription.queue.empty():
+        messages.append(subscription.queue.get_nowait())
+    return messages
+
+
+def test_events_reach_only_subscribers_of_the_device():
+    """Tests that an event is delivered to every subscriber of its device and nobody else."""
+    async def scenario():
+        # Arrange
+        broker = live.LiveBroker(buffer_size=10)
+        watched, other = uuid.uuid4(), uuid.uuid4()
+        first = broker.subscribe([watched])
+        second = broker.subscribe([watched, other])
+        bystander = broker.subscribe([other])
+
+        # Act
+        broker.publish([make_event(watched)])
+
+        return broker, drain(first), drain(second), drain(bystander)
+
+    broker, first, second, bystander = asyncio.run(scenario())
+
+    # Assert
+    assert len(first) == len(second) == 1
+    assert first[0] is second[0]  # encoded once, shared
+    assert first[0].startswith("event: telemetry\ndata: ")
+    assert bystander == []
+    assert broker.metrics()["delivered"] == 2
+
+
+def test_slow_subscriber_is_dropped_without_affecting_others():
+    """Tests that a subscriber whose buffer is full is cut off and told so."""
+    async def scenario():
+        # Arrange
+        broker = live.LiveBroker(buffer_size=2)
+        device_id = uuid.uuid4()
+        slow = broker.subscribe([device_id])
+        fast = broker.subscribe([device_id])
+
+        # Act: the fast subscriber keeps up, the slow one never reads
+        received = []
+        for value in range(3):
+            broker.publish([make_event(device_id, value)])
+            received += drain(fast)
+        broker.publish([make_event(device_id, 3)])
+
+        return broker, slow, drain(slow), received + drain(fast)
+
+    broker, slow, slow_messages, fast_messages = asyncio.run(scenario())
+
+    # Assert
+    assert slow.dropped
+    assert slow_messages == [None]
+    assert len(fast_messages) == 4
+    assert broker.metrics()["dropped_subscribers"] == 1
+    assert broker.metrics()["subscribers"] == 1
+
+
+def test_stream_ends_with_dropped_event_and_unsubscribes():
+    """Tests the SSE framing, heartbeats and cleanup of one stream."""
+    async def scenario():
+        # Arrange
+        broker = live.LiveBroker(buffer_size=1)
+        device_id = uuid.uuid4()
+        stream = live.stream_events(broker, [device_id], heartbeat=0.01)
+
+        # Act
+        frames = [await stream.__anext__(), await stream.__anext__()]  # retry hint, heartbeat
+        broker.publish([make_event(device_id, 1)])
+        frames.append(await stream.__anext__())
+        broker.publish([make_event(device_id, 2)])
+        broker.publish([make_event(device_id, 3)])  # overflows the one-slot buffer
+        frames += [frame async for frame in stream]
+        return broker, frames
+
+    broker, frames = asyncio.run(scenario())
+
+    # Assert
+    assert frames[0] == "retry: 10\n\n"
+    assert frames[1] == ": keep-alive\n\n"
+    assert json.loads(frames[2].split("data: ", 1)[1])["points"][0]["energy_usage"] == 1
+    assert frames[-1] == "event: dropped\ndata: {}\n\n"
+    assert broker.metrics()["subscribers"] == 0
+
+
+def test_committed_ingest_publishes_points_and_current_buckets(db_session: Session, monkeypatch):
+    """Tests that a commit announces the new points with the refreshed hourly and daily buckets."""
+    # Arrange
+    broker = live.LiveBroker(buffer_size=10)
+    monkeypatch.setattr(live, "live_broker", broker)
+    device = create_device(db_session)
+    start = datetime(2025, 6, 1, 10, 0, tzinfo=timezone.utc)
+    earlier = [{"device_id": device.id, "timestamp": start - timedelta(hours=1), "energy_usage": 4.0}]
+    rows = [
+        {"device_id": device.id, "timestamp": start + timedelta(minutes=minute), "energy_usage": 1.5}
+        for minute in (0, 15, 30)
+    ]
+
+    async def scenario():
+        subscription = broker.subscribe([device.id])
+        service.upsert_telemetry(db_session, earlier)
+        db_session.commit()
+        drain(subscription)
+
+        # Act
+        service.upsert_telemetry(db_session, rows)
+        db_session.commit()
+        return drain(subscription)
+
+    messages = asyncio.run(scenario())
+
+    # Assert
+    assert len(messages) == 1
+    payload = json.loads(messages[0].split("data: ", 1)[1])
+    assert payload["device_id"] == str(device.id)
+    assert [point["energy_usage"] for point in payload["points"]] == [1.5, 1.5, 1.5]
+    assert payload["buckets"]["hour"]["bucket"] == start.isoformat()
+    assert payload["buckets"]["hour"]["total_energy"] == 4.5
+    assert payload["buckets"]["day"]["total_energy"] == 8.5
+    assert payload["buckets"]["day"]["sample_count"] == 4
+
+
+def test_notify_payloads_stay_under_the_postgres_limit():
+    """Tests that many events are packed into as few NOTIFY payloads as fit."""
+    # Arrange
+    events = [
+        {"device_id": str(uuid.uuid4()), "points": [{"timestamp": "2025-06-01T10:00:00+00:00", "energy_usage": 1.0}] * 20, "buckets": {}}
+        for _ in range(40)
+    ]
+
+    # Act
+    payloads = live.notify_payloads(events, live.origin())
+
+    # Assert
+    assert 1 < len(payloads) < len(events)
+    assert all(len(payload) < 8000 for payload in payloads)
+    assert all(json.loads(payload)["origin"] == live.origin() for payload in payloads)
+    assert [e for payload in payloads for e in json.loads(payload)["events"]] == events
+
+
+def test_notifications_from_this_worker_are_not_published_twice(monkeypatch):
+    """Tests that the listener publishes other workers' events but skips the ones this worker sent."""
+    async def scenario():
+        # Arrange
+        broker = live.LiveBroker(buffer_size=10)
+        monkeypatch.setattr(live, "live_broker", broker)
+        device_id = uuid.uuid4()
+        subscription = broker.subscribe([device_id])
+        [own] = live.notify_payloads([make_event(device_id, 1.0)], live.origin())
+        [other] = live.notify_payloads([make_event(device_id, 2.0)], "another-worker")
+
+        # Act
+        live.receive_notification(own)
+        live.receive_notification(other)
+
+        return drain(subscription)
+
+    messages = asyncio.run(scenario())
+
+    # Assert
+    assert len(messages) == 1
+    assert json.loads(messages[0].split("data: ", 1)[1])["points"][0]["energy_usage"] == 2.0
+
+
+def test_live_endpoint_rejects_devices_of_other_users(client: TestClient, db_session: Session):
+    """Tests that a user cannot subscribe to someone else's device."""
+    # Arrange
+    user = create_user(db_session, UserCreate(email=f"viewer_{uuid.uuid4()}@example.com", password="password"))
+    login_response = client.post("/api/v1/auth/login", data={"username": user.email, "password": "password"})
+    headers = {"Authorization": f"Bearer {login_response.json()['access_token']}"}
+    foreign = create_device(db_session)
+
+    # Act
+    response = client.get("/api/v1/devices/live", params={"device_ids": str(foreign.id)}, headers=headers)
+
+    # Assert
+    assert response.status_code == 404
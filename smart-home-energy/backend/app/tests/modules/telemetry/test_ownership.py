@@ -0,0 +1,76 @@
+# backend/app/tests/modules/telemetry/test_ownership.py
+
+import uuid
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.models.device import Device
+from app.modules.auth.schemas import UserCreate
+from app.modules.auth.service import create_user
+from app.modules.telemetry.ownership import DeviceOwnershipIndex, ownership_index
+
+
+def create_device(db: Session, name: str = "Heater") -> Device:
+    user = create_user(db, UserCreate(email=f"owner_{uuid.uuid4()}@example.com", password="password"))
+    device = Device(name=name, owner_id=user.id)
+    db.add(device)
+    db.commit()
+    return device
+
+
+def count_queries(db: Session, operation) -> int:
+    statements = []
+    listener = lambda *args: statements.append(args[2])
+    event.listen(db.get_bind(), "before_cursor_execute", listener)
+    try:
+        operation()
+    finally:
+        event.remove(db.get_bind(), "before_cursor_execute", listener)
+    return len(statements)
+
+
+def test_repeat_checks_are_served_without_a_query(db_session: Session):
+    """Tests that ownership is queried once and then answered from the index."""
+    # Arrange
+    index = DeviceOwnershipIndex(max_entries=100, ttl_seconds=60)
+    device = create_device(db_session)
+    device_id, owner_id = device.id, device.owner_id
+
+    # Act
+    first = count_queries(db_session, lambda: index.owned_ids(db_session, owner_id, [device_id]))
+    second = count_queries(db_session, lambda: index.owned_ids(db_session, owner_id, [device_id]))
+
+    # Assert
+    assert (first, second) == (1, 0)
+    assert index.owned_ids(db_session, uuid.uuid4(), [device_id]) == set()
+    assert index.metrics()["checks"] == 3
+    assert index.metrics()["cached_checks"] == 2
+
+
+def test_unknown_devices_are_never_cached(db_session: Session):
+    """Tests that ids without a device always go to the database."""
+    # Arrange
+    index = DeviceOwnershipIndex(max_entries=100, ttl_seconds=60)
+    missing_id = uuid.uuid4()
+
+    # Act
+    queries = [count_queries(db_session, lambda: index.owned_ids(db_session, uuid.uuid4(), [missing_id])) for _ in range(2)]
+
+    # Assert
+    assert queries == [1, 1]
+    assert index.metrics()["size"] == 0
+
+
+def test_committed_device_changes_invalidate_the_index(db_session: Session):
+    """Tests that deleting a device removes it from the shared index on commit."""
+    # Arrange
+    device = create_device(db_session)
+    device_id, owner_id = device.id, device.owner_id
+    assert ownership_index.owned_ids(db_session, owner_id, [device_id]) == {device_id}
+
+    # Act
+    db_session.delete(device)
+    db_session.commit()
+
+    # Assert
+    assert ownership_index.owned_ids(db_session, owner_id, [device_id]) == set()
@@ -0,0 +1,85 @@
+# backend/app/tests/modules/telemetry/test_partitions.py
+
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+from app.core.tasks import PeriodicTask
+from app.modules.telemetry import partitions
+from app.modules.telemetry.partitions import Partition, maintain_partitions, partition_start, plan_partitions
+
+
+def utc(*args) -> datetime:
+    return datetime(*args, tzinfo=timezone.utc)
+
+
+def test_partition_boundaries_for_months_and_weeks():
+    """Tests that partitions start on the first of the month or on Mondays, across a year end."""
+    assert partition_start(utc(2026, 12, 31, 23, 59), "month") == utc(2026, 12, 1)
+    assert partition_start(utc(2026, 10, 18, 12), "week") == utc(2026, 10, 12)
+
+    planned = plan_partitions([], utc(2026, 11, 15), utc(2027, 1, 2), "month")
+
+    assert [(p.name, p.start, p.end) for p in planned] == [
+        ("telemetry_p20261101", utc(2026, 11, 1), utc(2026, 12, 1)),
+        ("telemetry_p20261201", utc(2026, 12, 1), utc(2027, 1, 1)),
+        ("telemetry_p20270101", utc(2027, 1, 1), utc(2027, 2, 1)),
+    ]
+
+
+def test_planning_skips_ranges_already_covered():
+    """Tests that existing partitions, including ones of another width, are not recreated or overlapped."""
+    existing = [
+        Partition("telemetry_p20261001", utc(2026, 10, 1), utc(2026, 11, 1)),
+        Partition("telemetry_legacy", None, utc(2026, 9, 1)),
+    ]
+
+    planned = plan_partitions(existing, utc(2026, 8, 20), utc(2026, 11, 10), "week")
+
+    # Weeks touching the legacy range or October are left to those partitions
+    # (and the default partition for the uncovered days).
+    assert [p.name for p in planned] == [
+        "telemetry_p20260907", "telemetry_p20260914", "telemetry_p20260921",
+        "telemetry_p20261102", "telemetry_p20261109",
+    ]
+
+
+def test_periodic_task_counts_failures_and_keeps_last_result():
+    """Tests that a failing run is counted without losing the last successful result."""
+    outcomes = iter([{"created": ["p1"]}, None])
+
+    def run():
+        result = next(outcomes)
+        if result is None:
+            raise RuntimeError("database unavailable")
+        return result
+
+    task = PeriodicTask("test-task", interval=60, fn=run)
+    task.run_once()
+    task.run_once()
+
+    stats = task.metrics()
+    assert (stats["runs"], stats["failures"], stats["last_result"]) == (2, 1, {"created": ["p1"]})
+
+
+def test_partition_manager_skips_runs_another_worker_holds(monkeypatch):
+    """Tests that a run is skipped, without opening a session, while another worker holds the job lock."""
+    # Arrange
+    names = []
+
+    @contextmanager
+    def lock_held_elsewhere(engine, name):
+        names.append(name)
+        yield False
+
+    def no_session():
+        raise AssertionError("opened a session without the job lock")
+
+    monkeypatch.setattr(partitions, "exclusive_run", lock_held_elsewhere)
+    monkeypatch.setattr(partitions, "SessionLocal", no_session)
+
+    # Act
+    result = maintain_partitions()
+
+    # Assert
+    assert result == {"skipped": "running in another worker"}
+    assert names == ["telemetry-partitions"]
@@ -0,0 +1,109 @@
+# backend/app/tests/modules/telemetry/test_retention.py
+
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy.orm import Session
+
+from app.models.device import Device, Telemetry, TelemetryDaily, TelemetryHourly
+from app.modules.auth.schemas import UserCreate
+from app.modules.auth.service import create_user
+from app.modules.telemetry import retention
+from app.modules.telemetry.retention import RetentionPolicy, apply_retention, load_policies, run_retention
+
+NOW = datetime(2026, 10, 18, 12, 0, tzinfo=timezone.utc)
+
+
+def create_device(db: Session, device_type: str = "APPLIANCE") -> Device:
+    user = create_user(db, UserCreate(email=f"retention_{uuid.uuid4()}@example.com", password="password"))
+    device = Device(name="Dryer", type=device_type, owner_id=user.id)
+    db.add(device)
+    db.commit()
+    return device
+
+
+def add_readings(db: Session, device: Device, start: datetime, hours: int) -> None:
+    # Raw rows only, as if they predate the rollups; retention must roll them up itself.
+    db.add_all([
+        Telemetry(device_id=device.id, timestamp=start + timedelta(minutes=15 * i), energy_usage=1)
+        for i in range(hours * 4)
+    ])
+    db.commit()
+
+
+def test_policies_validate_and_default_applies_to_unlisted_types():
+    """Tests that levels may not shrink and unknown device types fall back to the default policy."""
+    with pytest.raises(ValueError):
+        RetentionPolicy(raw=30, hourly=7)
+
+    policies = load_policies({"HVAC": {"raw": 90}})
+
+    assert policies["default"] == RetentionPolicy()
+    assert policies["HVAC"].cutoff("raw", NOW) == datetime(2026, 7, 20, tzinfo=timezone.utc)
+
+
+def test_expired_raw_data_is_downsampled_before_deletion(db_session: Session, monkeypatch):
+    """Tests that old raw rows are deleted in small batches only after their hours and days are rolled up."""
+    # Arrange
+    monkeypatch.setattr(retention.settings, "TELEMETRY_RETENTION_BATCH_SIZE", 10)
+    device = create_device(db_session)
+    add_readings(db_session, device, NOW - timedelta(days=3), hours=24)
+    add_readings(db_session, device, NOW - timedelta(hours=6), hours=2)
+
+    # Act
+    result = apply_retention(db_session, {"default": RetentionPolicy(raw=1)}, now=NOW)
+
+    # Assert
+    remaining = db_session.query(Telemetry).filter(Telemetry.device_id == device.id).count()
+    hourly = db_session.query(TelemetryHourly).filter(TelemetryHourly.device_id == device.id).all()
+    daily = db_session.query(TelemetryDaily).filter(TelemetryDaily.device_id == device.id).all()
+    assert result["raw"] == 96
+    assert remaining == 8
+    assert len(hourly) == 24 and all(row.sample_count == 4 for row in hourly)
+    assert sum(row.sample_count for row in daily) == 96
+
+
+def test_rollup_retention_per_device_type(db_session: Session):
+    """Tests that hourly rollups expire per device type and are folded into daily rows first."""
+    # Arrange
+    meter = create_device(db_session, "METER")
+    other = create_device(db_session)
+    for device in (meter, other):
+        add_readings(db_session, device, NOW - timedelta(days=10), hours=4)
+    policies = load_policies({"METER": {"raw": 2, "hourly": 5}, "default": {"raw": 2}})
+
+    # Act
+    result = apply_retention(db_session, policies, now=NOW)
+
+    # Assert
+    def count(model, device):
+        return db_session.query(model).filter(model.device_id == device.id).count()
+    assert (result["raw"], result["hourly"]) == (32, 4)
+    assert (count(TelemetryHourly, meter), count(TelemetryDaily, meter)) == (0, 1)
+    assert (count(TelemetryHourly, other), count(TelemetryDaily, other)) == (4, 1)
+
+
+def test_retention_job_skips_runs_another_worker_holds(monkeypatch):
+    """Tests that retention is not applied while another worker holds the job lock."""
+    # Arrange
+    names = []
+
+    @contextmanager
+    def lock_held_elsewhere(engine, name):
+        names.append(name)
+        yield False
+
+    def no_retention(db, policies):
+        raise AssertionError("applied retention without the job lock")
+
+    monkeypatch.setattr(retention, "exclusive_run", lock_held_elsewhere)
+    monkeypatch.setattr(retention, "apply_retention", no_retention)
+
+    # Act
+    result = run_retention()
+
+    # Assert
+    assert result == {"skipped": "running in another worker"}
+    assert names == ["telemetry-retention"]
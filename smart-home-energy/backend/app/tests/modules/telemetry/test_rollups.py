@@ -0,0 +1,164 @@
+# backend/app/tests/modules/telemetry/test_rollups.py
+
+import uuid
+from datetime import datetime, timezone, timedelta
+from fastapi.testclient import TestClient
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import Session
+
+from app.core.sql import date_trunc
+from app.models.device import Device, Telemetry, TelemetryDaily, TelemetryHourly
+from app.modules.auth.schemas import UserCreate
+from app.modules.auth.service import create_user
+from app.modules.conversational_ai.executable import StructuredExecutable
+from app.modules.telemetry import rollups, series, service
+from app.modules.telemetry.schemas import Resolution
+
+
+def create_device(db: Session, name: str = "Boiler") -> Device:
+    user = create_user(db, UserCreate(email=f"rollup_{uuid.uuid4()}@example.com", password="password"))
+    device = Device(name=name, owner_id=user.id)
+    db.add(device)
+    db.commit()
+    return device
+
+
+def test_plan_segments_uses_coarsest_rollup_and_raw_edges():
+    """Tests that whole days/hours come from rollups and only ragged edges hit raw rows."""
+    start = datetime(2025, 1, 1, 10, 30, tzinfo=timezone.utc)
+    end = datetime(2025, 1, 4, 5, 15, tzinfo=timezone.utc)
+
+    plan = rollups.plan_segments(start, end, "day")
+
+    assert plan == [
+        ("raw", start, datetime(2025, 1, 1, 11, tzinfo=timezone.utc)),
+        ("hour", datetime(2025, 1, 1, 11, tzinfo=timezone.utc), datetime(2025, 1, 2, tzinfo=timezone.utc)),
+        ("day", datetime(2025, 1, 2, tzinfo=timezone.utc), datetime(2025, 1, 4, tzinfo=timezone.utc)),
+        ("hour", datetime(2025, 1, 4, tzinfo=timezone.utc), datetime(2025, 1, 4, 5, tzinfo=timezone.utc)),
+        ("raw", datetime(2025, 1, 4, 5, tzinfo=timezone.utc), end),
+    ]
+    assert rollups.plan_segments(start, end, "minute") == [("raw", start, end)]
+
+
+def test_date_trunc_truncates_in_utc_on_postgres():
+    """Tests that rollup buckets computed in SQL do not depend on the session's TimeZone."""
+    # Act
+    sql = str(date_trunc("day", Telemetry.__table__.c.timestamp).compile(dialect=postgresql.dialect()))
+
+    # Assert
+    assert sql == "date_trunc('day', telemetry.timestamp, 'UTC')"
+
+
+def test_ingest_maintains_rollups_and_aggregates_match_raw(db_session: Session):
+    """Tests that ingestion refreshes affected buckets and rollup reads equal raw aggregation."""
+    # Arrange: one reading every 20 minutes for two days
+    device = create_device(db_session)
+    start = datetime(2025, 5, 1, tzinfo=timezone.utc)
+    rows = [
+        {"device_id": device.id, "timestamp": start + timedelta(minutes=20 * i), "energy_usage": float(i % 7)}
+        for i in range(144)
+    ]
+
+    # Act
+    service.upsert_telemetry(db_session, rows)
+    db_session.commit()
+
+    # Assert: rollup tables hold exact per-bucket aggregates
+    hourly = db_session.query(TelemetryHourly).filter(TelemetryHourly.device_id == device.id).all()
+    daily = db_session.query(TelemetryDaily).filter(TelemetryDaily.device_id == device.id).all()
+    assert len(hourly) == 48
+    assert len(daily) == 2
+    assert sum(h.sample_count for h in hourly) == 144
+    assert float(sum(d.total_energy for d in daily)) == sum(r["energy_usage"] for r in rows)
+
+    # Assert: a ragged range served from rollups plus raw edges matches a raw-only sum
+    lo, hi = start + timedelta(hours=5, minutes=10), start + timedelta(days=1, hours=20, minutes=50)
+    expected = sum(r["energy_usage"] for r in rows if lo <= r["timestamp"] < hi)
+    buckets = rollups.aggregate_buckets(db_session, [device.id], lo, hi, "day")
+    assert float(sum(b.total_energy for b in buckets)) == expected
+
+    # Assert: overwriting a reading is reflected in its buckets
+    service.upsert_telemetry(db_session, [{**rows[0], "energy_usage": 100.0}], policy="overwrite")
+    db_session.commit()
+    first_hour = db_session.get(TelemetryHourly, (device.id, start))
+    assert float(first_hour.total_energy) == 100.0 + 1.0 + 2.0
+    assert float(first_hour.max_energy) == 100.0
+
+
+def test_separate_ingests_add_deltas_and_conflicts_recompute(db_session: Session):
+    """Tests that new readings accumulate into existing buckets and summed conflicts keep min/max exact."""
+    # Arrange
+    device = create_device(db_session, "Heat Pump")
+    hour = datetime(2025, 5, 2, 7, tzinfo=timezone.utc)
+    first = [{"device_id": device.id, "timestamp": hour + timedelta(minutes=m), "energy_usage": 2.0} for m in (0, 15)]
+    second = [{"device_id": device.id, "timestamp": hour + timedelta(minutes=m), "energy_usage": 5.0} for m in (15, 30)]
+
+    # Act
+    service.upsert_telemetry(db_session, first)
+    db_session.commit()
+    service.upsert_telemetry(db_session, second, policy="sum")
+    db_session.commit()
+
+    # Assert: 2 + (2 + 5) + 5 over three readings, min still the untouched first one
+    for rollup in (db_session.get(TelemetryHourly, (device.id, hour)), db_session.get(TelemetryDaily, (device.id, datetime(2025, 5, 2, tzinfo=timezone.utc)))):
+        db_session.refresh(rollup)
+        assert float(rollup.total_energy) == 14.0
+        assert rollup.sample_count == 3
+        assert (float(rollup.min_energy), float(rollup.max_energy)) == (2.0, 7.0)
+
+
+def test_compaction_recomputes_recently_written_buckets(db_session: Session):
+    """Tests that the compactor restores exact values in a bucket that drifted from raw telemetry."""
+    # Arrange
+    device = create_device(db_session, "Dryer")
+    hour = datetime(2025, 5, 3, 12, tzinfo=timezone.utc)
+    before = datetime.now(timezone.utc) - timedelta(seconds=1)
+    service.upsert_telemetry(db_session, [{"device_id": device.id, "timestamp": hour, "energy_usage": 4.0}])
+    db_session.commit()
+    drifted = db_session.get(TelemetryHourly, (device.id, hour))
+    drifted.total_energy, drifted.sample_count = 40.0, 9
+    db_session.commit()
+
+    # Act
+    checked = rollups.compact_rollups(db_session, before)
+    db_session.commit()
+
+    # Assert
+    db_session.refresh(drifted)
+    assert checked >= 1
+    assert (float(drifted.total_energy), drifted.sample_count) == (4.0, 1)
+
+
+def test_structured_executable_reads_from_rollups(db_session: Session):
+    """Tests that SUM/AVG/MIN/MAX over an inclusive range are computed from rollup buckets."""
+    device = create_device(db_session, "Pool Pump")
+    start = datetime(2025, 6, 1, tzinfo=timezone.utc)
+    rows = [
+        {"device_id": device.id, "timestamp": start + timedelta(hours=i), "energy_usage": float(i + 1)}
+        for i in range(30)
+    ]
+    service.upsert_telemetry(db_session, rows)
+    db_session.commit()
+    db_session.refresh(device)
+
+    def run(metric: str):
+        query = StructuredExecutable(metric=metric, device_ids=[device.id], time_start=start, time_end=start + timedelta(hours=29))
+        return query.execute(db_session, device.owner)["value"]
+
+    assert run("SUM") == sum(range(1, 31))
+    assert run("AVG") == sum(range(1, 31)) / 30
+    assert run("MIN") == 1.0
+    assert run("MAX") == 30.0
+
+
+def test_series_buckets_align_weeks_and_months():
+    """Tests calendar-aware bucket alignment used by ranged stats queries."""
+    ts = datetime(2025, 12, 17, 15, 42, tzinfo=timezone.utc)  # a Wednesday
+
+    assert series.floor_bucket(ts, Resolution.FIFTEEN_MINUTES) == datetime(2025, 12, 17, 15, 30, tzinfo=timezone.utc)
+    assert series.floor_bucket(ts, Resolution.ONE_WEEK) == datetime(2025, 12, 15, tzinfo=timezone.utc)
+    assert list(series.iter_buckets(ts, ts + timedelta(days=40), Resolution.ONE_MONTH)) == [
+        datetime(2025, 12, 1, tzinfo=timezone.utc),
+        datetime(2026, 1, 1, tzinfo=timezone.utc),
+    ]
+    assert series.choose_resolution(ts, ts + timedelta(days=30), max_points=100) == Resolution.ONE_DAY
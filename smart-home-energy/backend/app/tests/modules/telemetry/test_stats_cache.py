@@ -0,0 +1,127 @@
+# backend/app/tests/modules/telemetry/test_stats_cache.py
+
+import time
+import uuid
+from datetime import datetime, timezone, timedelta
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.core.cache import TTLCache
+from app.core.db import Base
+from app.models.device import Device
+from app.modules.auth.schemas import UserCreate
+from app.modules.auth.service import create_user
+from app.modules.telemetry import schemas
+from app.modules.telemetry.stats_cache import InMemoryStatsCache, PostgresStatsCache, stats_cache
+
+
+def make_stats(device_id: uuid.UUID) -> schemas.DeviceStats:
+    return schemas.DeviceStats(device_id=device_id, time_window=schemas.TimeWindow.SIX_HOURS, data_points=[])
+
+
+def test_ttl_cache_evicts_least_recently_used_and_expires():
+    """Tests LRU eviction order, TTL expiry and the hit/miss/eviction counters."""
+    evicted = []
+    cache = TTLCache(max_entries=2, ttl_seconds=60, on_evict=lambda key, value: evicted.append(key))
+
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1  # "b" is now least recently used
+    cache.set("c", 3)
+    cache.set("short", 4, ttl_seconds=0.01)
+    time.sleep(0.02)
+
+    assert cache.get("b") is None
+    assert cache.get("short") is None
+    assert evicted == ["b", "a", "short"]
+    stats = cache.metrics()
+    assert (stats["hits"], stats["misses"], stats["evictions"], stats["expirations"]) == (1, 2, 2, 1)
+
+
+def test_device_stats_are_cached_until_window_is_ingested(client: TestClient, db_session: Session):
+    """Tests that repeated stats requests hit the cache and only in-window ingests invalidate it."""
+    # Arrange
+    user = create_user(db_session, UserCreate(email=f"cache_{uuid.uuid4()}@example.com", password="password"))
+    device = Device(name="Dryer", owner_id=user.id)
+    db_session.add(device)
+    db_session.commit()
+    login_response = client.post("/api/v1/auth/login", data={"username": user.email, "password": "password"})
+    headers = {"Authorization": f"Bearer {login_response.json()['access_token']}"}
+    url = f"/api/v1/devices/{device.id}/stats?time_window=6h"
+    now = datetime.now(timezone.utc)
+
+    def ingest(ts: datetime):
+        point = {"device_id": str(device.id), "timestamp": ts.isoformat(), "energy_usage": 2.0}
+        client.post("/api/v1/telemetry/batch", headers=headers, json={"points": [point]})
+
+    def total() -> float:
+        return sum(p["total_energy"] for p in client.get(url, headers=headers).json()["data_points"])
+
+    # Act / Assert: the second read is served from the cache
+    ingest(now - timedelta(hours=1))
+    assert total() == 2.0
+    hits = stats_cache.metrics()["hits"]
+    assert total() == 2.0
+    assert stats_cache.metrics()["hits"] == hits + 1
+
+    # A reading long before the window leaves the entry alone
+    ingest(now - timedelta(days=30))
+    assert total() == 2.0
+    assert stats_cache.metrics()["hits"] == hits + 2
+
+    # A reading inside the window invalidates it
+    ingest(now - timedelta(minutes=5))
+    assert total() == 4.0
+
+
+def test_postgres_backend_shares_entries_and_invalidates_by_window():
+    """Tests the table-backed backend: round trip, window-scoped invalidation and LRU trimming."""
+    # Arrange: a private database so the backend's own sessions can commit
+    engine = create_engine("sqlite:///:memory:", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    cache = PostgresStatsCache(max_entries=1, ttl_seconds=60, session_factory=sessionmaker(bind=engine))
+    device_id = uuid.uuid4()
+    start = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+    # Act
+    generation = cache.generation(device_id)
+    cache.set("closed", device_id, start, start + timedelta(hours=6), make_stats(device_id), generation)
+    cache.set("open", device_id, start, None, make_stats(device_id), generation)
+
+    # Assert
+    assert cache.get("closed") == make_stats(device_id)
+    assert cache.invalidate(device_id, start + timedelta(days=1), start + timedelta(days=1)) == 1
+    assert cache.get("closed") is not None
+    assert cache.get("open") is None
+
+    cache.set("open", device_id, start, None, make_stats(device_id), cache.generation(device_id))
+    cache.trim()
+    assert cache.metrics()["size"] == 1
+    assert cache.get("open") is not None
+
+
+def test_responses_invalidated_during_computation_are_not_cached():
+    """Tests that a set carrying a generation from before an invalidation is skipped by both backends."""
+    # Arrange
+    engine = create_engine("sqlite:///:memory:", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    backends = [
+        InMemoryStatsCache(max_entries=10, ttl_seconds=60),
+        PostgresStatsCache(max_entries=10, ttl_seconds=60, session_factory=sessionmaker(bind=engine)),
+    ]
+    device_id = uuid.uuid4()
+    start = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+    for cache in backends:
+        # Act: a reader notes the generation, an ingest commits, then the reader stores its result
+        before = cache.generation(device_id)
+        cache.invalidate(device_id, start, start)
+        cache.set("stale", device_id, start, None, make_stats(device_id), before)
+        cache.set("fresh", device_id, start, None, make_stats(device_id), cache.generation(device_id))
+
+        # Assert
+        assert cache.get("stale") is None
+        assert cache.get("fresh") is not None
+        assert cache.metrics()["stale_sets"] == 1
@@ -0,0 +1,144 @@
+# backend/app/tests/modules/telemetry/test_stats_deltas.py
+
+import base64
+import uuid
+from datetime import datetime, timedelta, timezone
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.device import Device
+from app.modules.auth.schemas import UserCreate
+from app.modules.auth.service import create_user
+from app.modules.telemetry import deltas, rollups, service
+
+
+def create_device_and_login(client: TestClient, db: Session) -> tuple[Device, dict]:
+    user = create_user(db, UserCreate(email=f"poller_{uuid.uuid4()}@example.com", password="password"))
+    login_response = client.post("/api/v1/auth/login", data={"username": user.email, "password": "password"})
+    device = Device(name="Dryer", owner_id=user.id)
+    db.add(device)
+    db.commit()
+    return device, {"Authorization": f"Bearer {login_response.json()['access_token']}"}
+
+
+def ingest(db: Session, device_id: uuid.UUID, *timestamps: datetime, value: float = 1.0) -> None:
+    service.upsert_telemetry(db, [{"device_id": device_id, "timestamp": ts, "energy_usage": value} for ts in timestamps])
+    db.commit()
+
+
+def test_watermark_round_trip_and_rejects_garbage():
+    """Tests that watermarks decode to the instant they encode and nothing else decodes."""
+    # Arrange
+    instant = datetime(2025, 7, 1, 12, 30, 15, 123456, tzinfo=timezone.utc)
+
+    # Act
+    token = deltas.encode_watermark(instant)
+
+    # Assert
+    assert deltas.decode_watermark(token) == instant
+    other_version = base64.urlsafe_b64encode(b"w0:1751373015123456").decode()
+    for garbage in ("", "not-a-watermark", other_version):
+        with pytest.raises(ValueError):
+            deltas.decode_watermark(garbage)
+
+
+def test_changed_hours_map_to_whole_response_buckets():
+    """Tests that changed hours become runs of whole buckets, coarser or finer than an hour."""
+    # Arrange
+    day = datetime(2025, 7, 1, tzinfo=timezone.utc)
+    hours = [day + timedelta(hours=3), day + timedelta(hours=4), day + timedelta(days=2, hours=23)]
+    start, end = day, day + timedelta(days=7)
+
+    # Act
+    daily = deltas.changed_ranges(hours, lambda ts: rollups.floor_time(ts, "day"), lambda b: b + timedelta(days=1), start, end)
+    minutes = deltas.changed_ranges(hours, lambda ts: rollups.floor_time(ts, "minute"), lambda b: b + timedelta(minutes=1), start, end)
+
+    # Assert
+    assert daily == [(day, day + timedelta(days=1)), (day + timedelta(days=2), day + timedelta(days=3))]
+    assert minutes == [
+        (day + timedelta(hours=3), day + timedelta(hours=5)),
+        (day + timedelta(days=2, hours=23), day + timedelta(days=3)),
+    ]
+
+
+def test_since_returns_only_changed_buckets(client: TestClient, db_session: Session, monkeypatch):
+    """Tests that a delta request recomputes and returns just the buckets written after the watermark."""
+    # Arrange: a day of hourly data, fetched once in full
+    monkeypatch.setattr(settings, "STATS_WATERMARK_GRACE_SECONDS", 0)
+    device, headers = create_device_and_login(client, db_session)
+    day = datetime(2025, 7, 1, tzinfo=timezone.utc)
+    ingest(db_session, device.id, *(day + timedelta(hours=h, minutes=10) for h in range(24)))
+    params = {"start": day.isoformat(), "end": (day + timedelta(days=1)).isoformat(), "resolution": "1h"}
+    full = client.get(f"/api/v1/devices/{device.id}/stats", params=params, headers=headers).json()
+
+    # Act: one new reading in hour 5
+    ingest(db_session, device.id, day + timedelta(hours=5, minutes=40), value=2.5)
+    delta = client.get(
+        f"/api/v1/devices/{device.id}/stats", params={**params, "since": full["watermark"]}, headers=headers
+    ).json()
+
+    # Assert
+    assert len(full["data_points"]) == 24 and not full["delta"]
+    assert delta["delta"] is True
+    assert [(p["timestamp"], p["total_energy"]) for p in delta["data_points"]] == [("2025-07-01T05:00:00Z", 3.5)]
+    assert delta["watermark"] != full["watermark"]
+
+
+def test_preset_window_delta_is_empty_without_new_data(client: TestClient, db_session: Session, monkeypatch):
+    """Tests the delta of a preset window before and after a new reading."""
+    # Arrange
+    monkeypatch.setattr(settings, "STATS_WATERMARK_GRACE_SECONDS", 0)
+    device, headers = create_device_and_login(client, db_session)
+    now = datetime.now(timezone.utc)
+    ingest(db_session, device.id, now - timedelta(hours=3))
+    url = f"/api/v1/devices/{device.id}/stats"
+    full = client.get(url, params={"time_window": "12h"}, headers=headers).json()
+
+    # Act
+    unchanged = client.get(url, params={"time_window": "12h", "since": full["watermark"]}, headers=headers).json()
+    ingest(db_session, device.id, now - timedelta(minutes=1), value=4.0)
+    changed = client.get(url, params={"time_window": "12h", "since": full["watermark"]}, headers=headers).json()
+
+    # Assert
+    assert len(full["data_points"]) == 1
+    assert unchanged["data_points"] == [] and unchanged["delta"]
+    assert [p["total_energy"] for p in changed["data_points"]] == [4.0]
+
+
+def test_etag_answers_304_until_data_changes(client: TestClient, db_session: Session):
+    """Tests If-None-Match revalidation against writes to the range."""
+    # Arrange
+    device, headers = create_device_and_login(client, db_session)
+    day = datetime(2025, 7, 2, tzinfo=timezone.utc)
+    ingest(db_session, device.id, day + timedelta(hours=1))
+    url = f"/api/v1/devices/{device.id}/stats"
+    params = {"start": day.isoformat(), "end": (day + timedelta(days=1)).isoformat(), "resolution": "1h"}
+    first = client.get(url, params=params, headers=headers)
+    etag = first.headers["ETag"]
+
+    # Act
+    revalidated = client.get(url, params=params, headers={**headers, "If-None-Match": etag})
+    other_shape = client.get(url, params={**params, "fill": "null"}, headers={**headers, "If-None-Match": etag})
+    ingest(db_session, device.id, day + timedelta(hours=2))
+    after_write = client.get(url, params=params, headers={**headers, "If-None-Match": etag})
+
+    # Assert
+    assert revalidated.status_code == 304 and revalidated.content == b""
+    assert revalidated.headers["ETag"] == etag
+    assert other_shape.status_code == 200
+    assert after_write.status_code == 200
+    assert after_write.headers["ETag"] != etag
+
+
+def test_invalid_since_is_rejected(client: TestClient, db_session: Session):
+    """Tests that a since value that is not a watermark is a 422."""
+    # Arrange
+    device, headers = create_device_and_login(client, db_session)
+
+    # Act
+    response = client.get(f"/api/v1/devices/{device.id}/stats", params={"time_window": "6h", "since": "yesterday"}, headers=headers)
+
+    # Assert
+    assert response.status_code == 422
@@ -1,16 +1,20 @@
 # backend/app/tests/modules/telemetry/test_telemetry_endpoints.py
 
 # --- All imports at the top ---
+import json
 import uuid
 from datetime import datetime, timezone, timedelta
 from fastapi.testclient import TestClient
 from sqlalchemy.orm import Session
 
+from app.core.config import settings
+
 # --- Import all necessary models ---
 from app.models.device import Device, Telemetry
 from app.models.user import User
 from app.modules.auth.schemas import UserCreate
 from app.modules.auth.service import create_user
+from app.modules.telemetry import encoding
 
 
 # --- Helper functions ---
@@ -117,3 +121,313 @@ def test_list_user_devices(client: TestClient, db_session: Session):
     data = response.json()
     assert len(data) == 2
     assert data[0]["owner_id"] == str(user_one.id)
+
+
+def test_submit_telemetry_batch_reports_per_device(client: TestClient, db_session: Session):
+    """Tests that a batch is written in one go and unowned devices are rejected per device."""
+    # Arrange
+    user_one = create_test_user(db_session)
+    user_two = create_test_user(db_session)
+    owned_a = Device(name="Kettle", owner_id=user_one.id)
+    owned_b = Device(name="Oven", owner_id=user_one.id)
+    unowned = Device(name="Neighbour's Dryer", owner_id=user_two.id)
+    db_session.add_all([owned_a, owned_b, unowned])
+    db_session.commit()
+    login_response = client.post("/api/v1/auth/login", data={"username": user_one.email, "password": "password"})
+    headers = {"Authorization": f"Bearer {login_response.json()['access_token']}"}
+    start = datetime.now(timezone.utc) - timedelta(hours=1)
+    points = [
+        {"device_id": str(device.id), "timestamp": (start + timedelta(minutes=i)).isoformat(), "energy_usage": 1.5}
+        for device in (owned_a, owned_b, unowned) for i in range(3)
+    ]
+
+    # Act
+    response = client.post("/api/v1/telemetry/batch", headers=headers, json={"points": points})
+
+    # Assert
+    assert response.status_code == 200
+    data = response.json()
+    assert data["accepted"] == 6
+    assert data["rejected"] == 3
+    per_device = {d["device_id"]: (d["accepted"], d["rejected"]) for d in data["devices"]}
+    assert per_device[str(owned_a.id)] == (3, 0)
+    assert per_device[str(unowned.id)] == (0, 3)
+    stored = db_session.query(Telemetry).filter(Telemetry.device_id.in_([owned_a.id, owned_b.id])).count()
+    assert stored == 6
+
+
+def test_upload_telemetry_ndjson_stream(client: TestClient, db_session: Session):
+    """Tests that a chunked NDJSON body is ingested and unowned devices are rejected."""
+    # Arrange
+    user_one = create_test_user(db_session)
+    user_two = create_test_user(db_session)
+    owned = Device(name="Heat Pump", owner_id=user_one.id)
+    unowned = Device(name="Other Heat Pump", owner_id=user_two.id)
+    db_session.add_all([owned, unowned])
+    db_session.commit()
+    login_response = client.post("/api/v1/auth/login", data={"username": user_one.email, "password": "password"})
+    headers = {"Authorization": f"Bearer {login_response.json()['access_token']}", "Content-Type": "application/x-ndjson"}
+    start = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    lines = [
+        f'{{"device_id": "{device.id}", "timestamp": "{(start + timedelta(minutes=i)).isoformat()}", "energy_usage": 2.0}}\n'
+        for device in (owned, unowned) for i in range(4)
+    ]
+    body = "".join(lines).encode()
+
+    # Act: send the body in small chunks that split lines mid-way
+    response = client.post(
+        "/api/v1/telemetry/upload",
+        headers=headers,
+        content=(body[i:i + 37] for i in range(0, len(body), 37)),
+    )
+
+    # Assert
+    assert response.status_code == 200
+    data = response.json()
+    assert data["accepted"] == 4
+    assert data["rejected"] == 4
+    assert data["rows_committed"] == 8
+    assert data["bytes_committed"] == len(body)
+    assert db_session.query(Telemetry).filter(Telemetry.device_id == owned.id).count() == 4
+
+
+def test_upload_telemetry_csv_resume_after_bad_row(client: TestClient, db_session: Session):
+    """Tests that a malformed CSV row reports resumable offsets and skip_rows resumes past it."""
+    # Arrange
+    user = create_test_user(db_session)
+    device = Device(name="Dishwasher", owner_id=user.id)
+    db_session.add(device)
+    db_session.commit()
+    login_response = client.post("/api/v1/auth/login", data={"username": user.email, "password": "password"})
+    headers = {"Authorization": f"Bearer {login_response.json()['access_token']}", "Content-Type": "text/csv"}
+    start = datetime(2025, 2, 1, tzinfo=timezone.utc)
+    rows = [f"{device.id},{(start + timedelta(minutes=i)).isoformat()},1.25\n" for i in range(5)]
+    rows[2] = f"{device.id},not-a-timestamp,1.25\n"
+    body = ("device_id,timestamp,energy_usage\n" + "".join(rows)).encode()
+
+    # Act
+    failed = client.post("/api/v1/telemetry/upload", headers=headers, content=body)
+
+    # Assert: the two rows before the bad one are committed
+    assert failed.status_code == 422
+    detail = failed.json()["detail"]
+    assert detail["row"] == 3
+    assert detail["accepted"] == 2
+    assert detail["rows_committed"] == 2
+
+    # Act: fix the row and resume by row offset
+    rows[2] = f"{device.id},{(start + timedelta(minutes=2)).isoformat()},1.25\n"
+    body = ("device_id,timestamp,energy_usage\n" + "".join(rows)).encode()
+    resumed = client.post(f"/api/v1/telemetry/upload?skip_rows={detail['rows_committed']}", headers=headers, content=body)
+
+    # Assert
+    assert resumed.status_code == 200
+    assert resumed.json()["accepted"] == 3
+    assert db_session.query(Telemetry).filter(Telemetry.device_id == device.id).count() == 5
+
+
+def test_submit_telemetry_batch_is_idempotent(client: TestClient, db_session: Session, monkeypatch):
+    """Tests that redelivered points are resolved by the conflict policy instead of failing."""
+    # Arrange
+    user = create_test_user(db_session)
+    device = Device(name="Water Heater", owner_id=user.id)
+    db_session.add(device)
+    db_session.commit()
+    login_response = client.post("/api/v1/auth/login", data={"username": user.email, "password": "password"})
+    headers = {"Authorization": f"Bearer {login_response.json()['access_token']}"}
+    timestamp = datetime(2025, 3, 1, 12, 0, tzinfo=timezone.utc).isoformat()
+    point = {"device_id": str(device.id), "timestamp": timestamp, "energy_usage": 2.0}
+
+    def stored_value() -> float:
+        db_session.expire_all()
+        return float(db_session.query(Telemetry.energy_usage).filter(Telemetry.device_id == device.id).scalar())
+
+    # Act & Assert: the default "ignore" policy keeps the first value, even within one batch
+    first = client.post("/api/v1/telemetry/batch", headers=headers, json={"points": [point, {**point, "energy_usage": 9.0}]})
+    retry = client.post("/api/v1/telemetry/batch", headers=headers, json={"points": [point]})
+    assert first.status_code == 200
+    assert retry.status_code == 200
+    assert stored_value() == 2.0
+
+    # Act & Assert: "sum" adds redelivered values, "overwrite" replaces them
+    monkeypatch.setattr(settings, "TELEMETRY_CONFLICT_POLICY", "sum")
+    client.post("/api/v1/telemetry/batch", headers=headers, json={"points": [point, point]})
+    assert stored_value() == 6.0
+    monkeypatch.setattr(settings, "TELEMETRY_CONFLICT_POLICY", "overwrite")
+    client.post("/api/v1/telemetry/batch", headers=headers, json={"points": [{**point, "energy_usage": 1.0}]})
+    assert stored_value() == 1.0
+
+
+def test_get_device_stats_hourly_window(client: TestClient, db_session: Session):
+    """Tests that the 12h window returns hourly totals, newest first."""
+    # Arrange
+    user = create_test_user(db_session)
+    device = Device(name="Air Conditioner", owner_id=user.id)
+    db_session.add(device)
+    db_session.commit()
+    login_response = client.post("/api/v1/auth/login", data={"username": user.email, "password": "password"})
+    headers = {"Authorization": f"Bearer {login_response.json()['access_token']}"}
+    current_hour = datetime.now(timezone.utc).replace(minute=0, second=0, microsecond=0)
+    points = [
+        {"device_id": str(device.id), "timestamp": (current_hour - timedelta(hours=h, minutes=m)).isoformat(), "energy_usage": 1.0}
+        for h in (2, 4) for m in (10, 20, 30)
+    ]
+    client.post("/api/v1/telemetry/batch", headers=headers, json={"points": points})
+
+    # Act
+    response = client.get(f"/api/v1/devices/{device.id}/stats?time_window=12h", headers=headers)
+
+    # Assert
+    assert response.status_code == 200
+    data_points = response.json()["data_points"]
+    assert [p["total_energy"] for p in data_points] == [3.0, 3.0]
+    assert data_points[0]["label"] == (current_hour - timedelta(hours=3)).strftime("%H:00")
+
+
+def test_get_device_stats_range_fills_gaps_in_order(client: TestClient, db_session: Session):
+    """Tests that a ranged query returns every bucket oldest first, with empty buckets filled."""
+    # Arrange
+    user = create_test_user(db_session)
+    device = Device(name="Heat Pump", owner_id=user.id)
+    db_session.add(device)
+    db_session.commit()
+    login_response = client.post("/api/v1/auth/login", data={"username": user.email, "password": "password"})
+    headers = {"Authorization": f"Bearer {login_response.json()['access_token']}"}
+    start = datetime(2025, 3, 1, tzinfo=timezone.utc)
+    points = [
+        {"device_id": str(device.id), "timestamp": (start + timedelta(minutes=m)).isoformat(), "energy_usage": 1.0}
+        for m in (5, 10, 130)
+    ]
+    client.post("/api/v1/telemetry/batch", headers=headers, json={"points": points})
+    params = {"start": start.isoformat(), "end": (start + timedelta(hours=4)).isoformat(), "resolution": "1h"}
+
+    # Act
+    zero_filled = client.get(f"/api/v1/devices/{device.id}/stats", headers=headers, params=params)
+    null_filled = client.get(f"/api/v1/devices/{device.id}/stats", headers=headers, params={**params, "fill": "null"})
+
+    # Assert
+    assert zero_filled.status_code == 200
+    assert [p["total_energy"] for p in zero_filled.json()["data_points"]] == [2.0, 0.0, 1.0, 0.0]
+    assert [p["label"] for p in zero_filled.json()["data_points"]] == ["00:00", "01:00", "02:00", "03:00"]
+    assert [p["total_energy"] for p in null_filled.json()["data_points"]] == [2.0, None, 1.0, None]
+
+
+def test_get_device_stats_range_coarsens_to_points_cap(client: TestClient, db_session: Session):
+    """Tests that a resolution exceeding max_points is replaced by the finest one that fits."""
+    # Arrange
+    user = create_test_user(db_session)
+    device = Device(name="EV Charger", owner_id=user.id)
+    db_session.add(device)
+    db_session.commit()
+    login_response = client.post("/api/v1/auth/login", data={"username": user.email, "password": "password"})
+    headers = {"Authorization": f"Bearer {login_response.json()['access_token']}"}
+    start = datetime(2025, 3, 1, tzinfo=timezone.utc)
+    client.post("/api/v1/telemetry/batch", headers=headers, json={"points": [
+        {"device_id": str(device.id), "timestamp": (start + timedelta(hours=h)).isoformat(), "energy_usage": 1.0}
+        for h in range(48)
+    ]})
+    params = {"start": start.isoformat(), "end": (start + timedelta(days=2)).isoformat(), "resolution": "1m", "max_points": 10}
+
+    # Act
+    response = client.get(f"/api/v1/devices/{device.id}/stats", headers=headers, params=params)
+
+    # Assert: 48 hourly buckets exceed the cap, 8 six-hour buckets fit
+    assert response.status_code == 200
+    body = response.json()
+    assert body["resolution"] == "6h"
+    assert [p["total_energy"] for p in body["data_points"]] == [6.0] * 8
+
+
+def test_get_multi_device_stats_returns_series_and_home_total(client: TestClient, db_session: Session):
+    """Tests per-device series and the home total, and that foreign devices are refused."""
+    # Arrange
+    user = create_test_user(db_session)
+    other_user = create_test_user(db_session)
+    washer = Device(name="Washer", owner_id=user.id)
+    oven = Device(name="Oven", owner_id=user.id)
+    foreign = Device(name="Neighbour's Oven", owner_id=other_user.id)
+    db_session.add_all([washer, oven, foreign])
+    db_session.commit()
+    login_response = client.post("/api/v1/auth/login", data={"username": user.email, "password": "password"})
+    headers = {"Authorization": f"Bearer {login_response.json()['access_token']}"}
+    start = datetime(2025, 4, 1, tzinfo=timezone.utc)
+    client.post("/api/v1/telemetry/batch", headers=headers, json={"points": [
+        {"device_id": str(washer.id), "timestamp": (start + timedelta(hours=1)).isoformat(), "energy_usage": 2.0},
+        {"device_id": str(oven.id), "timestamp": (start + timedelta(hours=1)).isoformat(), "energy_usage": 3.0},
+        {"device_id": str(oven.id), "timestamp": (start + timedelta(hours=2)).isoformat(), "energy_usage": 4.0},
+    ]})
+    params = {"start": start.isoformat(), "end": (start + timedelta(hours=3)).isoformat(), "resolution": "1h"}
+
+    # Act
+    all_devices = client.get("/api/v1/devices/stats", headers=headers, params=params)
+    forbidden = client.get("/api/v1/devices/stats", headers=headers, params={**params, "device_ids": f"{washer.id},{foreign.id}"})
+
+    # Assert
+    assert all_devices.status_code == 200
+    body = all_devices.json()
+    assert [(d["name"], [p["total_energy"] for p in d["data_points"]]) for d in body["devices"]] == [
+        ("Oven", [0.0, 3.0, 4.0]),
+        ("Washer", [0.0, 2.0, 0.0]),
+    ]
+    assert [p["total_energy"] for p in body["total"]] == [0.0, 5.0, 4.0]
+    assert forbidden.status_code == 404
+
+
+def test_get_device_stats_columnar_and_packed_formats(client: TestClient, db_session: Session):
+    """Tests that the same series can be negotiated as columnar JSON or packed binary."""
+    # Arrange
+    user = create_test_user(db_session)
+    device = Device(name="Freezer", owner_id=user.id)
+    db_session.add(device)
+    db_session.commit()
+    login_response = client.post("/api/v1/auth/login", data={"username": user.email, "password": "password"})
+    headers = {"Authorization": f"Bearer {login_response.json()['access_token']}"}
+    start = datetime(2025, 6, 1, tzinfo=timezone.utc)
+    client.post("/api/v1/telemetry/batch", headers=headers, json={"points": [
+        {"device_id": str(device.id), "timestamp": (start + timedelta(minutes=1)).isoformat(), "energy_usage": 2.5},
+    ]})
+    url = f"/api/v1/devices/{device.id}/stats"
+    params = {"start": start.isoformat(), "end": (start + timedelta(minutes=3)).isoformat(), "resolution": "1m", "fill": "null"}
+
+    # Act
+    columnar = client.get(url, headers={**headers, "Accept": encoding.COLUMNAR_MEDIA_TYPE}, params=params)
+    packed = client.get(url, headers=headers, params={**params, "format": "packed"})
+
+    # Assert
+    expected_timestamps = [int((start + timedelta(minutes=m)).timestamp() * 1000) for m in range(3)]
+    assert columnar.headers["content-type"] == encoding.COLUMNAR_MEDIA_TYPE
+    assert columnar.json()["timestamps"] == expected_timestamps
+    assert columnar.json()["values"] == [None, 2.5, None]
+    assert packed.headers["x-series-resolution"] == "1m"
+    assert encoding.unpack_series(packed.content) == (expected_timestamps, [[None, 2.5, None]])
+
+
+def test_export_device_telemetry_streams_csv_and_ndjson(client: TestClient, db_session: Session, monkeypatch):
+    """Tests that raw readings are exported in range, in order, and in the upload layout."""
+    # Arrange: a tiny cursor batch size so the export spans several chunks
+    monkeypatch.setattr(settings, "TELEMETRY_EXPORT_BATCH_SIZE", 2)
+    user = create_test_user(db_session)
+    device = Device(name="Kettle", owner_id=user.id)
+    db_session.add(device)
+    db_session.commit()
+    login_response = client.post("/api/v1/auth/login", data={"username": user.email, "password": "password"})
+    headers = {"Authorization": f"Bearer {login_response.json()['access_token']}"}
+    start = datetime(2025, 7, 1, tzinfo=timezone.utc)
+    client.post("/api/v1/telemetry/batch", headers=headers, json={"points": [
+        {"device_id": str(device.id), "timestamp": (start + timedelta(seconds=s)).isoformat(), "energy_usage": float(s)}
+        for s in range(6)
+    ]})
+    url = f"/api/v1/devices/{device.id}/telemetry/export"
+    params = {"start": (start + timedelta(seconds=1)).isoformat(), "end": (start + timedelta(seconds=5)).isoformat()}
+
+    # Act
+    ndjson = client.get(url, headers=headers, params=params)
+    csv = client.get(url, headers={**headers, "Accept": "text/csv"}, params=params)
+
+    # Assert
+    assert ndjson.status_code == 200
+    assert ndjson.headers["content-type"].startswith("application/x-ndjson")
+    assert [json.loads(line)["energy_usage"] for line in ndjson.text.splitlines()] == [1.0, 2.0, 3.0, 4.0]
+    csv_lines = csv.text.splitlines()
+    assert csv_lines[0] == "device_id,timestamp,energy_usage"
+    assert len(csv_lines) == 5
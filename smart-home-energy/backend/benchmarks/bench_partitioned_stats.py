@@ -0,0 +1,136 @@
+# backend/benchmarks/bench_partitioned_stats.py
+"""
+Compares stats queries on a plain telemetry heap against the same data in a
+monthly range-partitioned table, on the Postgres server in DATABASE_URL.
+
+    pipenv run python benchmarks/bench_partitioned_stats.py --devices 1000 --days 347
+
+1000 devices x 347 days of per-minute readings is ~500M rows per table; use
+smaller values for a quick run. Both tables live in a scratch schema
+(`bench_partitioning`) that is dropped afterwards unless --keep is given;
+reruns with --keep --reuse skip the load.
+
+Each query is run --repeat times and the median of the server-side execution
+time (EXPLAIN ANALYZE) is reported, together with the number of partitions the
+plan touched:
+  * raw 6h window of one device (the legacy /stats path for recent data)
+  * hourly buckets over 7 days for one device
+  * a month-old day for one device (what the conversational SUM/LIST read)
+  * deleting one day of the oldest data (what retention does)
+"""
+
+import argparse
+import os
+import re
+import statistics
+import sys
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.realpath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sqlalchemy import create_engine, text
+
+from app.core.config import settings
+
+SCHEMA = "bench_partitioning"
+
+QUERIES = {
+    "raw 6h window": (
+        'SELECT date_trunc(\'hour\', "timestamp"), sum(energy_usage) FROM {table} '
+        'WHERE device_id = :device AND "timestamp" >= :now - interval \'6 hours\' AND "timestamp" < :now GROUP BY 1'
+    ),
+    "hourly over 7d": (
+        'SELECT date_trunc(\'hour\', "timestamp"), sum(energy_usage) FROM {table} '
+        'WHERE device_id = :device AND "timestamp" >= :now - interval \'7 days\' AND "timestamp" < :now GROUP BY 1'
+    ),
+    "one day, a month ago": (
+        'SELECT sum(energy_usage), count(*) FROM {table} '
+        'WHERE device_id = :device AND "timestamp" >= :now - interval \'31 days\' AND "timestamp" < :now - interval \'30 days\''
+    ),
+    "delete oldest day": (
+        'DELETE FROM {table} WHERE "timestamp" >= :oldest AND "timestamp" < :oldest + interval \'1 day\''
+    ),
+}
+
+
+def load(conn, devices: int, days: int, now: datetime) -> datetime:
+    oldest = now - timedelta(days=days)
+    conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+    conn.execute(text(f"CREATE SCHEMA {SCHEMA}"))
+    columns = 'device_id UUID NOT NULL, "timestamp" TIMESTAMPTZ NOT NULL, energy_usage NUMERIC(10, 4) NOT NULL'
+    conn.execute(text(f'CREATE TABLE {SCHEMA}.plain ({columns}, PRIMARY KEY (device_id, "timestamp"))'))
+    conn.execute(text(
+        f'CREATE TABLE {SCHEMA}.partitioned ({columns}, PRIMARY KEY (device_id, "timestamp")) PARTITION BY RANGE ("timestamp")'
+    ))
+    month = oldest.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    while month <= now:
+        upper = month.replace(year=month.year + month.month // 12, month=month.month % 12 + 1)
+        conn.execute(text(
+            f"CREATE TABLE {SCHEMA}.partitioned_p{month:%Y%m} PARTITION OF {SCHEMA}.partitioned "
+            f"FOR VALUES FROM ('{month.isoformat()}') TO ('{upper.isoformat()}')"
+        ))
+        month = upper
+
+    # Load one day at a time so no single statement has to sort everything.
+    for day in range(days):
+        start = oldest + timedelta(days=day)
+        for table in ("plain", "partitioned"):
+            conn.execute(text(f"""
+                INSERT INTO {SCHEMA}.{table}
+                SELECT ('00000000-0000-0000-0000-' || lpad(to_hex(d), 12, '0'))::uuid, ts, (random() * 450)::numeric(10, 4)
+                FROM generate_series(1, :devices) d,
+                     generate_series(CAST(:start AS timestamptz), CAST(:start AS timestamptz) + interval '1 day' - interval '1 minute', interval '1 minute') ts
+            """), {"devices": devices, "start": start})
+        conn.commit()
+        print(f"\rloaded {day + 1}/{days} days", end="", flush=True)
+    print()
+    for table in ("plain", "partitioned"):
+        conn.execute(text(f"VACUUM ANALYZE {SCHEMA}.{table}"))
+    return oldest
+
+
+def measure(conn, sql: str, params: dict, repeat: int) -> tuple[float, int]:
+    timings, scanned = [], 0
+    for _ in range(repeat):
+        # Every run is rolled back, so the DELETE measures the same rows each time.
+        transaction = conn.begin()
+        plan = [row[0] for row in conn.execute(text(f"EXPLAIN (ANALYZE, TIMING OFF) {sql}"), params)]
+        transaction.rollback()
+        timings.append(float(re.search(r"Execution Time: ([\d.]+) ms", plan[-1]).group(1)))
+        scanned = sum(1 for line in plan if re.search(r"Scan .* on \w+", line))
+    return statistics.median(timings), scanned
+
+
+def main(args):
+    engine = create_engine(settings.DATABASE_URL, isolation_level="AUTOCOMMIT")
+    now = datetime.now(timezone.utc).replace(second=0, microsecond=0)
+    with engine.connect() as conn:
+        if args.reuse:
+            oldest = conn.execute(text(f'SELECT min("timestamp") FROM {SCHEMA}.plain')).scalar()
+            now = conn.execute(text(f'SELECT max("timestamp") FROM {SCHEMA}.plain')).scalar() + timedelta(minutes=1)
+        else:
+            oldest = load(conn, args.devices, args.days, now)
+        rows = conn.execute(text(f"SELECT count(*) FROM {SCHEMA}.plain")).scalar()
+        print(f"{rows:,} rows per table\n")
+
+    engine = create_engine(settings.DATABASE_URL)
+    params = {"device": "00000000-0000-0000-0000-000000000007", "now": now, "oldest": oldest}
+    print(f"{'query':<22} {'plain':>12} {'partitioned':>12}  partitions scanned")
+    with engine.connect() as conn:
+        for label, sql in QUERIES.items():
+            plain_ms, _ = measure(conn, sql.format(table=f"{SCHEMA}.plain"), params, args.repeat)
+            part_ms, scanned = measure(conn, sql.format(table=f"{SCHEMA}.partitioned"), params, args.repeat)
+            print(f"{label:<22} {plain_ms:10.1f}ms {part_ms:10.1f}ms  {scanned}")
+        if not args.keep:
+            conn.execute(text(f"DROP SCHEMA {SCHEMA} CASCADE"))
+            conn.commit()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--devices", type=int, default=1000)
+    parser.add_argument("--days", type=int, default=347)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--keep", action="store_true", help="keep the scratch schema for another run")
+    parser.add_argument("--reuse", action="store_true", help="measure an existing scratch schema without loading")
+    main(parser.parse_args())
@@ -0,0 +1,64 @@
+# backend/benchmarks/bench_series_encoding.py
+"""
+Compares the cost of encoding a stats series as per-point JSON (Pydantic
+models, as the default response does) against the columnar JSON and packed
+binary encodings, for 10k, 100k and 1M points.
+
+    pipenv run python benchmarks/bench_series_encoding.py
+"""
+
+import os
+import sys
+import time
+import uuid
+import random
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.realpath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.modules.telemetry import encoding, schemas
+
+SIZES = [int(size) for size in os.getenv("BENCH_SIZES", "10000,100000,1000000").split(",")]
+
+
+def make_points(count):
+    start = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    return [(start + timedelta(minutes=i), round(random.uniform(5.0, 450.0), 4)) for i in range(count)]
+
+
+def encode_models(device_id, points):
+    stats = schemas.DeviceStats(
+        device_id=device_id,
+        resolution=schemas.Resolution.ONE_MINUTE,
+        data_points=[
+            schemas.EnergyUsagePoint(timestamp=bucket, total_energy=total, label=bucket.strftime("%H:%M"))
+            for bucket, total in points
+        ],
+    )
+    return stats.model_dump_json().encode()
+
+
+def encode_columnar(device_id, points):
+    timestamps = encoding.epoch_millis(bucket for bucket, _ in points)
+    return encoding.columnar_response(timestamps, {"device_id": str(device_id), "values": [v for _, v in points]}).body
+
+
+def encode_packed(device_id, points):
+    timestamps = encoding.epoch_millis(bucket for bucket, _ in points)
+    return encoding.pack_series(timestamps, [[v for _, v in points]])
+
+
+def main():
+    device_id = uuid.uuid4()
+    print(f"{'points':>8} {'format':<10} {'seconds':>9} {'bytes':>12}")
+    for size in SIZES:
+        points = make_points(size)
+        for label, encoder in (("models", encode_models), ("columnar", encode_columnar), ("packed", encode_packed)):
+            started = time.perf_counter()
+            body = encoder(device_id, points)
+            elapsed = time.perf_counter() - started
+            print(f"{size:>8} {label:<10} {elapsed:9.3f} {len(body):>12}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+# backend/benchmarks/bench_telemetry_ingest.py
+"""
+Compares the per-point telemetry route against the batch route.
+
+Runs the API in-process against BENCH_DATABASE_URL (a throwaway SQLite file by
+default). Point it at a scratch Postgres database to get meaningful numbers:
+
+    BENCH_DATABASE_URL=postgresql://... pipenv run python benchmarks/bench_telemetry_ingest.py
+"""
+
+import os
+import sys
+import time
+import uuid
+import random
+import tempfile
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.realpath(os.path.join(os.path.dirname(__file__), '..')))
+
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.main import app
+from app.core.db import Base, get_db
+
+DATABASE_URL = os.getenv(
+    "BENCH_DATABASE_URL", f"sqlite:///{os.path.join(tempfile.gettempdir(), 'bench_ingest.db')}"
+)
+NUM_DEVICES = int(os.getenv("BENCH_DEVICES", "10"))
+NUM_POINTS = int(os.getenv("BENCH_POINTS", "5000"))
+BATCH_SIZE = int(os.getenv("BENCH_BATCH_SIZE", "5000"))
+
+engine = create_engine(DATABASE_URL)
+BenchSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+def override_get_db():
+    db = BenchSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+def make_points(device_ids, start):
+    """Generates one reading per minute, round-robin across devices."""
+    return [
+        {
+            "device_id": device_ids[i % len(device_ids)],
+            "timestamp": (start + timedelta(minutes=i // len(device_ids))).isoformat(),
+            "energy_usage": round(random.uniform(5.0, 450.0), 4),
+        }
+        for i in range(NUM_POINTS)
+    ]
+
+
+def report(label, count, elapsed):
+    print(f"{label:<12} {count:>8} points in {elapsed:8.3f}s  ({count / elapsed:10.0f} points/s)")
+
+
+if __name__ == "__main__":
+    Base.metadata.create_all(bind=engine)
+    app.dependency_overrides[get_db] = override_get_db
+    client = TestClient(app)
+
+    email = f"bench_{uuid.uuid4()}@example.com"
+    client.post("/api/v1/auth/register", json={"email": email, "password": "password"})
+    token = client.post("/api/v1/auth/login", data={"username": email, "password": "password"}).json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+    device_ids = [
+        client.post("/api/v1/devices/", headers=headers, json={"name": f"Bench {i}"}).json()["id"]
+        for i in range(NUM_DEVICES)
+    ]
+
+    # Two disjoint time ranges so the runs never collide on the primary key.
+    now = datetime.now(timezone.utc).replace(second=0, microsecond=0)
+    single_points = make_points(device_ids, now - timedelta(days=60))
+    batch_points = make_points(device_ids, now - timedelta(days=30))
+
+    started = time.perf_counter()
+    for point in single_points:
+        client.post("/api/v1/telemetry/", headers=headers, json=point)
+    report("per-point", len(single_points), time.perf_counter() - started)
+
+    started = time.perf_counter()
+    for offset in range(0, len(batch_points), BATCH_SIZE):
+        chunk = batch_points[offset:offset + BATCH_SIZE]
+        response = client.post("/api/v1/telemetry/batch", headers=headers, json={"points": chunk})
+        response.raise_for_status()
+    report("batch", len(batch_points), time.perf_counter() - started)
@@ -0,0 +1,88 @@
+# backend/benchmarks/loadtest_db_modes.py
+"""
+Load-tests a running API to compare the sync (psycopg2 + threadpool) and async
+(asyncpg + AsyncSession) database paths at high concurrency.
+
+Start the server once per mode, then run this script against it:
+
+    DB_ASYNC_ENABLED=false pipenv run hypercorn app.main:app --bind 127.0.0.1:8000
+    pipenv run python benchmarks/loadtest_db_modes.py --label sync
+
+    DB_ASYNC_ENABLED=true pipenv run hypercorn app.main:app --bind 127.0.0.1:8000
+    pipenv run python benchmarks/loadtest_db_modes.py --label async
+
+Each run registers a throwaway user with one device and some telemetry, then
+keeps --concurrency connections busy alternating between the device list and
+the device stats routes for --duration seconds. It reports throughput, errors
+and latency percentiles.
+"""
+
+import argparse
+import asyncio
+import random
+import statistics
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import httpx
+
+
+async def setup(client: httpx.AsyncClient) -> tuple[dict, str]:
+    email = f"loadtest_{uuid.uuid4().hex[:8]}@example.com"
+    await client.post("/api/v1/auth/register", json={"email": email, "password": "password"})
+    login = await client.post("/api/v1/auth/login", data={"username": email, "password": "password"})
+    headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+    device = (await client.post("/api/v1/devices/", json={"name": "Load Test Meter"}, headers=headers)).json()
+    now = datetime.now(timezone.utc)
+    points = [
+        {"device_id": device["id"], "timestamp": (now - timedelta(minutes=i)).isoformat(), "energy_usage": random.uniform(5, 450)}
+        for i in range(2000)
+    ]
+    await client.post("/api/v1/telemetry/batch", json={"points": points}, headers=headers)
+    return headers, device["id"]
+
+
+async def worker(client, headers, device_id, deadline, latencies, errors):
+    paths = ["/api/v1/devices/", f"/api/v1/devices/{device_id}/stats?time_window=12h"]
+    i = 0
+    while time.perf_counter() < deadline:
+        started = time.perf_counter()
+        try:
+            response = await client.get(paths[i % 2], headers=headers)
+            if response.status_code != 200:
+                errors.append(response.status_code)
+            else:
+                latencies.append(time.perf_counter() - started)
+        except httpx.HTTPError as e:
+            errors.append(type(e).__name__)
+        i += 1
+
+
+async def main(args):
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=args.url, limits=limits, timeout=60) as client:
+        headers, device_id = await setup(client)
+        latencies, errors = [], []
+        deadline = time.perf_counter() + args.duration
+        await asyncio.gather(*(
+            worker(client, headers, device_id, deadline, latencies, errors) for _ in range(args.concurrency)
+        ))
+
+    if not latencies:
+        print(f"{args.label}: no successful requests ({len(errors)} errors)")
+        return
+    quantiles = statistics.quantiles(latencies, n=100)
+    print(
+        f"{args.label:<8} {len(latencies) / args.duration:8.1f} req/s  errors={len(errors):<6} "
+        f"p50={quantiles[49] * 1000:7.1f}ms  p95={quantiles[94] * 1000:7.1f}ms  p99={quantiles[98] * 1000:7.1f}ms"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--concurrency", type=int, default=1000)
+    parser.add_argument("--duration", type=float, default=30.0)
+    parser.add_argument("--label", default="run")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,97 @@
+# backend/benchmarks/loadtest_login_burst.py
+"""
+Measures how a login storm affects the data endpoints of a running API.
+
+Start the server, then run:
+
+    pipenv run hypercorn app.main:app --bind 127.0.0.1:8000
+    pipenv run python benchmarks/loadtest_login_burst.py
+
+The script registers --accounts users, then measures latency of the device
+list and device stats routes twice for --duration seconds each: once on an
+idle server and once while --burst concurrent clients log in as fast as they
+can (as gateways do when their tokens expire together). It prints p50/p99 of
+the data routes for both phases and how the logins were answered (200, or
+429/503 when the rate limits or the hashing queue shed them). Loosen
+AUTH_LOGIN_*_RATE_PER_MINUTE on the server to measure the bcrypt pool itself
+rather than the rate limiter.
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+import uuid
+from collections import Counter
+
+import httpx
+
+
+async def register(client: httpx.AsyncClient, count: int) -> list[str]:
+    emails = [f"burst_{uuid.uuid4().hex[:8]}@example.com" for _ in range(count)]
+    for email in emails:
+        await client.post("/api/v1/auth/register", json={"email": email, "password": "password"})
+    return emails
+
+
+async def reader(client, headers, device_id, deadline, latencies):
+    paths = ["/api/v1/devices/", f"/api/v1/devices/{device_id}/stats?time_window=12h"]
+    i = 0
+    while time.perf_counter() < deadline:
+        started = time.perf_counter()
+        response = await client.get(paths[i % 2], headers=headers)
+        if response.status_code == 200:
+            latencies.append(time.perf_counter() - started)
+        i += 1
+
+
+async def login_storm(client, emails, deadline, outcomes):
+    i = 0
+    while time.perf_counter() < deadline:
+        response = await client.post("/api/v1/auth/login", data={"username": emails[i % len(emails)], "password": "password"})
+        outcomes[response.status_code] += 1
+        i += 1
+
+
+async def phase(client, headers, device_id, args, emails=None):
+    latencies, outcomes = [], Counter()
+    deadline = time.perf_counter() + args.duration
+    tasks = [reader(client, headers, device_id, deadline, latencies) for _ in range(args.readers)]
+    if emails:
+        tasks += [login_storm(client, emails, deadline, outcomes) for _ in range(args.burst)]
+    await asyncio.gather(*tasks)
+    return latencies, outcomes
+
+
+def report(label, duration, latencies, outcomes):
+    if len(latencies) < 2:
+        print(f"{label:<12} not enough successful data requests")
+        return
+    quantiles = statistics.quantiles(latencies, n=100)
+    logins = "  logins=" + ", ".join(f"{code}:{count}" for code, count in sorted(outcomes.items())) if outcomes else ""
+    print(
+        f"{label:<12} {len(latencies) / duration:8.1f} req/s  "
+        f"p50={quantiles[49] * 1000:7.1f}ms  p99={quantiles[98] * 1000:7.1f}ms{logins}"
+    )
+
+
+async def main(args):
+    limits = httpx.Limits(max_connections=args.readers + args.burst)
+    async with httpx.AsyncClient(base_url=args.url, limits=limits, timeout=60) as client:
+        emails = await register(client, args.accounts)
+        login = await client.post("/api/v1/auth/login", data={"username": emails[0], "password": "password"})
+        headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+        device = (await client.post("/api/v1/devices/", json={"name": "Burst Meter"}, headers=headers)).json()
+
+        report("idle", args.duration, *await phase(client, headers, device["id"], args))
+        report("login burst", args.duration, *await phase(client, headers, device["id"], args, emails))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--accounts", type=int, default=50)
+    parser.add_argument("--readers", type=int, default=50)
+    parser.add_argument("--burst", type=int, default=200)
+    parser.add_argument("--duration", type=float, default=20.0)
+    asyncio.run(main(parser.parse_args()))
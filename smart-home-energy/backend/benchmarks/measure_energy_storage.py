@@ -0,0 +1,129 @@
+# backend/benchmarks/measure_energy_storage.py
+"""
+Measures telemetry storage with energy_usage as NUMERIC(10, 4) (the default)
+against integer milliwatt-hours (TELEMETRY_ENERGY_STORAGE=milliwatt_hours),
+on the Postgres server in DATABASE_URL.
+
+    pipenv run python benchmarks/measure_energy_storage.py --devices 200 --days 30
+
+Both tables live in a scratch schema (`bench_energy_storage`) that is dropped
+afterwards unless --keep is given. Reported per table:
+  * average row size (pg_column_size of the whole row) and energy_usage size
+  * heap and primary key index size
+  * median server-side time (EXPLAIN ANALYZE) of a full-table SUM and of a
+    per-device hourly SUM over one day, over --repeat runs
+
+Row layout: (uuid 16B, timestamptz 8B, energy) is already ordered widest
+first, so int4 needs no padding and no column reordering.
+"""
+
+import argparse
+import os
+import re
+import statistics
+import sys
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.realpath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sqlalchemy import create_engine, text
+
+from app.core.config import settings
+
+SCHEMA = "bench_energy_storage"
+
+TABLES = {
+    "numeric": "NUMERIC(10, 4)",
+    "mwh_int4": "INTEGER",
+}
+
+QUERIES = {
+    "SUM over table": "SELECT sum(energy_usage) FROM {table}",
+    "hourly SUM, 1 device": (
+        'SELECT date_trunc(\'hour\', "timestamp"), sum(energy_usage) FROM {table} '
+        'WHERE device_id = :device AND "timestamp" >= :day AND "timestamp" < :day + interval \'1 day\' GROUP BY 1'
+    ),
+}
+
+
+def load(conn, devices: int, days: int, start: datetime) -> None:
+    conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+    conn.execute(text(f"CREATE SCHEMA {SCHEMA}"))
+    for table, energy_type in TABLES.items():
+        conn.execute(text(
+            f'CREATE TABLE {SCHEMA}.{table} (device_id UUID NOT NULL, "timestamp" TIMESTAMPTZ NOT NULL, '
+            f'energy_usage {energy_type} NOT NULL, PRIMARY KEY (device_id, "timestamp"))'
+        ))
+    for day in range(days):
+        day_start = start + timedelta(days=day)
+        conn.execute(text(f"""
+            INSERT INTO {SCHEMA}.numeric
+            SELECT ('00000000-0000-0000-0000-' || lpad(to_hex(d), 12, '0'))::uuid, ts, round((random() * 450)::numeric, 3)
+            FROM generate_series(1, :devices) d,
+                 generate_series(CAST(:start AS timestamptz), CAST(:start AS timestamptz) + interval '1 day' - interval '1 minute', interval '1 minute') ts
+        """), {"devices": devices, "start": day_start})
+        print(f"\rloaded {day + 1}/{days} days", end="", flush=True)
+    print()
+    # Same readings, converted the way the migration converts them.
+    conn.execute(text(
+        f"INSERT INTO {SCHEMA}.mwh_int4 SELECT device_id, \"timestamp\", round(energy_usage * 1000)::integer "
+        f"FROM {SCHEMA}.numeric"
+    ))
+    for table in TABLES:
+        conn.execute(text(f"VACUUM ANALYZE {SCHEMA}.{table}"))
+
+
+def sizes(conn, table: str) -> dict:
+    qualified = f"{SCHEMA}.{table}"
+    return conn.execute(text(f"""
+        SELECT avg(pg_column_size(t.*))::numeric(6, 1) AS row_bytes,
+               avg(pg_column_size(t.energy_usage))::numeric(4, 1) AS energy_bytes,
+               pg_relation_size('{qualified}') AS heap_bytes,
+               pg_relation_size('{qualified}_pkey') AS index_bytes
+        FROM {qualified} t
+    """)).one()._asdict()
+
+
+def measure(conn, sql: str, params: dict, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        plan = [row[0] for row in conn.execute(text(f"EXPLAIN (ANALYZE, TIMING OFF) {sql}"), params)]
+        timings.append(float(re.search(r"Execution Time: ([\d.]+) ms", plan[-1]).group(1)))
+    return statistics.median(timings)
+
+
+def main(args):
+    engine = create_engine(settings.DATABASE_URL, isolation_level="AUTOCOMMIT")
+    start = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    with engine.connect() as conn:
+        if not args.reuse:
+            load(conn, args.devices, args.days, start)
+        rows = conn.execute(text(f"SELECT count(*) FROM {SCHEMA}.numeric")).scalar()
+        print(f"{rows:,} rows per table\n")
+
+        print(f"{'table':<10} {'row B':>7} {'energy B':>9} {'heap MB':>9} {'pkey MB':>9}")
+        for table in TABLES:
+            s = sizes(conn, table)
+            print(
+                f"{table:<10} {s['row_bytes']:>7} {s['energy_bytes']:>9} "
+                f"{s['heap_bytes'] / 2**20:9.1f} {s['index_bytes'] / 2**20:9.1f}"
+            )
+
+        params = {"device": "00000000-0000-0000-0000-000000000007", "day": start + timedelta(days=args.days // 2)}
+        print(f"\n{'query':<22} " + " ".join(f"{table:>12}" for table in TABLES))
+        for label, sql in QUERIES.items():
+            timings = [measure(conn, sql.format(table=f"{SCHEMA}.{table}"), params, args.repeat) for table in TABLES]
+            print(f"{label:<22} " + " ".join(f"{ms:10.1f}ms" for ms in timings))
+
+        if not args.keep:
+            conn.execute(text(f"DROP SCHEMA {SCHEMA} CASCADE"))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--devices", type=int, default=200)
+    parser.add_argument("--days", type=int, default=30)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--keep", action="store_true", help="keep the scratch schema for another run")
+    parser.add_argument("--reuse", action="store_true", help="measure an existing scratch schema without loading")
+    main(parser.parse_args())
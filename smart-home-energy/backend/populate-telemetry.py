@@ -1,6 +1,6 @@
 import requests
 import random
-import time
+import json
 import uuid
 import os
 from datetime import datetime, timedelta, timezone
@@ -75,44 +75,34 @@ if __name__ == "__main__":
         
         # --- Main Data Generation Loop ---
         print("\nStarting telemetry data generation...")
-        headers = {"Authorization": f"Bearer {auth_token}"}
+        headers = {"Authorization": f"Bearer {auth_token}", "Content-Type": "application/x-ndjson"}
         
         # Calculate start date (7 days ago)
         end_date = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
         start_date = end_date - timedelta(days=DAYS_OF_DATA)
         
-        # Calculate total number of requests for progress tracking
-        total_requests = len(device_ids_to_populate) * 24 * 60 * DAYS_OF_DATA
-        request_count = 0
+        def generate_rows():
+            """Yields one NDJSON line per reading: one reading per hour for every device."""
+            current_date = start_date
+            while current_date <= end_date:
+                print(f"\nGenerating data for {current_date.date()}")
+                for t in range(0, 24 * 60, 60):
+                    ts = (current_date + timedelta(minutes=t)).isoformat()
+                    for dev_id in device_ids_to_populate:
+                        payload = {
+                            "device_id": dev_id,
+                            "timestamp": ts,
+                            "energy_usage": round(random.uniform(5.0, 450.0), 4)
+                        }
+                        yield (json.dumps(payload) + "\n").encode()
+                current_date += timedelta(days=1)
         
-        # Generate data for each day
-        current_date = start_date
-        while current_date <= end_date:
-            print(f"\nGenerating data for {current_date.date()}")
-            
-            # One reading per hour for 24 hours
-            for t in range(0, 24 * 60, 60):
-                ts = (current_date + timedelta(seconds=t)).isoformat().replace('+00:00', 'Z')
-                for dev_id in device_ids_to_populate:
-                    request_count += 1
-                    
-                    payload = {
-                        "deviceId": dev_id,
-                        "timestamp": ts,
-                        "energyWatts": round(random.uniform(5.0, 450.0), 4)
-                    }
-                    
-                    try:
-                        requests.post(f"{BASE_URL}/telemetry/", headers=headers, json=payload, timeout=5)
-                        if request_count % 100 == 0:  # Print progress every 100 requests
-                            print(f"Progress: {request_count}/{total_requests} ({round(request_count/total_requests*100, 1)}%)")
-                    except requests.exceptions.RequestException as e:
-                        print(f"  - Failed to submit data: {e}")
-                    
-                # A small sleep to not overwhelm the server instantly
-                time.sleep(0.05)
-            
-            current_date += timedelta(days=1)
+        # The whole history is streamed in a single chunked request; the server
+        # writes it in batches as it arrives.
+        response = requests.post(f"{BASE_URL}/telemetry/upload", headers=headers, data=generate_rows(), timeout=300)
+        response.raise_for_status()
+        result = response.json()
+        print(f"Uploaded {result['accepted']} readings ({result['rejected']} rejected).")
             
         print("\nData population script finished successfully.")
         